@@ -18,6 +18,13 @@ from skills.listening import listening_bp
 from skills.reading import reading_bp
 from skills.writing import writing_bp
 from skills.xp_manager import xp_manager_bp
+from services.lesson_pool import lesson_pool
+from services.llm_usage import usage_tracker
+from services.vocab_index import vocab_index
+from services.vocab_search import vocab_search_index
+from services.spell_index import spell_index
+from services.translation_cache import translation_cache
+from cli import register_cli
 
 
 
@@ -25,6 +32,13 @@ from skills.xp_manager import xp_manager_bp
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev_default_secret_key')
 init_app(app)
+lesson_pool.init_app(app)
+usage_tracker.init_app(app)
+vocab_index.init_app(app)
+vocab_search_index.init_app(app)
+spell_index.init_app(app)
+translation_cache.init_app(app)
+register_cli(app)
 # CSRF Korumasını Başlat
 csrf = CSRFProtect(app)
 
@@ -0,0 +1,102 @@
+# benchmarks/app_throughput.py
+
+"""
+Tüm Flask uygulamasının offline throughput ölçümü (gerçek OpenAI çağrısı yapılmaz).
+
+LLM_BACKEND=fake ile çalışır; gecikme dağılımı LLM_FAKE_LATENCY ile verilir.
+MySQL bağlantısı gerekir (.env'deki DB ayarları) ve BENCH_USER_ID
+seviye testini tamamlamış bir kullanıcı olmalıdır.
+
+Örnek:
+    LLM_BACKEND=fake LLM_FAKE_LATENCY="default=lognormal:-0.5,0.4" \
+    BENCH_USER_ID=1 python benchmarks/app_throughput.py --threads 16 --requests 400
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+
+SCENARIOS = {
+    "reading": ("GET", "/api/generate_reading?level=B1", None),
+    "listening": ("POST", "/api/generate_listening", {"level": "B1"}),
+    "writing_topic": ("GET", "/api/generate_writing_topic?level=B1", None),
+    "assess_writing": ("POST", "/api/assess_writing", {
+        "text": "Last summer I go to the sea with my family and we was very happy.",
+        "topic": "Holiday", "level": "B1"
+    }),
+    "conversation": ("POST", "/conversation", {"text": "I like travelling a lot.", "scenario": "restaurant"}),
+}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def run(scenario, threads, total, user_id):
+    method, url, body = SCENARIOS[scenario]
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user_id"] = user_id
+            sess["username"] = "bench"
+            sess["role"] = "student"
+
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            start = time.perf_counter()
+            if method == "GET":
+                resp = client.get(url)
+            else:
+                resp = client.post(url, json=body)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if resp.status_code >= 400:
+                    errors[0] += 1
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - started
+
+    print(
+        f"{scenario:15s} | n={len(latencies)} | errors={errors[0]} | "
+        f"rps={len(latencies) / wall:.1f} | p50={percentile(latencies, 50) * 1000:.0f}ms | "
+        f"p99={percentile(latencies, 99) * 1000:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--scenario", choices=list(SCENARIOS) + ["all"], default="all")
+    args = parser.parse_args()
+
+    app.config["WTF_CSRF_ENABLED"] = False
+    user_id = int(os.getenv("BENCH_USER_ID", 1))
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    for name in names:
+        run(name, args.threads, args.requests, user_id)
@@ -0,0 +1,89 @@
+# benchmarks/prompt_variants.py
+
+"""
+Full ve compact prompt varyantlarını karşılaştırır: input token, output token ve gecikme.
+
+Sadece token sayımı (API çağrısı yok):
+    python benchmarks/prompt_variants.py
+
+Canlı ölçüm (her skill / varyant için N çağrı, gerçek API veya LLM_BACKEND=fake):
+    python benchmarks/prompt_variants.py --live --runs 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.prompt_builder import build_prompt, PROMPT_BUDGETS  # noqa: E402
+from services.tokens import count_message_tokens, tokenizer_name  # noqa: E402
+
+SKILLS = ["reading", "listening", "speaking", "writing"]
+LEVELS = ["A1", "B1", "C1"]
+SAMPLE_WORDS = [
+    {"word": "journey", "meaning": "yolculuk"},
+    {"word": "border", "meaning": "sınır"},
+    {"word": "reluctant", "meaning": "isteksiz"},
+    {"word": "significant", "meaning": "önemli"},
+    {"word": "approach", "meaning": "yaklaşım"},
+]
+
+
+def build(skill, level, compact):
+    # build_prompt debug print'lerini rapordan uzak tut
+    with contextlib.redirect_stdout(io.StringIO()):
+        return build_prompt(skill, level, "travel-and-holidays", "food-and-cooking", SAMPLE_WORDS, compact=compact)
+
+
+def measure_live(messages, skill, runs):
+    from services.llm_client import chat_completion
+
+    latencies, completion_tokens = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = chat_completion(
+            call_site=f"benchmark:{skill}",
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.9,
+            max_tokens=PROMPT_BUDGETS[skill]["output"],
+            response_format={"type": "json_object"} if skill != "writing" else None
+        )
+        latencies.append(time.perf_counter() - start)
+        usage = getattr(response, "usage", None)
+        completion_tokens.append(getattr(usage, "completion_tokens", 0) or 0)
+    return statistics.median(latencies), statistics.mean(completion_tokens)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"tokenizer: {tokenizer_name()}")
+    header = f"{'skill':10s} {'level':5s} {'full_in':>8s} {'compact_in':>10s} {'saved':>6s} {'budget':>6s}"
+    if args.live:
+        header += f" {'full_p50':>9s} {'compact_p50':>11s} {'full_out':>9s} {'compact_out':>11s}"
+    print(header)
+
+    for skill in SKILLS:
+        for level in LEVELS:
+            full = build(skill, level, compact=False)
+            compact = build(skill, level, compact=True)
+            full_in = count_message_tokens(full)
+            compact_in = count_message_tokens(compact)
+            line = (
+                f"{skill:10s} {level:5s} {full_in:8d} {compact_in:10d} "
+                f"{(1 - compact_in / full_in) * 100:5.0f}% {PROMPT_BUDGETS[skill]['input']:6d}"
+            )
+            if args.live:
+                full_lat, full_out = measure_live(full, skill, args.runs)
+                compact_lat, compact_out = measure_live(compact, skill, args.runs)
+                line += f" {full_lat * 1000:7.0f}ms {compact_lat * 1000:9.0f}ms {full_out:9.0f} {compact_out:11.0f}"
+            print(line)
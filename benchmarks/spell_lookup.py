@@ -0,0 +1,86 @@
+# benchmarks/spell_lookup.py
+
+"""
+Yazım hatası toleranslı yerel sözlük (services/spell_index) için lookup gecikmesi ve bellek.
+Varsayılan olarak mevcut DB'deki vocab tablosunun tamamı kullanılır; --size verilirse sentetik sözlük kurulur.
+Sorgular sözlükten rastgele kelimelere 0 / 1 / 2 harf hatası (silme, ekleme, değiştirme, yer değiştirme) eklenerek üretilir.
+
+    python benchmarks/spell_lookup.py --runs 5000
+    python benchmarks/spell_lookup.py --size 100000
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from app import app  # noqa: E402
+from database import db  # noqa: E402
+from services.spell_index import SpellIndex, normalize_term  # noqa: E402
+
+
+def synthetic_rows(size, rng):
+    return [(i + 1, "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12)))) for i in range(size)]
+
+
+def add_typos(word, count, rng):
+    for _ in range(count):
+        if len(word) < 2:
+            break
+        i = rng.randrange(len(word) - 1)
+        op = rng.choice(["delete", "insert", "replace", "transpose"])
+        if op == "delete":
+            word = word[:i] + word[i + 1:]
+        elif op == "insert":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif op == "replace":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+        else:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def measure(index, words, typos, runs, rng):
+    times, found = [], 0
+    for _ in range(runs):
+        original = rng.choice(words)
+        query = add_typos(original, typos, rng)
+        start = time.perf_counter()
+        match = index.lookup(query)
+        times.append((time.perf_counter() - start) * 1_000_000)
+        if match and match["word"] == original:
+            found += 1
+    times.sort()
+    return times[len(times) // 2], times[max(0, int(len(times) * 0.99) - 1)], found / runs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=0, help="0: DB'deki sözlük, >0: sentetik sözlük")
+    parser.add_argument("--runs", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    if args.size:
+        rows = synthetic_rows(args.size, rng)
+    else:
+        with app.app_context():
+            with db.engine.connect() as conn:
+                rows = conn.execute(text("SELECT id, word FROM vocab")).fetchall()
+
+    index = SpellIndex()
+    index.build_from_rows(rows)
+    stats = index.get_stats()
+    print(f"words={stats['words']} delete_keys={stats['delete_keys']} build={stats['build_ms']}ms "
+          f"memory~{stats['memory_bytes'] / 1024 / 1024:.1f}MB")
+
+    words = [normalize_term(w) for _, w in rows if normalize_term(w) and " " not in normalize_term(w)]
+    print(f"{'typos':6s} {'p50':>9s} {'p99':>9s} {'resolved':>9s}")
+    for typos in (0, 1, 2):
+        p50, p99, ratio = measure(index, words, typos, args.runs, rng)
+        print(f"{typos:<6d} {p50:7.1f}us {p99:7.1f}us {ratio:8.1%}")
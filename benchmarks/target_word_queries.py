@@ -0,0 +1,52 @@
+# benchmarks/target_word_queries.py
+
+"""
+SQL yolunda target word seçimi: POS başına sorgu (per_pos) vs topic başına tek windowed sorgu.
+Seçim başına sorgu sayısını ve süreyi raporlar. MySQL bağlantısı ve dolu vocab / topics tabloları gerekir.
+
+    python benchmarks/target_word_queries.py --runs 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from app import app  # noqa: E402
+from database import db  # noqa: E402
+from services.target_word_selector import (  # noqa: E402
+    select_target_words, WindowedPoolFetcher, _PerPosFetcher
+)
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1"]
+
+
+def run(mode, conn, topics, runs):
+    queries, times = [], []
+    for _ in range(runs):
+        primary, secondary = random.sample(topics, 2)
+        fetch = WindowedPoolFetcher(conn) if mode == "windowed" else _PerPosFetcher(conn)
+        start = time.perf_counter()
+        select_target_words(random.choice(LEVELS), primary, secondary, fetch)
+        times.append((time.perf_counter() - start) * 1000)
+        queries.append(fetch.queries)
+    return statistics.mean(queries), max(queries), statistics.median(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with app.app_context():
+        with db.engine.connect() as conn:
+            topics = [r[0] for r in conn.execute(text("SELECT slug FROM topics WHERE slug IS NOT NULL")).fetchall()]
+            print(f"{'mode':9s} {'avg_queries':>11s} {'max_queries':>11s} {'p50':>9s}")
+            for mode in ["per_pos", "windowed"]:
+                avg_q, max_q, p50 = run(mode, conn, topics, args.runs)
+                print(f"{mode:9s} {avg_q:11.1f} {max_q:11d} {p50:7.2f}ms")
@@ -0,0 +1,153 @@
+# benchmarks/target_word_sampling.py
+
+"""
+Target word örneklemesi: ORDER BY RAND() vs rand_key range seek.
+
+Gerçek tabloları bozmamak için bench_ önekli kopya tablolar oluşturur,
+10k / 100k / 1M kelimeyle doldurur ve iki sorgunun süresini ölçer.
+MySQL bağlantısı gerekir (.env / database.py ayarları).
+
+    python benchmarks/target_word_sampling.py --sizes 10000,100000,1000000 --runs 50
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from app import app  # noqa: E402
+from database import db  # noqa: E402
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1"]
+WORD_TYPES = ["n.", "v.", "adj.", "adv."]
+TOPIC_COUNT = 40
+CHUNK = 5000
+
+SCHEMA = [
+    "DROP TABLE IF EXISTS bench_vocab_topics",
+    "DROP TABLE IF EXISTS bench_vocab",
+    "DROP TABLE IF EXISTS bench_topics",
+    """
+    CREATE TABLE bench_vocab (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        word VARCHAR(255) NOT NULL,
+        meaning TEXT,
+        level ENUM('A1', 'A2', 'B1', 'B2', 'C1', 'C2') DEFAULT 'A1',
+        word_type VARCHAR(50),
+        rand_key DOUBLE NOT NULL DEFAULT 0,
+        KEY idx_level_rand (level, rand_key)
+    )
+    """,
+    """
+    CREATE TABLE bench_topics (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        slug VARCHAR(50) UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE bench_vocab_topics (
+        vocab_id INT,
+        topic_id INT,
+        PRIMARY KEY (vocab_id, topic_id),
+        KEY idx_topic_vocab (topic_id, vocab_id)
+    )
+    """
+]
+
+RAND_SQL = """
+    SELECT v.word FROM bench_vocab v
+    JOIN bench_vocab_topics vt ON v.id = vt.vocab_id
+    JOIN bench_topics t ON vt.topic_id = t.id
+    WHERE v.level = :level AND t.slug = :topic AND v.word_type LIKE :pos
+    ORDER BY RAND()
+    LIMIT :limit
+"""
+
+SEEK_SQL = """
+    SELECT v.word FROM bench_vocab v
+    JOIN bench_vocab_topics vt ON v.id = vt.vocab_id
+    JOIN bench_topics t ON vt.topic_id = t.id
+    WHERE v.level = :level AND t.slug = :topic AND v.word_type LIKE :pos AND v.rand_key {op} :start
+    ORDER BY v.rand_key
+    LIMIT :limit
+"""
+
+
+def populate(conn, size):
+    for sql in SCHEMA:
+        conn.execute(text(sql))
+
+    conn.execute(text("INSERT INTO bench_topics (slug) VALUES (:slug)"),
+                 [{"slug": f"topic-{i}"} for i in range(TOPIC_COUNT)])
+
+    for start in range(0, size, CHUNK):
+        rows = [{
+            "word": f"word{i}",
+            "level": random.choice(LEVELS),
+            "wt": random.choice(WORD_TYPES),
+            "rk": random.random()
+        } for i in range(start, min(size, start + CHUNK))]
+        conn.execute(text(
+            "INSERT INTO bench_vocab (word, meaning, level, word_type, rand_key) VALUES (:word, 'x', :level, :wt, :rk)"
+        ), rows)
+
+    # Her kelime 1-2 topic'e bağlı
+    for start in range(1, size + 1, CHUNK):
+        links = []
+        for vid in range(start, min(size + 1, start + CHUNK)):
+            for tid in random.sample(range(1, TOPIC_COUNT + 1), random.choice([1, 2])):
+                links.append({"vid": vid, "tid": tid})
+        conn.execute(text("INSERT INTO bench_vocab_topics (vocab_id, topic_id) VALUES (:vid, :tid)"), links)
+
+
+def seek(conn, params):
+    params = dict(params, start=random.random())
+    rows = conn.execute(text(SEEK_SQL.format(op=">=")), params).fetchall()
+    if len(rows) < params["limit"]:
+        params["limit"] -= len(rows)
+        rows += conn.execute(text(SEEK_SQL.format(op="<")), params).fetchall()
+    return rows
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        params = {
+            "level": random.choice(LEVELS),
+            "topic": f"topic-{random.randrange(TOPIC_COUNT)}",
+            "pos": random.choice(["%n.%", "%v.%", "%adj%", "%"]),
+            "limit": 3
+        }
+        start = time.perf_counter()
+        fn(params)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="bench_ tablolarını silme")
+    args = parser.parse_args()
+
+    with app.app_context():
+        with db.engine.connect() as conn:
+            print(f"{'rows':>9s} {'rand_p50':>9s} {'rand_p95':>9s} {'seek_p50':>9s} {'seek_p95':>9s}")
+            for size in [int(s) for s in args.sizes.split(",")]:
+                populate(conn, size)
+                conn.commit()
+                rand_p50, rand_p95 = timed(lambda p: conn.execute(text(RAND_SQL), p).fetchall(), args.runs)
+                seek_p50, seek_p95 = timed(lambda p: seek(conn, p), args.runs)
+                print(f"{size:9d} {rand_p50:7.2f}ms {rand_p95:7.2f}ms {seek_p50:7.2f}ms {seek_p95:7.2f}ms")
+
+            if not args.keep:
+                for sql in SCHEMA[:3]:
+                    conn.execute(text(sql))
+                conn.commit()
@@ -0,0 +1,208 @@
+# benchmarks/vocab_listing.py
+
+"""
+Sözlük listesi: eski 4 LEFT JOIN + GROUP_CONCAT + Python sıralaması
+vs saklanan level_rank + (level_rank, word) index'i üzerinde keyset sayfa, alt tablolar kelime başına
+JSON_ARRAYAGG ile toplanan sorgu.
+
+Gerçek tabloları bozmamak için bench_ önekli kopya tablolar oluşturur ve sentetik sözlükle doldurur
+(her kelimede 1-3 anlam, 1-3 örnek, 1-2 seviye, 1-2 tür). MySQL bağlantısı gerekir.
+
+    python benchmarks/vocab_listing.py --size 100000 --runs 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from app import app  # noqa: E402
+from database import db, vocab_listing_row, vocab_level_rank_sql, VOCAB_LEVEL_ORDER  # noqa: E402
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1"]
+WORD_TYPES = ["noun", "verb", "adjective", "adverb"]
+CHUNK = 5000
+PAGE_SIZE = 50
+
+CHILD_TABLES = [
+    ("bench_vocab_meanings", "meaning TEXT NOT NULL"),
+    ("bench_vocab_examples", "example TEXT NOT NULL"),
+    ("bench_vocab_levels", "level ENUM('A1', 'A2', 'B1', 'B2', 'C1', 'C2') NOT NULL"),
+    ("bench_vocab_word_types", "word_type VARCHAR(50) NOT NULL"),
+]
+
+SCHEMA = [f"DROP TABLE IF EXISTS {table}" for table, _ in CHILD_TABLES] + [
+    "DROP TABLE IF EXISTS bench_vocab",
+    """
+    CREATE TABLE bench_vocab (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        word VARCHAR(255) NOT NULL,
+        level_rank TINYINT NOT NULL DEFAULT 99,
+        UNIQUE KEY unique_word (word),
+        KEY idx_rank_word (level_rank, word)
+    )
+    """
+] + [
+    f"""
+    CREATE TABLE {table} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        vocab_id INT NOT NULL,
+        {column},
+        KEY idx_vocab (vocab_id)
+    )
+    """
+    for table, column in CHILD_TABLES
+]
+
+OLD_SQL = """
+    SELECT
+        v.id,
+        v.word,
+        GROUP_CONCAT(DISTINCT vm.meaning SEPARATOR '||') as meanings,
+        GROUP_CONCAT(DISTINCT ve.example SEPARATOR '||') as examples,
+        GROUP_CONCAT(DISTINCT vl.level SEPARATOR '||') as levels,
+        GROUP_CONCAT(DISTINCT vt.word_type SEPARATOR '||') as word_types
+    FROM bench_vocab v
+    LEFT JOIN bench_vocab_meanings vm ON v.id = vm.vocab_id
+    LEFT JOIN bench_vocab_examples ve ON v.id = ve.vocab_id
+    LEFT JOIN bench_vocab_levels vl ON v.id = vl.vocab_id
+    LEFT JOIN bench_vocab_word_types vt ON v.id = vt.vocab_id
+    WHERE v.word LIKE :pattern
+    GROUP BY v.id
+"""
+
+NEW_SQL = """
+    SELECT
+        v.id, v.word, v.level_rank,
+        (SELECT JSON_ARRAYAGG(JSON_ARRAY(vm.id, vm.meaning)) FROM bench_vocab_meanings vm WHERE vm.vocab_id = v.id),
+        (SELECT JSON_ARRAYAGG(JSON_ARRAY(ve.id, ve.example)) FROM bench_vocab_examples ve WHERE ve.vocab_id = v.id),
+        (SELECT JSON_ARRAYAGG(vl.level) FROM bench_vocab_levels vl WHERE vl.vocab_id = v.id),
+        (SELECT JSON_ARRAYAGG(JSON_ARRAY(vt.id, vt.word_type)) FROM bench_vocab_word_types vt WHERE vt.vocab_id = v.id)
+    FROM bench_vocab v
+    WHERE v.word LIKE :pattern
+      {after}
+    ORDER BY v.level_rank, v.word, v.id
+    {limit}
+"""
+RANK_SQL = f"""
+    UPDATE bench_vocab v
+    LEFT JOIN (
+        SELECT vocab_id, {vocab_level_rank_sql("level")} AS level_rank
+        FROM bench_vocab_levels
+        GROUP BY vocab_id
+    ) l ON l.vocab_id = v.id
+    SET v.level_rank = COALESCE(l.level_rank, 99)
+"""
+
+
+def populate(conn, size):
+    for sql in SCHEMA:
+        conn.execute(text(sql))
+
+    for start in range(0, size, CHUNK):
+        end = min(size, start + CHUNK)
+        conn.execute(text("INSERT INTO bench_vocab (word) VALUES (:word)"), [
+            {"word": random.choice("abcdefghijklmnopqrstuvwxyz") + f"word{i}"} for i in range(start, end)
+        ])
+        children = {table: [] for table, _ in CHILD_TABLES}
+        for vid in range(start + 1, end + 1):
+            for k in range(random.randint(1, 3)):
+                children["bench_vocab_meanings"].append({"vid": vid, "value": f"anlam {vid}-{k}"})
+            for k in range(random.randint(1, 3)):
+                children["bench_vocab_examples"].append({"vid": vid, "value": f"Example sentence {vid}-{k}."})
+            for level in random.sample(LEVELS, random.randint(1, 2)):
+                children["bench_vocab_levels"].append({"vid": vid, "value": level})
+            for word_type in random.sample(WORD_TYPES, random.randint(1, 2)):
+                children["bench_vocab_word_types"].append({"vid": vid, "value": word_type})
+        for table, column in CHILD_TABLES:
+            conn.execute(
+                text(f"INSERT INTO {table} (vocab_id, {column.split()[0]}) VALUES (:vid, :value)"),
+                children[table]
+            )
+    conn.execute(text(RANK_SQL))
+
+
+def old_listing(conn, letter):
+    rows = conn.execute(text(OLD_SQL), {"pattern": f"{letter}%"}).fetchall()
+    priority = {lvl: i for i, lvl in enumerate(VOCAB_LEVEL_ORDER, 1)}
+    vocabs = [{
+        "id": r[0], "word": r[1],
+        "meanings": r[2].split("||") if r[2] else [],
+        "examples": r[3].split("||") if r[3] else [],
+        "levels": r[4].split("||") if r[4] else [],
+        "word_types": r[5].split("||") if r[5] else []
+    } for r in rows]
+    vocabs.sort(key=lambda v: (priority.get(v["levels"][0] if v["levels"] else None, 99), v["word"].lower()))
+    return vocabs
+
+
+def new_listing(conn, letter, limit=None, after=None):
+    params = {"pattern": f"{letter}%"}
+    after_sql = limit_sql = ""
+    if after:
+        after_sql = """AND v.level_rank >= :r
+            AND (v.level_rank > :r OR (v.level_rank = :r AND (v.word > :w OR (v.word = :w AND v.id > :i))))"""
+        params.update(r=after[0], w=after[1], i=after[2])
+    if limit:
+        limit_sql = "LIMIT :limit"
+        params["limit"] = limit
+    rows = conn.execute(text(NEW_SQL.format(after=after_sql, limit=limit_sql)), params).fetchall()
+    last = (rows[-1][2], rows[-1][1], rows[-1][0]) if rows else None
+    return [vocab_listing_row(r) for r in rows], last
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        letter = random.choice("abcdefghijklmnopqrstuvwxyz")
+        start = time.perf_counter()
+        fn(letter)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[max(0, int(len(times) * 0.95) - 1)]
+
+
+def deep_page(conn, letter, pages=10):
+    # 10. sayfaya keyset ile ilerleme (her sayfa bir sorgu)
+    after = None
+    for _ in range(pages):
+        _, after = new_listing(conn, letter, PAGE_SIZE, after)
+        if after is None:
+            break
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="bench_ tablolarını silme")
+    args = parser.parse_args()
+
+    with app.app_context():
+        with db.engine.connect() as conn:
+            populate(conn, args.size)
+            conn.commit()
+            # Eski sorgunun kırpma davranışı varsayılan ayarla ölçülsün
+            conn.execute(text("SET SESSION group_concat_max_len = 1024"))
+
+            cases = [
+                ("old_full_letter", lambda letter: old_listing(conn, letter)),
+                ("new_full_letter", lambda letter: new_listing(conn, letter)),
+                ("new_first_page", lambda letter: new_listing(conn, letter, PAGE_SIZE)),
+                ("new_page_10", lambda letter: deep_page(conn, letter)),
+            ]
+            print(f"rows={args.size}")
+            print(f"{'case':16s} {'p50':>10s} {'p95':>10s}")
+            for name, fn in cases:
+                p50, p95 = timed(fn, args.runs)
+                print(f"{name:16s} {p50:8.2f}ms {p95:8.2f}ms")
+
+            if not args.keep:
+                for sql in SCHEMA[:len(CHILD_TABLES) + 1]:
+                    conn.execute(text(sql))
+                conn.commit()
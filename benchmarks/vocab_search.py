@@ -0,0 +1,91 @@
+# benchmarks/vocab_search.py
+
+"""
+Sözlük araması gecikmesi (p50 / p99): bellek içi index sentetik sözlükle (varsayılan 100k kelime) kurulur,
+prefix / substring / meaning sorguları ölçülür. --sql verilirse aynı sorgular mevcut DB'deki
+vocab tablolarında SQL yolu ile de çalıştırılır (FULLTEXT index'i varsa kullanılır).
+
+    python benchmarks/vocab_search.py --size 100000 --runs 1000
+    python benchmarks/vocab_search.py --sql --runs 200
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from app import app  # noqa: E402
+from database import db  # noqa: E402
+from services.vocab_search import VocabSearchIndex, _sql_search, SEARCH_MODES  # noqa: E402
+
+TR_LETTERS = "abcçdefgğhıijklmnoöprsştuüvyz"
+
+
+def synthetic_rows(size, rng):
+    rows = []
+    for i in range(size):
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) + str(i)
+        meanings = [
+            " ".join("".join(rng.choices(TR_LETTERS, k=rng.randint(3, 8))) for _ in range(rng.randint(1, 3)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        rows.append((i + 1, word, meanings, [rng.choice(["A1", "A2", "B1", "B2", "C1"])], ["noun"]))
+    return rows
+
+
+def make_query(row, mode, rng):
+    _, word, meanings, _, _ = row
+    if mode == "prefix":
+        return word[:rng.randint(1, 4)]
+    source = word if mode == "substring" else rng.choice(meanings)
+    start = rng.randrange(max(1, len(source) - 3))
+    return source[start:start + rng.randint(3, 5)]
+
+
+def measure(search, rows, mode, runs, rng):
+    times = []
+    for _ in range(runs):
+        query = make_query(rng.choice(rows), mode, rng)
+        start = time.perf_counter()
+        search(query, mode, 20, 0)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[max(0, int(len(times) * 0.99) - 1)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--sql", action="store_true", help="Mevcut DB üzerinde SQL yolunu da ölç")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = synthetic_rows(args.size, rng)
+    index = VocabSearchIndex()
+    index.build_from_rows(rows)
+    stats = index.get_stats()
+    print(f"memory index: entries={stats['entries']} build={stats['build_ms']}ms memory~{stats['memory_bytes'] // 1024 // 1024}MB")
+
+    print(f"{'backend':8s} {'mode':10s} {'p50':>9s} {'p99':>9s}")
+    for mode in SEARCH_MODES:
+        p50, p99 = measure(index.search, rows, mode, args.runs, rng)
+        print(f"{'memory':8s} {mode:10s} {p50:7.3f}ms {p99:7.3f}ms")
+
+    if args.sql:
+        with app.app_context():
+            # SQL yolu gerçek tablolarda çalışır; sorgular DB'deki kelimelerden türetilir
+            with db.engine.connect() as conn:
+                db_rows = [
+                    (vid, word, [m.strip() for m in (meaning or word).split(";") if m.strip()] or [word], [])
+                    for vid, word, meaning in conn.execute(text("SELECT id, word, meaning FROM vocab")).fetchall()
+                ]
+            print(f"sql: vocab rows={len(db_rows)}")
+            for mode in SEARCH_MODES:
+                p50, p99 = measure(_sql_search, db_rows, mode, args.runs, rng)
+                print(f"{'sql':8s} {mode:10s} {p50:7.3f}ms {p99:7.3f}ms")
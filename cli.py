@@ -0,0 +1,120 @@
+import click
+from services.batch_lessons import parse_plan, write_batch_file, ingest_batch_results
+from services.vocab_import import detect_format, iter_import_rows, import_vocab, CHUNK_SIZE
+from services.vocab_export import export_vocab, EXPORT_FORMATS
+from services.translation_cache import translation_cache, TRANSLATION_CACHE_PRELOAD, TRANSLATION_CACHE_MAX_ROWS
+from database import backfill_vocab_rand_keys, backfill_vocab_pos, backfill_vocab_level_ranks, ensure_vocab_search_indexes
+
+
+def register_cli(app):
+    """
+    flask komutları:
+        flask batch-write --plan "reading:all:20,listening:B1:10"
+        flask batch-ingest batch_results.jsonl
+        flask vocab-rand-keys [--reshuffle]
+        flask vocab-pos-backfill [--rebuild]
+        flask vocab-level-ranks
+        flask vocab-import words.csv [--chunk-size 2000] [--dry-run]
+        flask vocab-export vocab.jsonl [--format ndjson|csv]
+        flask vocab-search-index
+        flask translation-cache-warm [--limit 1000] [--source en --target tr] [--memory]
+        flask translation-cache-prune [--max-rows 100000]
+    """
+
+    @app.cli.command("batch-write")
+    @click.option("--plan", "plan_spec", required=True, help='Örn: "reading:B1:10,listening:all:5"')
+    @click.option("--out", default="batch_requests.jsonl", show_default=True)
+    @click.option("--manifest", default="batch_manifest.json", show_default=True)
+    def batch_write(plan_spec, out, manifest):
+        """Batch API için ders istek dosyası yazar."""
+        result = write_batch_file(parse_plan(plan_spec), out, manifest)
+        click.echo(f"{result['written']} istek yazıldı ({result['skipped']} atlandı) -> {out}, manifest: {manifest}")
+
+    @app.cli.command("batch-ingest")
+    @click.argument("results")
+    @click.option("--manifest", default="batch_manifest.json", show_default=True)
+    def batch_ingest(results, manifest):
+        """Batch API sonuç dosyasını doğrulayıp lesson pool'a yazar."""
+        report = ingest_batch_results(results, manifest)
+        click.echo(
+            f"stored={report['stored']} repaired={report['repaired']} invalid={report['invalid']} "
+            f"failed={report['failed']} unknown={report['unknown']}"
+        )
+
+    @app.cli.command("vocab-rand-keys")
+    @click.option("--reshuffle", is_flag=True, help="Tüm kelimelerin rand_key'ini yeniden dağıt")
+    def vocab_rand_keys(reshuffle):
+        """Target word örneklemesi için vocab.rand_key değerlerini doldurur."""
+        updated = backfill_vocab_rand_keys(reshuffle=reshuffle)
+        click.echo(f"{updated} kelimenin rand_key'i güncellendi.")
+
+    @app.cli.command("vocab-pos-backfill")
+    @click.option("--rebuild", is_flag=True, help="vocab_pos tablosunu baştan üret")
+    def vocab_pos_backfill(rebuild):
+        """word_type metinlerinden normalize vocab_pos satırlarını üretir."""
+        inserted = backfill_vocab_pos(rebuild=rebuild)
+        click.echo(f"{inserted} POS satırı işlendi.")
+
+    @app.cli.command("vocab-level-ranks")
+    def vocab_level_ranks():
+        """Sözlük listesinin sıralaması için vocab.level_rank'i vocab_levels'tan yeniden hesaplar."""
+        updated = backfill_vocab_level_ranks()
+        click.echo(f"{updated} kelimenin level_rank'i güncellendi.")
+
+    @app.cli.command("vocab-import")
+    @click.argument("path")
+    @click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None, help="Varsayılan: dosya uzantısı")
+    @click.option("--chunk-size", default=CHUNK_SIZE, show_default=True)
+    @click.option("--dry-run", is_flag=True, help="Sadece doğrula, yazma")
+    def vocab_import(path, fmt, chunk_size, dry_run):
+        """CSV / JSONL dosyasından toplu kelime ekler (çok değerli alanlar "|" ile ayrılır)."""
+        fmt = fmt or detect_format(path)
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            report = import_vocab(iter_import_rows(f, fmt), chunk_size=chunk_size, dry_run=dry_run)
+        click.echo(
+            f"read={report['read']} imported={report['imported']} duplicates={report['duplicates']} "
+            f"invalid={report['invalid']} failed={report['failed']} unknown_topics={report['unknown_topics']} "
+            f"seconds={report['seconds']} rows/sec={report['rows_per_sec']}"
+        )
+        for error in report["errors"]:
+            click.echo(f"  line {error['line']}: {error['error']}")
+
+    @app.cli.command("vocab-export")
+    @click.argument("path")
+    @click.option("--format", "fmt", type=click.Choice(list(EXPORT_FORMATS)), default="ndjson", show_default=True)
+    def vocab_export(path, fmt):
+        """Tüm sözlüğü (anlam, örnek, seviye, tür, topic dahil) dosyaya akış halinde yazar."""
+        lines = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for chunk in export_vocab(fmt):
+                f.write(chunk)
+                lines += 1
+        click.echo(f"{lines} satır yazıldı -> {path}")
+
+    @app.cli.command("vocab-search-index")
+    def vocab_search_index():
+        """Kelime ve anlam araması için FULLTEXT (ngram) index'lerini ekler."""
+        added = ensure_vocab_search_indexes()
+        click.echo(f"Eklenen index'ler: {', '.join(added)}" if added else "Index'ler zaten mevcut.")
+
+    @app.cli.command("translation-cache-warm")
+    @click.option("--limit", type=int, default=None, help="En fazla kaç kelime (varsayılan: tümü)")
+    @click.option("--source", default="en", show_default=True)
+    @click.option("--target", default="tr", show_default=True)
+    @click.option("--delay", type=float, default=0.1, show_default=True, help="İstekler arası bekleme (saniye)")
+    @click.option("--memory", is_flag=True, help="Sadece tablodaki son kayıtları bellek cache'ine yükle")
+    def translation_cache_warm(limit, source, target, delay, memory):
+        """vocab kelimelerinin çevirilerini translation_cache tablosuna önceden yazar."""
+        if memory:
+            loaded = translation_cache.warm_memory(limit or TRANSLATION_CACHE_PRELOAD)
+            click.echo(f"{loaded} çeviri belleğe yüklendi.")
+            return
+        written, skipped, failed = translation_cache.warm_from_vocab(source, target, limit=limit, delay=delay)
+        click.echo(f"written={written} skipped={skipped} failed={failed}")
+
+    @app.cli.command("translation-cache-prune")
+    @click.option("--max-rows", type=int, default=TRANSLATION_CACHE_MAX_ROWS, show_default=True)
+    def translation_cache_prune(max_rows):
+        """Süresi dolan ve en son kullanılan max-rows satırın dışında kalan çevirileri siler."""
+        deleted = translation_cache.prune(max_rows)
+        click.echo(f"{deleted} satır silindi.")
@@ -1,7 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import text
+import base64
+import json
 import logging
+import os
+import re
+import threading
 from datetime import datetime, timedelta
+from services.cache import TTLCache
 
 LEVEL_BASE_XP = {
     'A1': 0,
@@ -60,7 +66,11 @@ def create_tables_if_not_exist():
             example TEXT,
             level ENUM('A1', 'A2', 'B1', 'B2', 'C1', 'C2') DEFAULT 'A1',
             word_type VARCHAR(50),
-            UNIQUE KEY unique_word (word)
+            rand_key DOUBLE NOT NULL DEFAULT 0,
+            level_rank TINYINT NOT NULL DEFAULT 99,
+            UNIQUE KEY unique_word (word),
+            KEY idx_level_rand (level, rand_key),
+            KEY idx_rank_word (level_rank, word)
         )
         """,
         """
@@ -109,6 +119,7 @@ def create_tables_if_not_exist():
             vocab_id INT,
             topic_id INT,
             PRIMARY KEY (vocab_id, topic_id),
+            KEY idx_topic_vocab (topic_id, vocab_id),
             FOREIGN KEY (vocab_id) REFERENCES vocab(id) ON DELETE CASCADE,
             FOREIGN KEY (topic_id) REFERENCES topics(id) ON DELETE CASCADE
         )
@@ -139,6 +150,73 @@ def create_tables_if_not_exist():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
         )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS lesson_pool (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            skill VARCHAR(20) NOT NULL,
+            level ENUM('A1', 'A2', 'B1', 'B2', 'C1', 'C2') NOT NULL,
+            payload MEDIUMTEXT NOT NULL,
+            target_words TEXT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_skill_level (skill, level, id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS lesson_pool_refills (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            skill VARCHAR(20) NOT NULL,
+            level ENUM('A1', 'A2', 'B1', 'B2', 'C1', 'C2') NOT NULL,
+            reserved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_skill_level (skill, level, reserved_at)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS lesson_cache (
+            cache_key CHAR(64) PRIMARY KEY,
+            skill VARCHAR(20) NOT NULL,
+            payload MEDIUMTEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS llm_usage (
+            bucket_start DATETIME NOT NULL,
+            call_site VARCHAR(64) NOT NULL,
+            user_id INT NOT NULL DEFAULT 0,
+            model VARCHAR(64) NOT NULL,
+            calls INT NOT NULL DEFAULT 0,
+            errors INT NOT NULL DEFAULT 0,
+            prompt_tokens BIGINT NOT NULL DEFAULT 0,
+            completion_tokens BIGINT NOT NULL DEFAULT 0,
+            total_ms BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket_start, call_site, user_id, model),
+            KEY idx_call_site (call_site, bucket_start)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS vocab_pos (
+            vocab_id INT NOT NULL,
+            level ENUM('A1', 'A2', 'B1', 'B2', 'C1', 'C2') NOT NULL,
+            pos ENUM('noun', 'verb', 'adjective', 'adverb') NOT NULL,
+            PRIMARY KEY (vocab_id, pos),
+            KEY idx_level_pos (level, pos, vocab_id),
+            FOREIGN KEY (vocab_id) REFERENCES vocab(id) ON DELETE CASCADE ON UPDATE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS translation_cache (
+            cache_key CHAR(64) PRIMARY KEY,
+            source_text VARCHAR(500) NOT NULL,
+            source_lang VARCHAR(10) NOT NULL,
+            target_lang VARCHAR(10) NOT NULL,
+            payload TEXT NOT NULL,
+            hits INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            KEY idx_last_used (last_used_at),
+            KEY idx_created (created_at)
+        )
         """
 
 
@@ -148,10 +226,231 @@ def create_tables_if_not_exist():
         with db.engine.connect() as conn:
             for query in table_queries:
                 conn.execute(text(query))
-            print("Veritabanı tabloları hazır.")
+        ensure_vocab_sampling_columns()
+        ensure_vocab_listing_columns()
+        ensure_lesson_pool_columns()
+        ensure_translation_cache_indexes()
+        print("Veritabanı tabloları hazır.")
     except Exception as e:
         print(f"Tablo oluşturma hatası: {e}")
 
+def _column_exists(conn, table, column):
+    sql = """
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column
+    """
+    return conn.execute(text(sql), {"table": table, "column": column}).scalar() > 0
+
+def _index_exists(conn, table, index):
+    sql = """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :index
+    """
+    return conn.execute(text(sql), {"table": table, "index": index}).scalar() > 0
+
+def ensure_vocab_sampling_columns():
+    """
+    Eski kurulumlarda kelime seçimi için gereken kolon ve index'leri ekler:
+    vocab.rand_key + (level, rand_key) index'i, vocab_topics (topic_id, vocab_id) index'i.
+    vocab_pos boşsa word_type metinlerinden doldurur.
+    """
+    with db.engine.connect() as conn:
+        with conn.begin():
+            if not _column_exists(conn, "vocab", "rand_key"):
+                conn.execute(text("ALTER TABLE vocab ADD COLUMN rand_key DOUBLE NOT NULL DEFAULT 0"))
+            if not _index_exists(conn, "vocab", "idx_level_rand"):
+                conn.execute(text("ALTER TABLE vocab ADD KEY idx_level_rand (level, rand_key)"))
+            if not _index_exists(conn, "vocab_topics", "idx_topic_vocab"):
+                conn.execute(text("ALTER TABLE vocab_topics ADD KEY idx_topic_vocab (topic_id, vocab_id)"))
+            pos_empty = conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM vocab_pos)")).scalar()
+    backfill_vocab_rand_keys()
+    if pos_empty:
+        backfill_vocab_pos()
+
+def ensure_vocab_listing_columns():
+    """
+    Eski kurulumlarda sözlük listesinin keyset sayfalaması için vocab.level_rank kolonunu
+    ve (level_rank, word) index'ini ekler; kolon yeni eklendiyse vocab_levels'tan doldurur.
+    """
+    with db.engine.connect() as conn:
+        with conn.begin():
+            added = not _column_exists(conn, "vocab", "level_rank")
+            if added:
+                conn.execute(text(f"ALTER TABLE vocab ADD COLUMN level_rank TINYINT NOT NULL DEFAULT {VOCAB_NO_LEVEL_RANK}"))
+            if not _index_exists(conn, "vocab", "idx_rank_word"):
+                conn.execute(text("ALTER TABLE vocab ADD KEY idx_rank_word (level_rank, word)"))
+    if added:
+        backfill_vocab_level_ranks()
+
+def ensure_lesson_pool_columns():
+    """Eski kurulumlarda lesson_pool.target_words kolonunu ekler (kelime tekrarını azaltmak için)."""
+    with db.engine.connect() as conn:
+        with conn.begin():
+            if not _column_exists(conn, "lesson_pool", "target_words"):
+                conn.execute(text("ALTER TABLE lesson_pool ADD COLUMN target_words TEXT NULL AFTER payload"))
+
+def ensure_translation_cache_indexes():
+    """Eski kurulumlarda translation_cache.created_at index'ini ekler (TTL silmesi tabloyu taramasın)."""
+    with db.engine.connect() as conn:
+        with conn.begin():
+            if not _index_exists(conn, "translation_cache", "idx_created"):
+                conn.execute(text("ALTER TABLE translation_cache ADD KEY idx_created (created_at)"))
+
+# FULLTEXT ngram index'leri büyük tablolarda uzun sürer; startup'ta değil
+# "flask vocab-search-index" ile eklenir. Varlığı bir kez kontrol edilip saklanır.
+_search_indexes_exist = None
+
+def vocab_search_indexes_exist():
+    global _search_indexes_exist
+    if _search_indexes_exist is None:
+        try:
+            with db.engine.connect() as conn:
+                _search_indexes_exist = (
+                    _index_exists(conn, "vocab", "ft_vocab_word")
+                    and _index_exists(conn, "vocab_meanings", "ft_vocab_meaning")
+                )
+        except Exception as e:
+            logging.error(f"Search index kontrol hatası: {e}")
+            return False
+    return _search_indexes_exist
+
+def ensure_vocab_search_indexes():
+    """vocab.word ve vocab_meanings.meaning üzerine FULLTEXT (ngram parser) index ekler."""
+    global _search_indexes_exist
+    added = []
+    with db.engine.connect() as conn:
+        with conn.begin():
+            if not _index_exists(conn, "vocab", "ft_vocab_word"):
+                conn.execute(text("ALTER TABLE vocab ADD FULLTEXT KEY ft_vocab_word (word) WITH PARSER ngram"))
+                added.append("ft_vocab_word")
+            if not _index_exists(conn, "vocab_meanings", "ft_vocab_meaning"):
+                conn.execute(text("ALTER TABLE vocab_meanings ADD FULLTEXT KEY ft_vocab_meaning (meaning) WITH PARSER ngram"))
+                added.append("ft_vocab_meaning")
+    _search_indexes_exist = True
+    return added
+
+# Serbest metin kelime türü -> normalize POS (İngilizce kısaltmalar + Türkçe karşılıklar)
+POS_ALIASES = {
+    "noun": ["n", "n.", "noun", "nouns", "isim"],
+    "verb": ["v", "v.", "vt", "vt.", "vi", "vi.", "verb", "verbs", "fiil"],
+    "adjective": ["adj", "adj.", "adjective", "adjectives", "sıfat", "sifat"],
+    "adverb": ["adv", "adv.", "adverb", "adverbs", "zarf"],
+}
+_POS_LOOKUP = {alias: pos for pos, aliases in POS_ALIASES.items() for alias in aliases}
+
+def parse_pos_tags(*word_types):
+    """
+    "n., v." / "noun" / "phrasal verb" / "sıfat" gibi değerleri {"noun", "verb", ...} kümesine çevirir.
+    """
+    tags = set()
+    for word_type in word_types:
+        for token in re.split(r"[,;/|()\s]+", (word_type or "").lower()):
+            pos = _POS_LOOKUP.get(token)
+            if pos:
+                tags.add(pos)
+    return tags
+
+def sync_vocab_pos(conn, vocab_id, word_types=None):
+    """
+    vocab_pos satırlarını vocab.word_type + vocab_word_types'tan yeniden üretir.
+    Çağıranın transaction'ı içinde çalışır.
+    """
+    row = conn.execute(text("SELECT level, word_type FROM vocab WHERE id = :vid"), {"vid": vocab_id}).fetchone()
+    if not row:
+        return
+    if word_types is None:
+        word_types = [r[0] for r in conn.execute(
+            text("SELECT word_type FROM vocab_word_types WHERE vocab_id = :vid"), {"vid": vocab_id}
+        ).fetchall()]
+
+    conn.execute(text("DELETE FROM vocab_pos WHERE vocab_id = :vid"), {"vid": vocab_id})
+    tags = parse_pos_tags(row[1], *word_types)
+    if tags:
+        conn.execute(
+            text("INSERT INTO vocab_pos (vocab_id, level, pos) VALUES (:vid, :level, :pos)"),
+            [{"vid": vocab_id, "level": row[0], "pos": pos} for pos in sorted(tags)]
+        )
+
+def vocab_level_rank(levels):
+    """Kelimenin en düşük seviyesinin VOCAB_LEVEL_ORDER'daki sırası, seviyesi yoksa VOCAB_NO_LEVEL_RANK."""
+    ranks = [VOCAB_LEVEL_ORDER.index(lvl) for lvl in levels if lvl in VOCAB_LEVEL_ORDER]
+    return min(ranks) if ranks else VOCAB_NO_LEVEL_RANK
+
+def vocab_level_rank_sql(column):
+    """
+    vocab_level_rank'in SQL karşılığı (GROUP BY vocab_id ile kullanılan aggregate).
+    FIELD 1'den sayar ve listede olmayan seviyede 0 döner: 0'lar NULLIF ile atlanır, sonuç 0 tabanına çekilir.
+    Hiç geçerli seviye yoksa NULL döner; çağıran COALESCE(..., VOCAB_NO_LEVEL_RANK) uygular.
+    """
+    levels_sql = ", ".join(f"'{lvl}'" for lvl in VOCAB_LEVEL_ORDER)
+    return f"MIN(NULLIF(FIELD({column}, {levels_sql}), 0)) - 1"
+
+def sync_vocab_level_rank(conn, vocab_id):
+    """
+    vocab.level_rank'i vocab_levels'tan yeniden hesaplar.
+    Çağıranın transaction'ı içinde çalışır.
+    """
+    levels = [r[0] for r in conn.execute(
+        text("SELECT level FROM vocab_levels WHERE vocab_id = :vid"), {"vid": vocab_id}
+    ).fetchall()]
+    conn.execute(
+        text("UPDATE vocab SET level_rank = :rank WHERE id = :vid"),
+        {"rank": vocab_level_rank(levels), "vid": vocab_id}
+    )
+
+def backfill_vocab_level_ranks():
+    """Tüm kelimelerin level_rank'ini vocab_levels'tan doldurur (tek seferlik migration)."""
+    sql = f"""
+        UPDATE vocab v
+        LEFT JOIN (
+            SELECT vocab_id, {vocab_level_rank_sql("level")} AS level_rank
+            FROM vocab_levels
+            GROUP BY vocab_id
+        ) l ON l.vocab_id = v.id
+        SET v.level_rank = COALESCE(l.level_rank, {VOCAB_NO_LEVEL_RANK})
+    """
+    with db.engine.connect() as conn:
+        with conn.begin():
+            return conn.execute(text(sql)).rowcount
+
+def backfill_vocab_pos(rebuild=False):
+    """
+    Mevcut word_type metinlerinden vocab_pos'u doldurur (tek seferlik migration).
+    rebuild=True ise tablo baştan üretilir (ör. vocab.level toplu değiştiyse).
+    """
+    sql = """
+        SELECT v.id, v.level, v.word_type, GROUP_CONCAT(vwt.word_type SEPARATOR ',')
+        FROM vocab v
+        LEFT JOIN vocab_word_types vwt ON vwt.vocab_id = v.id
+        GROUP BY v.id, v.level, v.word_type
+    """
+    with db.engine.connect() as conn:
+        with conn.begin():
+            if rebuild:
+                conn.execute(text("DELETE FROM vocab_pos"))
+            rows = conn.execute(text(sql)).fetchall()
+            params = [
+                {"vid": vid, "level": level, "pos": pos}
+                for vid, level, word_type, extra in rows
+                for pos in sorted(parse_pos_tags(word_type, extra))
+            ]
+            for i in range(0, len(params), 1000):
+                conn.execute(
+                    text("INSERT IGNORE INTO vocab_pos (vocab_id, level, pos) VALUES (:vid, :level, :pos)"),
+                    params[i:i + 1000]
+                )
+    return len(params)
+
+def backfill_vocab_rand_keys(reshuffle=False):
+    """
+    rand_key atanmamış (0) kelimelere rastgele anahtar verir.
+    reshuffle=True ise tüm anahtarlar yeniden dağıtılır (ardışık seçimlerin korelasyonunu kırmak için).
+    """
+    sql = "UPDATE vocab SET rand_key = RAND()" if reshuffle else "UPDATE vocab SET rand_key = RAND() WHERE rand_key = 0"
+    with db.engine.connect() as conn:
+        with conn.begin():
+            return conn.execute(text(sql)).rowcount
+
 # ==========================================
 # KULLANICI İŞLEMLERİ
 # ==========================================
@@ -228,131 +527,202 @@ def update_user_password(user_id, new_hashed_password):
 # KELİME (VOCAB) İŞLEMLERİ
 # ==========================================
 
-def get_vocab_details(vocab_id):
+# Vocab kartı ve cevap kontrolü her istekte aynı kelimeyi okur; vocab yazımında ilgili kayıt düşürülür.
+# Invalidation sadece bu process'te çalışır; diğer worker'lardaki eski kayıtlar TTL ile düşer.
+VOCAB_DETAILS_CACHE_TTL = int(os.getenv("VOCAB_DETAILS_CACHE_TTL", 300))
+vocab_details_cache = TTLCache(
+    maxsize=int(os.getenv("VOCAB_DETAILS_CACHE_SIZE", 2000)),
+    ttl=VOCAB_DETAILS_CACHE_TTL
+)
+
+def get_vocab_details(vocab_id, use_cache=True):
     """
     Tek bir kelimenin detaylarını (anlamlar ve örnekler dahil) getirir.
+    Dönüş: (id, word, meanings, examples, levels, word_types)
     """
     try:
-        with db.engine.connect() as conn:
-            # 1. Ana tabloyu çek
-            vocab_sql = "SELECT id, word, meaning, example FROM vocab WHERE id = :vid"
-            row = conn.execute(text(vocab_sql), {"vid": vocab_id}).fetchone()
-            
-            if not row: return None
-            
-            vid, word, single_meaning, single_example = row
-
-            # 2. Anlamları çek
-            m_sql = "SELECT meaning FROM vocab_meanings WHERE vocab_id = :vid ORDER BY id"
-            meanings = [r[0] for r in conn.execute(text(m_sql), {"vid": vid}).fetchall()]
-
-            # 3. Örnekleri çek
-            e_sql = "SELECT example FROM vocab_examples WHERE vocab_id = :vid ORDER BY id"
-            examples = [r[0] for r in conn.execute(text(e_sql), {"vid": vid}).fetchall()]
+        vocab_id = int(vocab_id)
+    except (TypeError, ValueError):
+        return None
 
-            # 4. Seviyeleri çek (varsayılan olarak alt tabloda saklanıyorsa)
-            l_sql = "SELECT level FROM vocab_levels WHERE vocab_id = :vid ORDER BY id"
-            levels = [r[0] for r in conn.execute(text(l_sql), {"vid": vid}).fetchall()]
+    if use_cache:
+        cached = vocab_details_cache.get(vocab_id)
+        if cached is not None:
+            return _copy_vocab_details(cached)
 
-            # 5. Kelime türlerini çek
-            t_sql = "SELECT word_type FROM vocab_word_types WHERE vocab_id = :vid ORDER BY id"
-            word_types = [r[0] for r in conn.execute(text(t_sql), {"vid": vid}).fetchall()]
+    details = _load_vocab_details(vocab_id)
+    if details is not None and use_cache:
+        vocab_details_cache.set(vocab_id, details)
+        return _copy_vocab_details(details)
+    return details
 
-            # 6. Eğer alt tablolarda yoksa ana tablodaki stringi parçala (Fallback)
-            if not meanings and single_meaning:
-                meanings = [m.strip() for m in single_meaning.split(';') if m.strip()]
-            if not examples and single_example:
-                examples = [e.strip() for e in single_example.split(';') if e.strip()]
+def _copy_vocab_details(details):
+    # Çağıranlar listeleri değiştirirse cache bozulmasın
+    return (details[0], details[1]) + tuple(list(items) for items in details[2:])
 
-            return (vid, word, meanings, examples, levels, word_types)
+def _load_vocab_details(vocab_id):
+    """
+    Ana tablo ve dört alt tablo tek sorguda (UNION ALL) okunur.
+    kind sütunu satırın hangi listeye ait olduğunu, ord alt tablodaki sırayı belirtir.
+    """
+    sql = """
+        SELECT 'vocab' AS kind, 0 AS ord, word AS value, meaning AS extra_meaning, example AS extra_example
+        FROM vocab WHERE id = :vid
+        UNION ALL
+        SELECT 'meaning', id, meaning, NULL, NULL FROM vocab_meanings WHERE vocab_id = :vid
+        UNION ALL
+        SELECT 'example', id, example, NULL, NULL FROM vocab_examples WHERE vocab_id = :vid
+        UNION ALL
+        SELECT 'level', id, level, NULL, NULL FROM vocab_levels WHERE vocab_id = :vid
+        UNION ALL
+        SELECT 'word_type', id, word_type, NULL, NULL FROM vocab_word_types WHERE vocab_id = :vid
+        ORDER BY kind, ord
+    """
+    try:
+        with db.engine.connect() as conn:
+            rows = conn.execute(text(sql), {"vid": vocab_id}).fetchall()
     except Exception as e:
         print(f"Vocab detay hatası: {e}")
         return None
 
+    word = None
+    single_meaning = single_example = None
+    lists = {"meaning": [], "example": [], "level": [], "word_type": []}
+    for kind, _, value, extra_meaning, extra_example in rows:
+        if kind == "vocab":
+            word, single_meaning, single_example = value, extra_meaning, extra_example
+        else:
+            lists[kind].append(value)
+
+    # Kelime ana tabloda yoksa alt tablolardaki artıklar önemsizdir
+    if word is None:
+        return None
+
+    meanings, examples = lists["meaning"], lists["example"]
+
+    # Eğer alt tablolarda yoksa ana tablodaki stringi parçala (Fallback)
+    if not meanings and single_meaning:
+        meanings = [m.strip() for m in single_meaning.split(';') if m.strip()]
+    if not examples and single_example:
+        examples = [e.strip() for e in single_example.split(';') if e.strip()]
+
+    return (vocab_id, word, meanings, examples, lists["level"], lists["word_type"])
+
 # Sitenin sözlük kısmı için optimize edilmiş toplu çekme
+VOCAB_LEVEL_ORDER = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+# Seviyesi olmayan kelimeler listenin sonuna
+VOCAB_NO_LEVEL_RANK = 99
+
 def get_all_vocabs_with_details(letter=None):
     """
-    OPTIMIZE VE SIRALI VERSİYON:
-    1. SQL ile harfe göre filtreler.
-    2. Python ile A1 -> C1 sırasına göre dizer.
+    Harfe göre filtrelenmiş tüm kelimeler; en düşük seviye (A1 -> C2), sonra alfabetik sıralı.
+    Sıralama SQL'de yapılır, sayfalı okuma için get_vocab_page kullanılır.
     """
     try:
-        # 1. SQL SORGUSU (Aynı kalıyor)
-        base_sql = """
-            SELECT 
-                v.id, 
-                v.word,
-                GROUP_CONCAT(DISTINCT vm.meaning SEPARATOR '||') as meanings,
-                GROUP_CONCAT(DISTINCT ve.example SEPARATOR '||') as examples,
-                GROUP_CONCAT(DISTINCT vl.level SEPARATOR '||') as levels,
-                GROUP_CONCAT(DISTINCT vt.word_type SEPARATOR '||') as word_types
-            FROM vocab v
-            LEFT JOIN vocab_meanings vm ON v.id = vm.vocab_id
-            LEFT JOIN vocab_examples ve ON v.id = ve.vocab_id
-            LEFT JOIN vocab_levels vl ON v.id = vl.vocab_id
-            LEFT JOIN vocab_word_types vt ON v.id = vt.vocab_id
-        """
+        vocabs, _ = get_vocab_page(letter=letter, limit=None)
+        return vocabs
+    except Exception as e:
+        print(f"Toplu vocab çekme hatası: {e}")
+        return []
 
-        params = {}
-        if letter and letter != 'ALL':
-            base_sql += " WHERE v.word LIKE :pattern "
-            params['pattern'] = f"{letter}%"
-        
-        base_sql += " GROUP BY v.id "
-        
-        with db.engine.connect() as conn:
-            rows = conn.execute(text(base_sql), params).fetchall()
-            
-        vocabs = []
-        for r in rows:
-            vid, word, meanings_str, examples_str, levels_str, types_str = r
-
-            meanings_list = meanings_str.split('||') if meanings_str else []
-            examples_list = examples_str.split('||') if examples_str else []
-            levels_list = levels_str.split('||') if levels_str else []
-            types_list = types_str.split('||') if types_str else []
-
-            vocabs.append({
-                'id': vid,
-                'word': word,
-                'meanings': meanings_list,
-                'examples': examples_list,
-                'levels': levels_list,
-                'word_types': types_list
-            })
-
-        # --- YENİ EKLENEN KISIM: SIRALAMA MANTIĞI ---
-        
-        # Seviye öncelik haritası (Sıralama için puanlama)
-        level_priority = {
-            'A1': 1, 
-            'A2': 2, 
-            'B1': 3, 
-            'B2': 4, 
-            'C1': 5, 
-            'C2': 6
-        }
-
-        def sort_key(item):
-            # 1. Kriter: Seviye (En düşük seviye öne gelir)
-            # Eğer kelimenin seviyesi yoksa (boş liste), sona at (99 puan)
-            first_level = item['levels'][0] if item['levels'] else None
-            priority = level_priority.get(first_level, 99)
-            
-            # 2. Kriter: Kelimenin kendisi (Alfabetik)
-            # Eğer seviyeler aynıysa (örn: iki tane A1 kelimesi), alfabetik sırala
-            return (priority, item['word'].lower())
+def get_vocab_page(letter=None, limit=50, cursor=None):
+    """
+    Keyset pagination: sıralama (level_rank, word, id), cursor son satırın bu üçlüsüdür.
+    limit=None ise filtredeki tüm kelimeler döner.
+    Dönüş: (kelime listesi, sonraki sayfanın cursor'ı veya None)
 
-        # Listeyi bu anahtara göre sırala
-        vocabs.sort(key=sort_key)
-        
-        # -------------------------------------------
+    1. level_rank vocab'da saklanır (vocab_levels yazımında sync_vocab_level_rank), cursor koşulu
+       WHERE'dedir; sayfa (level_rank, word) index'i üzerinde seek ile bulunur, GROUP BY / HAVING yoktur.
+    2. Alt tablolar her kelime için ayrı ayrı JSON_ARRAYAGG ile toplanır
+       (dört LEFT JOIN'in satır çarpımı ve GROUP_CONCAT kırpması olmaz).
+       JSON_ARRAYAGG sıra garantisi vermediği için (id, değer) çiftleri toplanıp Python'da id'ye göre sıralanır.
+    """
+    where = []
+    params = {}
+    if letter and letter != 'ALL':
+        where.append("v.word LIKE :pattern")
+        params['pattern'] = f"{letter}%"
 
-        return vocabs
+    after = decode_vocab_cursor(cursor)
+    if after:
+        # İlk koşul range seek içindir; satır karşılaştırması açık yazılır (row constructor index kullanmayabilir)
+        where.append("""v.level_rank >= :after_rank
+            AND (v.level_rank > :after_rank
+                 OR (v.level_rank = :after_rank AND (v.word > :after_word OR (v.word = :after_word AND v.id > :after_id))))""")
+        params.update(after_rank=after[0], after_word=after[1], after_id=after[2])
 
-    except Exception as e:
-        print(f"Toplu vocab çekme hatası: {e}")
+    limit_sql = ""
+    if limit:
+        limit_sql = "LIMIT :limit"
+        params['limit'] = int(limit)
+
+    sql = f"""
+        SELECT
+            v.id,
+            v.word,
+            v.level_rank,
+            (SELECT JSON_ARRAYAGG(JSON_ARRAY(vm.id, vm.meaning)) FROM vocab_meanings vm WHERE vm.vocab_id = v.id) AS meanings,
+            (SELECT JSON_ARRAYAGG(JSON_ARRAY(ve.id, ve.example)) FROM vocab_examples ve WHERE ve.vocab_id = v.id) AS examples,
+            (SELECT JSON_ARRAYAGG(vl.level) FROM vocab_levels vl WHERE vl.vocab_id = v.id) AS levels,
+            (SELECT JSON_ARRAYAGG(JSON_ARRAY(vt.id, vt.word_type)) FROM vocab_word_types vt WHERE vt.vocab_id = v.id) AS word_types
+        FROM vocab v
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY v.level_rank, v.word, v.id
+        {limit_sql}
+    """
+
+    with db.engine.connect() as conn:
+        rows = conn.execute(text(sql), params).fetchall()
+
+    vocabs = [vocab_listing_row(r) for r in rows]
+
+    next_cursor = None
+    if limit and len(rows) == int(limit):
+        last = rows[-1]
+        next_cursor = encode_vocab_cursor(last[2], last[1], last[0])
+    return vocabs, next_cursor
+
+def vocab_listing_row(row):
+    vid, word, _, meanings, examples, levels, word_types = row
+    levels = _unique(_json_list(levels))
+    # Listedeki rozet levels[0]'ı gösterir; sıralamadaki seviye ile aynı olsun
+    levels.sort(key=lambda lvl: VOCAB_LEVEL_ORDER.index(lvl) if lvl in VOCAB_LEVEL_ORDER else VOCAB_NO_LEVEL_RANK)
+    return {
+        'id': vid,
+        'word': word,
+        'meanings': _unique(ordered_json_list(meanings)),
+        'examples': _unique(ordered_json_list(examples)),
+        'levels': levels,
+        'word_types': _unique(ordered_json_list(word_types))
+    }
+
+def _json_list(value):
+    if value is None:
         return []
+    if isinstance(value, (bytes, str)):
+        value = json.loads(value)
+    return [v for v in value if v is not None]
+
+def ordered_json_list(value):
+    """JSON_ARRAYAGG(JSON_ARRAY(id, değer)) sonucunu id sırasına göre değer listesine çevirir."""
+    pairs = sorted(_json_list(value), key=lambda pair: pair[0])
+    return [v for _, v in pairs if v is not None]
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+def encode_vocab_cursor(level_rank, word, vocab_id):
+    raw = json.dumps([int(level_rank), word, int(vocab_id)], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_vocab_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        level_rank, word, vocab_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return int(level_rank), str(word), int(vocab_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid vocab cursor")
 
 # Admin panelinde sadece liste göstermek için (Daha hafif versiyon)
 def get_all_vocabs():
@@ -365,6 +735,40 @@ def get_all_vocabs():
         print(f"Vocab listesi hatası: {e}")
         return []
 
+# ==========================================
+# VOCAB DEĞİŞİKLİK BİLDİRİMİ
+# ==========================================
+
+# Vocab yazıldığında process içi index / cache'lerin haberdar olması için
+_vocab_listeners = []
+_vocab_version = 0
+_vocab_version_lock = threading.Lock()
+
+def register_vocab_listener(listener):
+    """listener(action, vocab_id) her başarılı vocab yazımından sonra çağrılır."""
+    _vocab_listeners.append(listener)
+
+def get_vocab_version():
+    return _vocab_version
+
+def notify_vocab_change(action, vocab_id=None):
+    global _vocab_version
+    with _vocab_version_lock:
+        _vocab_version += 1
+    for listener in list(_vocab_listeners):
+        try:
+            listener(action, vocab_id)
+        except Exception as e:
+            logging.error(f"Vocab listener hatası: {e}")
+
+def _invalidate_vocab_details(action, vocab_id):
+    if vocab_id is None:
+        vocab_details_cache.clear()
+    else:
+        vocab_details_cache.pop(int(vocab_id))
+
+register_vocab_listener(_invalidate_vocab_details)
+
 def add_vocab_with_details(word, meanings=None, examples=None, levels=None, word_types=None):
     """
     Yeni kelime, anlamlar ve örnekler ekler. Transaction kullanır.
@@ -400,7 +804,7 @@ def add_vocab_with_details(word, meanings=None, examples=None, levels=None, word
                     return existing[0]
 
                 # 2. Ana tabloya ekle
-                ins_sql = "INSERT INTO vocab (word, meaning, example) VALUES (:word, :meaning, :example)"
+                ins_sql = "INSERT INTO vocab (word, meaning, example, rand_key) VALUES (:word, :meaning, :example, RAND())"
                 result = conn.execute(text(ins_sql), {"word": word, "meaning": single_meaning, "example": single_example})
                 vid = result.lastrowid
 
@@ -429,7 +833,12 @@ def add_vocab_with_details(word, meanings=None, examples=None, levels=None, word
                     for wt in word_types:
                         if isinstance(wt, str) and wt.strip():
                             conn.execute(text(t_sql), {"vid": vid, "wt": wt.strip()})
+
+                # 7. Normalize POS ve listeleme sırası
+                sync_vocab_pos(conn, vid, [wt for wt in word_types if isinstance(wt, str)])
+                sync_vocab_level_rank(conn, vid)
             
+            notify_vocab_change("add", vid)
             return vid
     except Exception as e:
         print(f"Vocab ekleme hatası: {e}")
@@ -496,7 +905,12 @@ def update_vocab_with_details(vocab_id, word, meanings=None, examples=None, leve
                     for wt in word_types:
                         if isinstance(wt, str) and wt.strip():
                             conn.execute(text(t_sql), {"vid": vocab_id, "wt": wt.strip()})
+
+                # 7. Normalize POS ve listeleme sırası
+                sync_vocab_pos(conn, vocab_id, [wt for wt in word_types if isinstance(wt, str)])
+                sync_vocab_level_rank(conn, vocab_id)
             
+            notify_vocab_change("update", vocab_id)
             return True
     except Exception as e:
         print(f"Vocab güncelleme hatası: {e}")
@@ -1,13 +1,32 @@
-from flask import Blueprint, render_template, jsonify, request
+from flask import Blueprint, render_template, jsonify, request, Response, stream_with_context
 # DÜZELTME: Gerekli fonksiyonları direkt import ediyoruz
 from database import (
     get_all_vocabs, 
     get_all_vocabs_with_details,
+    get_vocab_page,
     add_vocab_with_details, 
     get_vocab_details, 
-    update_vocab_with_details
+    update_vocab_with_details,
+    vocab_details_cache,
+    vocab_search_indexes_exist
 )
 from utils import is_user_logged_in, admin_required 
+from services.lesson_pool import lesson_pool
+from services.lesson_pipeline import get_lesson_cache_stats, get_lesson_schema_stats
+from services.llm_client import get_llm_client_stats
+from services.llm_usage import usage_tracker
+from services.llm_routes import get_routes, load_routes
+from services.vocab_index import vocab_index
+from services.target_word_selector import get_selector_stats
+from services.word_exposure import word_exposure
+from services.vocab_pages import vocab_page_cache
+from services.vocab_import import detect_format, iter_import_rows, import_vocab
+from services.vocab_export import export_vocab, EXPORT_FORMATS
+from services.vocab_search import vocab_search_index
+from services.spell_index import spell_index
+from services.translation import get_translation_stats
+from services.http_client import http_client
+import io
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -20,6 +39,19 @@ def vocab_admin_page():
 @admin_required
 def admin_list_vocabs():
     # word_types ve levels ile birlikte tüm kelimeleri alıp sol tarafta gösteriyoruz
+    # ?limit=&cursor= verilirse keyset sayfalama: yanıttaki next_cursor bir sonraki sayfayı getirir
+    limit = request.args.get('limit', type=int)
+    if limit:
+        try:
+            vocabs, next_cursor = get_vocab_page(
+                letter=request.args.get('letter'),
+                limit=min(limit, 500),
+                cursor=request.args.get('cursor')
+            )
+        except ValueError:
+            return jsonify({'error': 'Geçersiz cursor'}), 400
+        return jsonify({'vocabs': vocabs, 'next_cursor': next_cursor})
+
     try:
         vocabs = get_all_vocabs_with_details()
     except Exception:
@@ -44,12 +76,43 @@ def admin_create_vocab():
     if vid: return jsonify({'success': True, 'id': vid})
     return jsonify({'error': 'Hata'}), 500
 
+@admin_bp.route('/admin/api/vocab/import', methods=['POST'])
+@admin_required
+def admin_import_vocabs():
+    # CSV / JSONL toplu kelime ekleme (form alanı: file, ?dry_run=1 sadece doğrular)
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'Dosya seçiniz'}), 400
+    try:
+        fmt = detect_format(upload.filename)
+    except ValueError:
+        return jsonify({'error': 'Sadece .csv veya .jsonl dosyası yüklenebilir'}), 400
+
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    report = import_vocab(iter_import_rows(stream, fmt), dry_run=request.args.get('dry_run') == '1')
+    return jsonify(report)
+
+@admin_bp.route('/admin/api/vocab/export', methods=['GET'])
+@admin_required
+def admin_export_vocabs():
+    # Tüm sözlüğü ?format=ndjson|csv olarak akış halinde indir (bellek kullanımı sözlük boyutundan bağımsız)
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'format ndjson veya csv olmalı'}), 400
+    _, mimetype, extension = EXPORT_FORMATS[fmt]
+    return Response(
+        stream_with_context(export_vocab(fmt)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=vocab_export.{extension}'}
+    )
+
 @admin_bp.route('/admin/api/vocab/<int:vocab_id>', methods=['GET', 'PUT'])
 @admin_required
 def admin_vocab_detail(vocab_id):
     if request.method == 'GET':
         # bir kelimeye tıkladığında detayları getir
-        details = get_vocab_details(vocab_id)
+        # Düzenleme ekranı her zaman DB'deki güncel hali görsün
+        details = get_vocab_details(vocab_id, use_cache=False)
         if not details: return jsonify({'error': 'Bulunamadı'}), 404
         return jsonify({
             'id': details[0],
@@ -74,4 +137,99 @@ def admin_vocab_detail(vocab_id):
         data.get('word_types', [])
     ):
         return jsonify({'success': True})
-    return jsonify({'error': 'Güncelleme hatası'}), 500
\ No newline at end of file
+    return jsonify({'error': 'Güncelleme hatası'}), 500
+
+@admin_bp.route('/admin/api/lesson_pool', methods=['GET'])
+@admin_required
+def admin_lesson_pool_stats():
+    # Havuz derinliği, refill eşzamanlılığı ve hit/miss sayaçları
+    return jsonify(lesson_pool.get_stats())
+
+@admin_bp.route('/admin/api/lesson_cache', methods=['GET'])
+@admin_required
+def admin_lesson_cache_stats():
+    # Skill bazında cache hit oranları
+    return jsonify(get_lesson_cache_stats())
+
+@admin_bp.route('/admin/api/llm_client', methods=['GET'])
+@admin_required
+def admin_llm_client_stats():
+    # Retry, hata ve circuit breaker durumu
+    return jsonify(get_llm_client_stats())
+
+@admin_bp.route('/admin/api/lesson_schema', methods=['GET'])
+@admin_required
+def admin_lesson_schema_stats():
+    # Skill bazında lokal onarım ve yeniden üretim oranları
+    return jsonify(get_lesson_schema_stats())
+
+@admin_bp.route('/admin/api/llm_usage', methods=['GET'])
+@admin_required
+def admin_llm_usage_report():
+    # Call site / kullanıcı bazında token, süre ve tahmini maliyet (?hours=24)
+    hours = request.args.get('hours', 24, type=int)
+    return jsonify(usage_tracker.get_report(hours=hours))
+
+@admin_bp.route('/admin/api/llm_routes', methods=['GET', 'POST'])
+@admin_required
+def admin_llm_routes():
+    # GET: aktif routing tablosu, POST: config dosyasını yeniden yükle
+    if request.method == 'POST':
+        return jsonify(load_routes())
+    return jsonify(get_routes())
+
+@admin_bp.route('/admin/api/vocab_index', methods=['GET'])
+@admin_required
+def admin_vocab_index_stats():
+    # Build süresi, bellek kullanımı ve refresh sayısı
+    return jsonify(vocab_index.get_stats())
+
+@admin_bp.route('/admin/api/target_words', methods=['GET'])
+@admin_required
+def admin_target_word_stats():
+    # Seçim kaynağı (index / sql) ve SQL yolunda seçim başına sorgu sayısı
+    return jsonify(get_selector_stats())
+
+@admin_bp.route('/admin/api/word_exposure', methods=['GET'])
+@admin_required
+def admin_word_exposure_stats():
+    # Kullanıcı başına görülen kelime filtresi: bellek, kullanıcı sayısı, ortalama sorgu süresi
+    return jsonify(word_exposure.get_stats())
+
+@admin_bp.route('/admin/api/vocab_details_cache', methods=['GET'])
+@admin_required
+def admin_vocab_details_cache_stats():
+    # /get_vocab ve cevap kontrolünün kullandığı kelime detay cache'i
+    return jsonify(vocab_details_cache.stats())
+
+@admin_bp.route('/admin/api/vocab_pages', methods=['GET'])
+@admin_required
+def admin_vocab_pages_stats():
+    # /all_vocabs harf sayfaları: hit oranı, 304 sayısı, render'dan kazanılan süre
+    return jsonify(vocab_page_cache.get_stats())
+
+@admin_bp.route('/admin/api/vocab_search', methods=['GET'])
+@admin_required
+def admin_vocab_search_stats():
+    # Bellek içi arama index'i: build süresi, bellek, FULLTEXT index durumu
+    stats = vocab_search_index.get_stats()
+    stats['fulltext_indexes'] = vocab_search_indexes_exist()
+    return jsonify(stats)
+
+@admin_bp.route('/admin/api/spell_index', methods=['GET'])
+@admin_required
+def admin_spell_index_stats():
+    # /translate_word yazım hatası toleranslı yerel sözlük: bellek, lookup p50/p99, hit sayıları
+    return jsonify(spell_index.get_stats())
+
+@admin_bp.route('/admin/api/translation', methods=['GET'])
+@admin_required
+def admin_translation_stats():
+    # /translate_word: yerel sözlükten cevaplanan oran, dış servise düşen istekler
+    return jsonify(get_translation_stats())
+
+@admin_bp.route('/admin/api/http_client', methods=['GET'])
+@admin_required
+def admin_http_client_stats():
+    # Dış HTTP istekleri: host bazında istek / hata / bekleme ve bağlantı tekrar kullanım oranı
+    return jsonify(http_client.get_stats())
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify, render_template
 import os, json, time, subprocess, logging, difflib
 from datetime import datetime
-from openai import OpenAI
+from services.llm_client import chat_completion
+from services.prompt_builder import output_budget
 import azure.cognitiveservices.speech as speechsdk
 from utils import current_user,placement_completed_required
 from database import get_user_levels, check_skill_cooldown
@@ -10,12 +11,6 @@ from skills.xp_manager import upgrade_user_level, apply_exam_failure, LEVEL_THRE
 
 exam_bp = Blueprint("exam", __name__)
 
-# --- API AYARLARI ---
-try:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except:
-    client = None
-    logging.error("OpenAI Client başlatılamadı.")
 
 UPLOAD_FOLDER = "uploads"
 if not os.path.exists(UPLOAD_FOLDER):
@@ -163,8 +158,10 @@ def generate_reading_listening_exam(skill, level):
         ]
     }}
     """
-    resp = client.chat.completions.create(
+    resp = chat_completion(
+        call_site="generate_reading_listening_exam",
         model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
+        max_tokens=output_budget("exam_reading_listening"),
         temperature=0.4, # Biraz daha yaratıcı olsun ki sorular çeşitlensin
         response_format={"type": "json_object"}
     )
@@ -187,8 +184,10 @@ def generate_writing_exam(level):
         ]
     }}
     """
-    resp = client.chat.completions.create(
+    resp = chat_completion(
+        call_site="generate_writing_exam",
         model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
+        max_tokens=output_budget("exam_writing"),
         temperature=0.5, response_format={"type": "json_object"}
     )
     return jsonify(json.loads(resp.choices[0].message.content))
@@ -208,8 +207,10 @@ def generate_speaking_exam(level):
         ]
     }}
     """
-    resp = client.chat.completions.create(
+    resp = chat_completion(
+        call_site="generate_speaking_exam",
         model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
+        max_tokens=output_budget("exam_speaking"),
         temperature=0.5, response_format={"type": "json_object"}
     )
     return jsonify(json.loads(resp.choices[0].message.content))
@@ -313,7 +314,8 @@ def grade_summary_with_gpt(text, summary, level):
     OUTPUT JSON: {{ "score": (int) }}
     """
     try:
-        resp = client.chat.completions.create(
+        resp = chat_completion(
+            call_site="grade_summary_with_gpt",
             model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
@@ -345,7 +347,8 @@ def grade_writing_exam(data, level):
         OUTPUT JSON: {{ "score": (0-100) }}
         """
         try:
-            resp = client.chat.completions.create(
+            resp = chat_completion(
+                call_site="grade_writing_exam",
                 model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"}
             )
@@ -439,7 +442,8 @@ def evaluate_speaking_content_strict(text, task, level):
     OUTPUT JSON: {{ "score": (int) }}
     """
     try:
-        r = client.chat.completions.create(
+        r = chat_completion(
+            call_site="evaluate_speaking_content_strict",
             model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
         )
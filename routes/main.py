@@ -1,18 +1,21 @@
-from flask import Blueprint, app, render_template, request, jsonify, redirect, flash, send_from_directory, current_app, url_for
+from flask import Blueprint, app, render_template, request, jsonify, redirect, flash, send_from_directory, current_app, url_for, make_response, session
+from markupsafe import Markup
 import os, logging, json, time, subprocess, difflib,string
 import azure.cognitiveservices.speech as speechsdk
-from openai import OpenAI
-from utils import is_user_logged_in, fetch_google_translation, login_required, current_user, placement_completed_required
+from services.llm_client import chat_completion, chat_completion_json, LLMOutputError
+from utils import is_user_logged_in, login_required, current_user, placement_completed_required
 from werkzeug.security import generate_password_hash, check_password_hash
 from database import get_user_by_id, update_user_info, update_user_password
 
 # --- VERİTABANI VE YARDIMCI FONKSİYONLAR ---
 # Artık her şeyi database.py'den çekiyoruz
 from database import (
-    get_all_vocabs_with_details, 
     get_vocab_details,
     get_user_levels 
 )
+from services.vocab_pages import vocab_page_cache
+from services.vocab_search import search_vocab
+from services.translation import resolve_translation
 
 
 main_bp = Blueprint('main', __name__)
@@ -22,14 +25,6 @@ UPLOAD_FOLDER = "uploads"
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-# OpenAI Başlatma
-try:
-    api_key = os.getenv("OPENAI_API_KEY")
-    client = OpenAI(api_key=api_key)
-except Exception as e:
-    logging.warning(f"OpenAI Client yüklenirken hata: {e}")
-    client = None
-
 # Senaryoları Yükle
 SCENARIOS_PATH = os.path.join("data", "scenarios.json")
 SCENARIOS = {}
@@ -85,7 +80,8 @@ def conversation():
         return jsonify({"error": "Invalid input"}), 400
     try:
         # Max tokens ile yanıtı kısa tutarak hızı artırıyoruz
-        response = client.chat.completions.create(
+        response = chat_completion(
+            call_site="conversation",
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": f"You are a friendly English tutor. Topic: {context['title']}. {context['context']}. Correct grammar mistakes gently before replying. Keep answers concise (max 2-3 sentences)."},
@@ -195,9 +191,9 @@ def check_grammar():
 
     try:
         # JSON formatında yanıt zorluyoruz
-        response = client.chat.completions.create(
+        result = chat_completion_json(
+            call_site="check_grammar",
             model="gpt-4o-mini",
-            response_format={"type": "json_object"},
             messages=[
                 {
                     "role": "system", 
@@ -208,8 +204,6 @@ def check_grammar():
             temperature=0.3
         )
         
-        result = json.loads(response.choices[0].message.content)
-        
         # Frontend'in beklediği 'errors' listesini oluştur (offset hesaplaması)
         corrected = result.get("corrected", "")
         mistakes = result.get("mistakes", [])
@@ -234,6 +228,9 @@ def check_grammar():
             "errors": errors
         })
 
+    except LLMOutputError as e:
+        logging.error(f"Grammar Output Error: {e}")
+        return jsonify({'error': 'Gramer kontrolü tamamlanamadı, lütfen tekrar dene.'}), 502
     except Exception as e:
         logging.error(f"Grammar Error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -257,24 +254,65 @@ def all_vocabs_page():
     alphabet = list(string.ascii_uppercase)
     
     try:
-        # 3. Veritabanından SADECE o harfe ait kelimeleri çek
-        vocabs = get_all_vocabs_with_details(letter=selected_letter)
+        # 3. O harfin kelime ızgarası (vocab versiyonu başına bir kez sorgulanıp render edilir)
+        page = vocab_page_cache.get_page(selected_letter)
     except Exception as e:
         logging.error(f"Vocab list error: {e}")
-        vocabs = []
-        
-    return render_template(
+        page = None
+
+    # 4. Izgara değişmediyse tarayıcının kopyası geçerli (layout render edilmez)
+    etag = None
+    if page is not None:
+        etag = vocab_page_cache.etag(page, selected_letter, current_user(), session.get('role'))
+        if request.if_none_match.contains(etag):
+            vocab_page_cache.count_not_modified()
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+
+    if page is None:
+        vocab_grid = Markup(render_template('all_vocabs_grid.html', vocabs=[], selected_letter=selected_letter))
+        vocab_count = 0
+    else:
+        vocab_grid, vocab_count = page["html"], page["count"]
+
+    response = make_response(render_template(
         'all_vocabs.html', 
-        vocabs=vocabs, 
+        vocab_grid=vocab_grid,
+        vocab_count=vocab_count,
         is_logged_in=is_user_logged_in(),
         selected_letter=selected_letter, # Template'te hangi harfin aktif olduğunu göstermek için
         alphabet=alphabet # Harf butonlarını oluşturmak için
-    )
+    ))
+    if page is not None:
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response
+
+@main_bp.route('/api/vocab/search', methods=['GET'])
+@placement_completed_required
+def vocab_search():
+    # ?q=...&mode=prefix|substring|meaning&page=1&limit=20
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'error': 'Arama metni giriniz'}), 400
+    try:
+        result = search_vocab(
+            query,
+            mode=request.args.get('mode', 'prefix'),
+            page=request.args.get('page', 1, type=int),
+            limit=request.args.get('limit', 20, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
 
 @main_bp.route('/translate_word', methods=['POST'])
 def translate_word_proxy():
     data = request.json or {}
-    return jsonify(fetch_google_translation(data.get('word', ''), data.get('source', 'en'), data.get('target', 'tr')))
+    # Önce yerel sözlük (birebir + yazım hatası toleranslı), bulunamazsa dış servis
+    return jsonify(resolve_translation(data.get('word', ''), data.get('source', 'en'), data.get('target', 'tr')))
 
 @main_bp.route('/get_vocab/<int:vocab_id>', methods=['GET'])
 @placement_completed_required
@@ -282,7 +320,7 @@ def get_vocab(vocab_id):
     details = get_vocab_details(vocab_id)
     if details:
         # details now: (id, word, meanings, examples, levels, word_types)
-        return jsonify({
+        response = jsonify({
             'id': details[0],
             'word': details[1],
             'meanings': details[2],
@@ -290,6 +328,11 @@ def get_vocab(vocab_id):
             'levels': details[4] if len(details) > 4 else [],
             'word_types': details[5] if len(details) > 5 else []
         })
+        # Tarayıcı kartı saklar ama her seferinde ETag ile doğrular; değişmediyse 304 döner
+        response.add_etag()
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     return jsonify({'error': 'Bulunamadı'}), 404
 
 @main_bp.route('/check_vocab_answer', methods=['POST'])
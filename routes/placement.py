@@ -5,7 +5,7 @@ import subprocess
 import logging
 from flask import Blueprint, request, jsonify
 from utils import login_required, current_user, placement_not_completed_required
-from openai import OpenAI
+from services.llm_client import chat_completion
 import azure.cognitiveservices.speech as speechsdk
 from database import save_user_placement_result, has_user_completed_placement
 
@@ -17,11 +17,6 @@ UPLOAD_FOLDER = "uploads"
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-# API Kurulumları
-try:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except:
-    client = None
 
 def get_azure_config():
     return os.getenv("AZURE_SPEECH_KEY"), os.getenv("AZURE_SPEECH_REGION")
@@ -177,7 +172,8 @@ def assess_writing():
     
     ai_score = 0
     try:
-        gpt_resp = client.chat.completions.create(
+        gpt_resp = chat_completion(
+            call_site="placement_writing",
             model="gpt-4o-mini",
             messages=[{"role": "system", "content": "You are a grading assistant."}, {"role": "user", "content": prompt}],
             temperature=0.3,
@@ -322,7 +318,8 @@ def evaluate_speaking_content_internal(transcript, level):
     Output ONLY JSON: {{ "score": (0-100) }}
     """
     try:
-        resp = client.chat.completions.create(
+        resp = chat_completion(
+            call_site="placement_speaking",
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
@@ -0,0 +1,207 @@
+# services/batch_lessons.py
+
+from services.lesson_schema import normalize_lesson, repair_lesson, LESSON_SCHEMAS
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+"""
+Batch API ile offline ders üretimi.
+
+1) write_batch_file: plan (skill x level x adet) için prompt'ları hazırlar,
+   Batch API'nin beklediği JSONL istek dosyasını ve custom_id -> ders bilgisi manifest'ini yazar.
+2) Dosya Batch API'ye yüklenir, sonuç JSONL'i indirilir (platform veya ayrı script ile).
+3) ingest_batch_results: sonuç dosyasını okur, şema kontrolünden geçirir ve ders deposuna (varsayılan: lesson pool) yazar.
+
+Topic / kelime seçimi, prompt ve depo parametre olarak verilebilir;
+böylece writer ve ingester DB ve API olmadan fixture dosyalarıyla çalıştırılabilir.
+"""
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_MODEL = "gpt-4o-mini"
+JSON_SKILLS = ["reading", "listening", "speaking"]
+
+
+def parse_plan(spec, levels=None):
+    """
+    "reading:B1:10,listening:all:5" -> [("reading", "B1", 10), ("listening", "A1", 5), ...]
+    """
+    levels = levels or ["A1", "A2", "B1", "B2", "C1"]
+    plan = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        skill, level, count = part.split(":")
+        for lvl in (levels if level.lower() == "all" else [level.upper()]):
+            plan.append((skill.strip().lower(), lvl, int(count)))
+    return plan
+
+
+def write_batch_file(
+    plan,
+    requests_path,
+    manifest_path,
+    topic_selector=None,
+    word_selector=None,
+    prompt_builder=None,
+    model=BATCH_MODEL
+):
+    """
+    plan: [(skill, level, adet), ...]
+    Her ders için bir Batch API isteği yazar. Dönüş: yazılan istek sayısı ve atlananlar.
+    """
+    if topic_selector is None:
+        from services.lesson_topic_selector import select_lesson_topics as topic_selector
+    if word_selector is None:
+        from services.target_word_selector import get_target_words as word_selector
+    if prompt_builder is None:
+        from services.prompt_builder import build_budgeted_prompt as prompt_builder
+
+    manifest = {}
+    written = 0
+    skipped = 0
+
+    with open(requests_path, "w", encoding="utf-8") as out:
+        for skill, level, count in plan:
+            for i in range(count):
+                primary_topic, secondary_topic = topic_selector(level, skill)
+                target_words = word_selector(
+                    level=level,
+                    primary_topic=primary_topic,
+                    secondary_topic=secondary_topic
+                )
+                if not target_words:
+                    skipped += 1
+                    continue
+
+                messages, max_tokens = prompt_builder(
+                    skill=skill,
+                    level=level,
+                    primary_topic=primary_topic,
+                    secondary_topic=secondary_topic,
+                    target_words=target_words
+                )
+
+                body = {
+                    "model": model,
+                    "messages": messages,
+                    "temperature": 0.9,
+                    "max_tokens": max_tokens
+                }
+                if skill in JSON_SKILLS:
+                    body["response_format"] = {"type": "json_object"}
+
+                custom_id = _make_custom_id(skill, level, i, messages)
+                out.write(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": body
+                }, ensure_ascii=False) + "\n")
+
+                manifest[custom_id] = {
+                    "skill": skill,
+                    "level": level,
+                    "primary_topic": primary_topic,
+                    "secondary_topic": secondary_topic,
+                    "target_words": [w.get("word") for w in target_words]
+                }
+                written += 1
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    return {"written": written, "skipped": skipped}
+
+
+def _make_custom_id(skill, level, index, messages):
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return f"{skill}-{level}-{index}-{digest}"
+
+
+def ingest_batch_results(results_path, manifest_path, store=None):
+    """
+    Batch API sonuç dosyasını okur, her dersi doğrular ve store(skill, level, lesson, meta) ile kaydeder.
+    Sadece lokal onarım yapılır; düzeltilemeyen dersler reddedilir (batch'te parça yenileme yok).
+    """
+    if store is None:
+        from services.lesson_pool import lesson_pool
+        store = lesson_pool.add_lesson
+
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    report = {"stored": 0, "repaired": 0, "invalid": 0, "failed": 0, "unknown": 0}
+
+    with open(results_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Batch result line {line_no} is not valid JSON")
+                report["failed"] += 1
+                continue
+
+            meta = manifest.get(record.get("custom_id"))
+            if meta is None:
+                report["unknown"] += 1
+                continue
+
+            content = _extract_content(record)
+            if content is None:
+                report["failed"] += 1
+                continue
+
+            lesson, repairs = _validate_content(meta["skill"], content)
+            if lesson is None:
+                report["invalid"] += 1
+                continue
+
+            store(meta["skill"], meta["level"], lesson, meta)
+            report["stored"] += 1
+            if repairs:
+                report["repaired"] += 1
+
+    return report
+
+
+def _extract_content(record):
+    if record.get("error"):
+        return None
+    response = record.get("response") or {}
+    if response.get("status_code") != 200:
+        return None
+    try:
+        choice = response["body"]["choices"][0]
+    except (KeyError, IndexError, TypeError):
+        return None
+    if choice.get("finish_reason") == "length":
+        # max_tokens'a takılmış, JSON yarım kalmıştır
+        return None
+    return choice.get("message", {}).get("content")
+
+
+def _validate_content(skill, content):
+    if skill not in JSON_SKILLS:
+        text = content.strip().replace('"', '')
+        return (text, 0) if text else (None, 0)
+
+    try:
+        lesson = json.loads(content)
+    except ValueError:
+        return None, 0
+    if not isinstance(lesson, dict):
+        return None, 0
+
+    if skill not in LESSON_SCHEMAS:
+        return lesson, 0
+
+    lesson, repairs, broken = repair_lesson(skill, normalize_lesson(skill, lesson), fill_locally=True)
+    if broken:
+        return None, repairs
+    return lesson, repairs
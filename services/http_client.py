@@ -0,0 +1,141 @@
+# services/http_client.py
+
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+import logging
+import os
+import requests
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+"""
+Dış HTTP istekleri (çeviri vb.) için ortak client.
+- Tek HTTPAdapter: host başına sınırlı, keep-alive bağlantı havuzu (her istek yeni TCP + TLS açmaz)
+- Geçici hatalarda (bağlantı, 5xx) kısa backoff ile tekrar deneme
+- 429'da tekrar denenmez ve Retry-After'a uyulmaz: retry'lar host slotu tutulurken uyunur, sunucunun
+  istediği (sınırsız) bekleme kullanıcı isteğini ve diğer istekleri bloklar; hata hemen döner
+  Slot en fazla (HTTP_RETRIES + 1) x timeout + HTTP_BACKOFF x (2^HTTP_RETRIES - 1) saniye tutulur.
+- Host başına eşzamanlı istek sınırı: dolu ise HTTP_ACQUIRE_TIMEOUT kadar beklenir, sonra HostBusyError
+requests.Session thread-safe olmadığı için her thread kendi Session'ını kullanır, havuz (adapter) ortaktır.
+"""
+
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", 10))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 10))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", 8))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.3))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 5))
+HTTP_ACQUIRE_TIMEOUT = float(os.getenv("HTTP_ACQUIRE_TIMEOUT", 2))
+# 429 bilerek yok: Retry-After'sız tekrar deneme kotayı boşa harcar, Retry-After'lı bekleme sınırsızdır
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class HostBusyError(requests.exceptions.RequestException):
+    """Host için eşzamanlı istek sınırı dolu."""
+
+
+class HttpClient:
+
+    def __init__(self, pool_hosts=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE, max_per_host=HTTP_MAX_PER_HOST,
+                 retries=HTTP_RETRIES, backoff=HTTP_BACKOFF):
+        self.max_per_host = max_per_host
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+        # pool_block: havuz doluysa yeni (havuza dönmeyecek) bağlantı açmak yerine sıra beklenir
+        self._adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize,
+                                    max_retries=retry, pool_block=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._stats = {}
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._local.session = session
+        return session
+
+    def _host_state(self, host):
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+                self._stats[host] = {"requests": 0, "errors": 0, "busy": 0, "total_ms": 0.0}
+            return semaphore, self._stats[host]
+
+    def request(self, method, url, timeout=HTTP_TIMEOUT, **kwargs):
+        host = urlsplit(url).netloc
+        semaphore, stats = self._host_state(host)
+
+        if not semaphore.acquire(timeout=HTTP_ACQUIRE_TIMEOUT):
+            with self._lock:
+                stats["busy"] += 1
+            raise HostBusyError(f"Too many concurrent requests to {host}")
+
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self._session().request(method, url, timeout=timeout, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            semaphore.release()
+            with self._lock:
+                stats["requests"] += 1
+                stats["errors"] += int(failed)
+                stats["total_ms"] += (time.perf_counter() - started) * 1000
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def _pool_counts(self):
+        """urllib3 havuzlarının host bazında (açılan bağlantı, gönderilen istek) sayıları."""
+        counts = {}
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            connections, sent = counts.get(host, (0, 0))
+            counts[host] = (connections + pool.num_connections, sent + pool.num_requests)
+        return counts
+
+    def get_stats(self):
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self._stats.items()}
+        pool_counts = self._pool_counts()
+
+        total_connections = total_sent = 0
+        for host, stats in hosts.items():
+            connections, sent = pool_counts.get(host, (0, 0))
+            total_connections += connections
+            total_sent += sent
+            stats["avg_ms"] = round(stats.pop("total_ms") / stats["requests"], 1) if stats["requests"] else 0
+            stats["connections_opened"] = connections
+            # Retry'lar dahil gönderilen isteklerin ne kadarı mevcut bir bağlantıyı kullandı
+            stats["connection_reuse_rate"] = round(1 - connections / sent, 3) if sent else 0
+        return {
+            "hosts": hosts,
+            "connections_opened": total_connections,
+            "connection_reuse_rate": round(1 - total_connections / total_sent, 3) if total_sent else 0,
+            "max_per_host": self.max_per_host
+        }
+
+
+http_client = HttpClient()
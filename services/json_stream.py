@@ -0,0 +1,81 @@
+# services/json_stream.py
+
+import json
+
+
+class TopLevelJSONStream:
+    """
+    Parça parça gelen bir JSON objesini okur ve
+    üst seviyedeki her alan tamamlandığında (key, value) olarak döner.
+
+    Örn: '{"title": "A", "text": "..."' geldiğinde title hazırdır,
+    text ise sonraki ',' veya '}' gelince hazır olur.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self.done = False
+
+    def feed(self, chunk):
+        """
+        Yeni parçayı ekler, bu parçayla tamamlanan alanları liste olarak döner.
+        """
+        self.buffer += chunk or ""
+        completed = []
+
+        while self._pos < len(self.buffer):
+            ch = self.buffer[self._pos]
+            i = self._pos
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    # Üst seviye key bitti
+                    if self._depth == 1 and self._key is None and self._key_start is not None:
+                        self._key = json.loads(self.buffer[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1 and ch == "}":
+                    completed.extend(self._close_value(i))
+                    self.done = True
+                self._depth -= 1
+            elif ch == ":" and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = i + 1
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._close_value(i))
+
+        return completed
+
+    def _close_value(self, end):
+        if self._key is None or self._value_start is None:
+            return []
+
+        raw = self.buffer[self._value_start:end].strip()
+        key = self._key
+        self._key = None
+        self._value_start = None
+
+        try:
+            return [(key, json.loads(raw))]
+        except ValueError:
+            return []
@@ -1,19 +1,52 @@
 from services.lesson_topic_selector import select_lesson_topics
 from services.target_word_selector import get_target_words
-from services.prompt_builder import build_prompt
+from services.prompt_builder import build_budgeted_prompt, build_lesson_part_prompt, output_budget, retry_output_budget
+from services.lesson_schema import normalize_lesson, repair_lesson, LessonSchemaError, LESSON_SCHEMAS
+from services.cache import TTLCache
+from services.json_stream import TopLevelJSONStream
+from database import db
+from sqlalchemy import text
 from dotenv import load_dotenv
-from openai import OpenAI
+from services.llm_client import chat_completion
+from services.word_exposure import word_exposure
 import json, os
+import copy
+import hashlib
 import logging
+import threading
 
 load_dotenv(override=True)
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
 
 logger = logging.getLogger(__name__)
 
-def generate_lesson(skill,level):
+# Aynı (skill, level, topic, target words) kombinasyonu için LLM'e tekrar gitmemek adına
+# iki katmanlı cache: process içi LRU + TTL, opsiyonel olarak DB (lesson_cache tablosu)
+LESSON_CACHE_TTL = int(os.getenv("LESSON_CACHE_TTL", 24 * 3600))
+LESSON_CACHE_DB = os.getenv("LESSON_CACHE_DB", "0") == "1"
+lesson_cache = TTLCache(
+    maxsize=int(os.getenv("LESSON_CACHE_SIZE", 500)),
+    ttl=LESSON_CACHE_TTL
+)
+
+_cache_stats = {}
+_cache_stats_lock = threading.Lock()
+
+_schema_stats = {}
+_schema_stats_lock = threading.Lock()
+
+def generate_lesson(skill, level, user_id=None):
+    """
+    Dersi üretir; user_id verilirse seçilen target word'ler kullanıcıya gösterilmiş sayılır.
+    """
+    lesson, target_words = generate_lesson_with_words(skill, level, user_id=user_id)
+    word_exposure.mark_seen(user_id, target_words)
+    return lesson
+
+
+def generate_lesson_with_words(skill, level, user_id=None):
     """
+    Dönüş: (ders, target word listesi). Lesson pool kelimeleri dersle birlikte saklar.
+
     skill:
         reading
         writing
@@ -29,18 +62,26 @@ def generate_lesson(skill,level):
         target_words = get_target_words(
             level=level,
             primary_topic=primary_topic,
-            secondary_topic=secondary_topic
+            secondary_topic=secondary_topic,
+            user_id=user_id
         )
 
         
         if not target_words:
-            return {"error": "Content could not be generated for this level and topic. (level={level}, topic={primary_topic}, secondary_topic={secondary_topic})"}
+            return {"error": "Content could not be generated for this level and topic. (level={level}, topic={primary_topic}, secondary_topic={secondary_topic})"}, []
+
+        words = [w["word"] for w in target_words]
+
 
+        # 3️⃣ Cache kontrolü
+        cache_key = make_lesson_cache_key(skill, level, primary_topic, secondary_topic, target_words)
+        cached = _get_cached_lesson(skill, cache_key)
+        if cached is not None:
+            return cached, words
 
-      
         print("FİNAL skill:", skill)
         # 4️⃣ Prompt oluştur
-        messages = build_prompt(
+        messages, max_tokens = build_budgeted_prompt(
             skill=skill,
             level=level,
             primary_topic=primary_topic,
@@ -49,10 +90,12 @@ def generate_lesson(skill,level):
         )
         
         # 5️⃣ GPT çağrısı
-        response = client.chat.completions.create(
+        response = chat_completion(
+            call_site=f"generate_lesson:{skill}",
             model="gpt-4o-mini",
             messages=messages,
             temperature=0.9,
+            max_tokens=max_tokens,
             response_format=(
                 {"type": "json_object"}
                 if skill in ["reading", "listening", "speaking"]
@@ -64,11 +107,338 @@ def generate_lesson(skill,level):
         content = response.choices[0].message.content
 
         if skill  in ["reading", "listening", "speaking"]:
-            return json.loads(content)
+            # 6️⃣ Şema kontrolü + lokal onarım (kesik / geçersiz JSON -> None, ders baştan üretilir)
+            finish_reason = response.choices[0].finish_reason
+            parsed = parse_lesson_json(content, finish_reason)
+            lesson = validate_lesson(skill, level, parsed, messages, max_tokens, truncated=finish_reason == "length")
+        else:
+            # 7️⃣ Writing / sentence → text
+            lesson = content.strip().replace('"', '')
 
-        # 7️⃣ Writing / sentence → text
-        return content.strip().replace('"', '')
+        _store_cached_lesson(skill, cache_key, lesson)
+        return lesson, words
 
     except Exception as e:
         logger.exception("Lesson generation failed")
         raise e
+
+
+STREAM_SKILLS = ["reading", "listening"]
+
+
+def _mark_seen(user_id, target_words):
+    word_exposure.mark_seen(user_id, [w["word"] for w in target_words])
+
+
+def stream_lesson(skill, level, user_id=None):
+    """
+    generate_lesson'ın streaming versiyonu (reading / listening).
+    JSON'un üst seviye alanları (title, text/audio_text, questions...) tamamlandıkça
+    (alan, değer) döner; en sonda ("lesson", tüm ders) gelir.
+    """
+    if skill not in STREAM_SKILLS:
+        raise ValueError("Streaming is only supported for reading and listening")
+
+    try:
+        primary_topic, secondary_topic = select_lesson_topics(level, skill)
+        target_words = get_target_words(
+            level=level,
+            primary_topic=primary_topic,
+            secondary_topic=secondary_topic,
+            user_id=user_id
+        )
+
+        if not target_words:
+            yield ("lesson_error", f"Content could not be generated for this level and topic. (level={level}, topic={primary_topic})")
+            return
+
+        cache_key = make_lesson_cache_key(skill, level, primary_topic, secondary_topic, target_words)
+        cached = _get_cached_lesson(skill, cache_key)
+        if cached is not None:
+            for field, value in cached.items():
+                yield (field, value)
+            _mark_seen(user_id, target_words)
+            yield ("lesson", cached)
+            return
+
+        messages, max_tokens = build_budgeted_prompt(
+            skill=skill,
+            level=level,
+            primary_topic=primary_topic,
+            secondary_topic=secondary_topic,
+            target_words=target_words
+        )
+
+        stream = chat_completion(
+            call_site=f"stream_lesson:{skill}",
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.9,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+
+        parser = TopLevelJSONStream()
+        finish_reason = None
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            finish_reason = chunk.choices[0].finish_reason or finish_reason
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for field, value in parser.feed(delta):
+                yield (field, value)
+
+        lesson = validate_lesson(
+            skill, level, parse_lesson_json(parser.buffer, finish_reason), messages, max_tokens,
+            truncated=finish_reason == "length"
+        )
+        _store_cached_lesson(skill, cache_key, lesson)
+        _mark_seen(user_id, target_words)
+        yield ("lesson", lesson)
+
+    except Exception as e:
+        logger.exception("Lesson streaming failed")
+        raise e
+
+
+# ==========================================
+# LESSON SCHEMA
+# ==========================================
+
+def parse_lesson_json(content, finish_reason=None):
+    """
+    Model çıktısını dict'e çevirir.
+    max_tokens'a takılıp kesilmiş (finish_reason == "length") veya geçersiz JSON ise None döner;
+    validate_lesson None'ı bozuk metin olarak ele alır.
+    """
+    if finish_reason == "length":
+        logger.warning("Model output truncated at max_tokens")
+        return None
+    try:
+        data = json.loads(content or "")
+    except ValueError:
+        logger.warning("Model output is not valid JSON")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def validate_lesson(skill, level, lesson, messages, max_tokens=None, truncated=False):
+    """
+    Model çıktısını şemaya göre kontrol eder:
+    - alias alanlar normalize edilir, lokal düzeltilebilenler düzeltilir
+    - sadece bozuk parça (ör. multiple_choice) LLM'e tekrar sorulur
+    - metnin kendisi bozuksa (veya çıktı kesik / geçersiz JSON ise, lesson=None) ders bir kez baştan üretilir
+    truncated=True ise (ilk çıktı max_tokens'ta kesildi) yeniden üretim tam bütçeyle yapılır.
+    Düzeltilemezse LessonSchemaError fırlatır.
+    """
+    if skill not in LESSON_SCHEMAS:
+        return lesson
+
+    _count_schema(skill, "validated")
+    lesson, repairs, broken = _check_lesson(skill, lesson)
+
+    if "text" in broken:
+        # Sorular metne bağlı, metin bozuksa parça yenilemek anlamsız
+        _count_schema(skill, "regenerated_full")
+        retry_budget = retry_output_budget(skill)
+        regenerated = _request_json(
+            messages,
+            0.9,
+            f"regenerate_lesson:{skill}",
+            retry_budget if truncated else max_tokens,
+            retry_max_tokens=retry_budget
+        )
+        lesson, repairs, broken = _check_lesson(skill, regenerated)
+        if "text" in broken:
+            _count_schema(skill, "failed")
+            raise LessonSchemaError(skill, broken)
+
+    for part in broken:
+        _count_schema(skill, "regenerated_part")
+        try:
+            regenerated = _request_json(
+                build_lesson_part_prompt(skill, level, lesson, part),
+                0.5,
+                f"regenerate_part:{skill}",
+                output_budget("lesson_part"),
+                retry_max_tokens=retry_output_budget("lesson_part")
+            )
+            if regenerated is None:
+                _count_schema(skill, "invalid_json")
+                continue
+            lesson[part] = normalize_lesson(skill, {**lesson, part: regenerated.get(part)})[part]
+        except Exception:
+            logger.exception(f"Lesson part regeneration failed | skill={skill} | part={part}")
+
+    if broken:
+        lesson, more_repairs, broken = repair_lesson(skill, lesson, fill_locally=True)
+        repairs += more_repairs
+
+    if broken:
+        # Eksik de olsa kullanılabilir parça varsa dersi ver, tamamen boş parça varsa hata ver
+        if any(not lesson.get(part) for part in broken):
+            _count_schema(skill, "failed")
+            raise LessonSchemaError(skill, broken)
+        logger.warning(f"Lesson served with incomplete parts | skill={skill} | parts={broken}")
+        _count_schema(skill, "degraded")
+
+    if repairs:
+        _count_schema(skill, "repaired")
+    return lesson
+
+
+def _check_lesson(skill, lesson):
+    if lesson is None:
+        _count_schema(skill, "invalid_json")
+        return lesson, 0, ["text"]
+    return repair_lesson(skill, normalize_lesson(skill, lesson))
+
+
+def _request_json(messages, temperature, call_site, max_tokens=None, retry_max_tokens=None):
+    """
+    Kesik veya geçersiz JSON çıktıda None döner (bkz. parse_lesson_json).
+    Çıktı max_tokens'ta kesilirse ve retry_max_tokens daha büyükse bir kez o bütçeyle tekrar istenir.
+    """
+    response = chat_completion(
+        call_site=call_site,
+        model="gpt-4o-mini",
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        response_format={"type": "json_object"}
+    )
+    choice = response.choices[0]
+    if choice.finish_reason == "length" and retry_max_tokens and (max_tokens is None or retry_max_tokens > max_tokens):
+        logger.warning(f"Output truncated, retrying with full budget | call_site={call_site} | max_tokens={retry_max_tokens}")
+        return _request_json(messages, temperature, call_site, retry_max_tokens)
+    return parse_lesson_json(choice.message.content, choice.finish_reason)
+
+
+def _count_schema(skill, name):
+    with _schema_stats_lock:
+        stats = _schema_stats.setdefault(skill, {
+            "validated": 0,
+            "repaired": 0,
+            "regenerated_part": 0,
+            "regenerated_full": 0,
+            "degraded": 0,
+            "invalid_json": 0,
+            "failed": 0
+        })
+        stats[name] += 1
+
+
+def get_lesson_schema_stats():
+    """
+    Skill bazında onarım / yeniden üretim oranları.
+    """
+    with _schema_stats_lock:
+        per_skill = {skill: dict(s) for skill, s in _schema_stats.items()}
+
+    for s in per_skill.values():
+        total = s["validated"]
+        for name in ["repaired", "regenerated_part", "regenerated_full", "invalid_json", "failed"]:
+            s[f"{name}_rate"] = round(s[name] / total, 3) if total else 0.0
+    return per_skill
+
+
+# ==========================================
+# LESSON CACHE
+# ==========================================
+
+def make_lesson_cache_key(skill, level, primary_topic, secondary_topic, target_words):
+    """
+    build_prompt girdilerinin kanonik hash'i.
+    Target word sırası önemsiz, set olarak değerlendirilir.
+    """
+    words = sorted({(w.get("word") or "").strip().lower() for w in (target_words or [])})
+    canonical = json.dumps(
+        [skill, level, primary_topic, secondary_topic, words],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _get_cached_lesson(skill, cache_key):
+    # Route'lar dönen dict'i değiştirebildiği için kopya veriyoruz
+    lesson = lesson_cache.get(cache_key)
+    if lesson is not None:
+        _count_cache(skill, "memory_hits")
+        return copy.deepcopy(lesson)
+
+    if LESSON_CACHE_DB:
+        lesson = _db_get_lesson(cache_key)
+        if lesson is not None:
+            lesson_cache.set(cache_key, lesson)
+            _count_cache(skill, "db_hits")
+            return copy.deepcopy(lesson)
+
+    _count_cache(skill, "misses")
+    return None
+
+
+def _store_cached_lesson(skill, cache_key, lesson):
+    lesson_cache.set(cache_key, copy.deepcopy(lesson))
+    if LESSON_CACHE_DB:
+        _db_store_lesson(skill, cache_key, lesson)
+
+
+def _db_get_lesson(cache_key):
+    sql = """
+        SELECT payload FROM lesson_cache
+        WHERE cache_key = :key
+          AND created_at >= NOW() - INTERVAL :ttl SECOND
+    """
+    try:
+        with db.engine.connect() as conn:
+            row = conn.execute(text(sql), {"key": cache_key, "ttl": LESSON_CACHE_TTL}).fetchone()
+        return json.loads(row[0]) if row else None
+    except Exception:
+        logger.exception("Lesson cache DB read error")
+        return None
+
+
+def _db_store_lesson(skill, cache_key, lesson):
+    sql = """
+        INSERT INTO lesson_cache (cache_key, skill, payload)
+        VALUES (:key, :skill, :payload)
+        ON DUPLICATE KEY UPDATE payload = VALUES(payload), created_at = CURRENT_TIMESTAMP
+    """
+    try:
+        with db.engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text(sql), {
+                    "key": cache_key,
+                    "skill": skill,
+                    "payload": json.dumps(lesson, ensure_ascii=False)
+                })
+    except Exception:
+        logger.exception("Lesson cache DB write error")
+
+
+def _count_cache(skill, name):
+    with _cache_stats_lock:
+        stats = _cache_stats.setdefault(skill, {"memory_hits": 0, "db_hits": 0, "misses": 0})
+        stats[name] += 1
+
+
+def get_lesson_cache_stats():
+    """
+    Skill bazında hit oranları + process içi cache durumu.
+    """
+    with _cache_stats_lock:
+        per_skill = {skill: dict(s) for skill, s in _cache_stats.items()}
+
+    for s in per_skill.values():
+        lookups = s["memory_hits"] + s["db_hits"] + s["misses"]
+        s["hit_rate"] = round((s["memory_hits"] + s["db_hits"]) / lookups, 3) if lookups else 0.0
+
+    return {
+        "skills": per_skill,
+        "memory": lesson_cache.stats(),
+        "db_tier": LESSON_CACHE_DB
+    }
@@ -0,0 +1,308 @@
+# services/lesson_pool.py
+
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from database import db
+from services.lesson_pipeline import generate_lesson, generate_lesson_with_words, stream_lesson
+from services.word_exposure import word_exposure
+import json, os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+POOL_SKILLS = ["reading", "listening", "speaking", "writing"]
+POOL_LEVELS = ["A1", "A2", "B1", "B2", "C1"]
+# Kullanıcıya verilecek ders en eski bu kadar aday arasından, en az görülmüş kelimeye sahip olanı
+POOL_PICK_CANDIDATES = int(os.getenv("LESSON_POOL_PICK_CANDIDATES", 5))
+# Bu süreden eski refill rezervasyonu (çöken worker) geçersiz sayılır
+REFILL_TIMEOUT = int(os.getenv("LESSON_POOL_REFILL_TIMEOUT", 600))
+RESERVE_LOCK_TIMEOUT = 5
+
+
+class LessonPool:
+    """
+    Her (skill, level) için hazırda N ders tutar.
+    İstek gelince havuzdan bir ders anında verilir,
+    eksilen ders arka planda generate_lesson ile yeniden üretilir.
+    """
+
+    def __init__(self, depth=5, refill_workers=2):
+        self.depth = depth
+        self.refill_workers = refill_workers
+        self._app = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=refill_workers,
+            thread_name_prefix="lesson-pool"
+        )
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._checking = set()
+        self._recheck = set()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refilled": 0,
+            "refill_errors": 0
+        }
+
+    def init_app(self, app):
+        self._app = app
+        if os.getenv("LESSON_POOL_WARM_ON_START", "0") == "1":
+            self.warm_all()
+
+    # ------------------------------------------
+    # SERVİS
+    # ------------------------------------------
+
+    def get_lesson(self, skill, level, user_id=None):
+        """
+        Havuzda hazır ders varsa onu döner (hit),
+        yoksa dersi senkron üretir (miss). Her iki durumda da refill planlanır.
+        user_id verilirse dersin target word'leri kullanıcıya gösterilmiş sayılır.
+        """
+        if skill not in POOL_SKILLS or level not in POOL_LEVELS:
+            return generate_lesson(skill=skill, level=level, user_id=user_id)
+
+        lesson = self._pop(skill, level, user_id)
+        self._count("hits" if lesson is not None else "misses")
+
+        if lesson is None:
+            lesson = generate_lesson(skill=skill, level=level, user_id=user_id)
+
+        self.schedule_refill(skill, level)
+        return lesson
+
+    def stream_lesson(self, skill, level, user_id=None):
+        """
+        get_lesson'ın streaming versiyonu.
+        Hit olursa hazır dersin alanları tek seferde, miss olursa model çıktısı geldikçe döner.
+        """
+        if skill not in POOL_SKILLS or level not in POOL_LEVELS:
+            yield from stream_lesson(skill, level, user_id=user_id)
+            return
+
+        lesson = self._pop(skill, level, user_id)
+        self._count("hits" if lesson is not None else "misses")
+        self.schedule_refill(skill, level)
+
+        if lesson is None:
+            yield from stream_lesson(skill, level, user_id=user_id)
+            return
+
+        for field, value in lesson.items():
+            yield (field, value)
+        yield ("lesson", lesson)
+
+    def _pop(self, skill, level, user_id=None):
+        """
+        En eski POOL_PICK_CANDIDATES ders kilitlenir; kullanıcının en az gördüğü
+        target word'lere sahip olan alınır (eşitlikte en eski), seçilen ders kullanıcıya işaretlenir.
+        """
+        sql = """
+            SELECT id, payload, target_words FROM lesson_pool
+            WHERE skill = :skill AND level = :level
+            ORDER BY id
+            LIMIT :candidates
+            FOR UPDATE SKIP LOCKED
+        """
+        params = {"skill": skill, "level": level, "candidates": POOL_PICK_CANDIDATES if user_id else 1}
+        try:
+            with db.engine.connect() as conn:
+                with conn.begin():
+                    rows = conn.execute(text(sql), params).fetchall()
+                    if not rows:
+                        return None
+                    row = min(rows, key=lambda r: word_exposure.seen_count(user_id, _load_words(r[2])))
+                    conn.execute(text("DELETE FROM lesson_pool WHERE id = :id"), {"id": row[0]})
+            word_exposure.mark_seen(user_id, _load_words(row[2]))
+            return json.loads(row[1])
+        except Exception:
+            logger.exception("Lesson pool pop error")
+            return None
+
+    # ------------------------------------------
+    # REFILL
+    # ------------------------------------------
+
+    def warm_all(self):
+        for skill in POOL_SKILLS:
+            for level in POOL_LEVELS:
+                self.schedule_refill(skill, level)
+
+    def schedule_refill(self, skill, level):
+        """
+        Request yolunda DB'ye gidilmez: (skill, level) için tek bir kontrol işi kuyruğa atılır.
+        Kontrol zaten çalışıyorsa bittiğinde bir kez daha çalışması işaretlenir.
+        """
+        key = (skill, level)
+        with self._lock:
+            self._recheck.add(key)
+            if key in self._checking:
+                return
+            self._checking.add(key)
+        self._executor.submit(self._check_loop, skill, level)
+
+    def _check_loop(self, skill, level):
+        key = (skill, level)
+        while True:
+            with self._lock:
+                if key not in self._recheck:
+                    self._checking.discard(key)
+                    return
+                self._recheck.discard(key)
+            try:
+                with self._app.app_context():
+                    reserved = self._reserve(skill, level)
+            except Exception:
+                logger.exception(f"Lesson pool reserve failed | skill={skill} | level={level}")
+                continue
+            for reservation_id in reserved:
+                with self._lock:
+                    self._pending[key] = self._pending.get(key, 0) + 1
+                self._executor.submit(self._refill_one, skill, level, reservation_id)
+
+    def _reserve(self, skill, level):
+        """
+        Eksik ders sayısı kadar lesson_pool_refills satırı açar ve id'lerini döner.
+        Sayım + ekleme (skill, level) başına MySQL named lock altında yapılır;
+        böylece birden fazla worker aynı eksikliği ayrı ayrı doldurmaz.
+        Çöken worker'ın rezervasyonu REFILL_TIMEOUT sonra geçersiz sayılır.
+        """
+        params = {"skill": skill, "level": level}
+        lock = {"name": f"lesson_pool:{skill}:{level}", "timeout": RESERVE_LOCK_TIMEOUT}
+        locked = False
+        with db.engine.connect() as conn:
+            try:
+                with conn.begin():
+                    locked = bool(conn.execute(text("SELECT GET_LOCK(:name, :timeout)"), lock).scalar())
+                    if not locked:
+                        return []
+                    conn.execute(text("""
+                        DELETE FROM lesson_pool_refills
+                        WHERE skill = :skill AND level = :level
+                          AND reserved_at < NOW() - INTERVAL :timeout SECOND
+                    """), {**params, "timeout": REFILL_TIMEOUT})
+                    stored = conn.execute(text(
+                        "SELECT COUNT(*) FROM lesson_pool WHERE skill = :skill AND level = :level"
+                    ), params).scalar() or 0
+                    reserved = conn.execute(text(
+                        "SELECT COUNT(*) FROM lesson_pool_refills WHERE skill = :skill AND level = :level"
+                    ), params).scalar() or 0
+                    ids = []
+                    for _ in range(self.depth - stored - reserved):
+                        result = conn.execute(text(
+                            "INSERT INTO lesson_pool_refills (skill, level) VALUES (:skill, :level)"
+                        ), params)
+                        ids.append(result.lastrowid)
+                return ids
+            finally:
+                # Kilit commit'ten sonra bırakılır, sıradaki worker yeni sayımı görür
+                if locked:
+                    conn.execute(text("SELECT RELEASE_LOCK(:name)"), lock)
+
+    def _refill_one(self, skill, level, reservation_id):
+        stored = False
+        try:
+            with self._app.app_context():
+                lesson, target_words = generate_lesson_with_words(skill=skill, level=level)
+                if not lesson or (isinstance(lesson, dict) and "error" in lesson):
+                    self._count("refill_errors")
+                    return
+                self._push(skill, level, lesson, target_words, reservation_id)
+                stored = True
+                self._count("refilled")
+        except Exception:
+            logger.exception(f"Lesson pool refill failed | skill={skill} | level={level}")
+            self._count("refill_errors")
+        finally:
+            if not stored:
+                self._release(reservation_id)
+            with self._lock:
+                self._pending[(skill, level)] = max(0, self._pending.get((skill, level), 1) - 1)
+
+    def _release(self, reservation_id):
+        try:
+            with self._app.app_context():
+                with db.engine.connect() as conn:
+                    with conn.begin():
+                        conn.execute(text("DELETE FROM lesson_pool_refills WHERE id = :id"), {"id": reservation_id})
+        except Exception:
+            # Silinemezse REFILL_TIMEOUT sonra _reserve temizler
+            logger.exception("Lesson pool reservation release failed")
+
+    def add_lesson(self, skill, level, lesson, meta=None):
+        """
+        Dışarıda üretilmiş (ör. Batch API) bir dersi havuza ekler.
+        Havuz depth'in üstüne çıkabilir; fazlası tükenene kadar refill tetiklenmez.
+        """
+        self._push(skill, level, lesson, (meta or {}).get("target_words"))
+
+    def _push(self, skill, level, lesson, target_words=None, reservation_id=None):
+        sql = """
+            INSERT INTO lesson_pool (skill, level, payload, target_words)
+            VALUES (:skill, :level, :payload, :target_words)
+        """
+        with db.engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text(sql), {
+                    "skill": skill,
+                    "level": level,
+                    "payload": json.dumps(lesson, ensure_ascii=False),
+                    "target_words": json.dumps(target_words or [], ensure_ascii=False)
+                })
+                # Ders ve rezervasyon aynı transaction'da yer değiştirir, sayım hiç eksik/fazla görülmez
+                if reservation_id is not None:
+                    conn.execute(text("DELETE FROM lesson_pool_refills WHERE id = :id"), {"id": reservation_id})
+
+    # ------------------------------------------
+    # İSTATİSTİK
+    # ------------------------------------------
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            pending = {f"{s}:{l}": n for (s, l), n in self._pending.items() if n}
+
+        served = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / served, 3) if served else 0.0
+        stats["depth"] = self.depth
+        stats["refill_workers"] = self.refill_workers
+        stats["pending"] = pending
+
+        levels, reserved = {}, {}
+        try:
+            with db.engine.connect() as conn:
+                rows = conn.execute(text(
+                    "SELECT skill, level, COUNT(*) FROM lesson_pool GROUP BY skill, level"
+                )).fetchall()
+            levels = {f"{r[0]}:{r[1]}": r[2] for r in rows}
+            with db.engine.connect() as conn:
+                rows = conn.execute(text(
+                    "SELECT skill, level, COUNT(*) FROM lesson_pool_refills GROUP BY skill, level"
+                )).fetchall()
+            reserved = {f"{r[0]}:{r[1]}": r[2] for r in rows}
+        except Exception:
+            logger.exception("Lesson pool stats error")
+        stats["stored"] = levels
+        # Tüm worker'lardaki üretimi süren dersler (pending sadece bu process)
+        stats["reserved"] = reserved
+        return stats
+
+
+def _load_words(value):
+    # target_words kolonu eklenmeden önce havuza girmiş derslerde NULL'dır
+    try:
+        return json.loads(value) if value else []
+    except ValueError:
+        return []
+
+
+lesson_pool = LessonPool(
+    depth=int(os.getenv("LESSON_POOL_DEPTH", 5)),
+    refill_workers=int(os.getenv("LESSON_POOL_REFILL_WORKERS", 2))
+)
@@ -0,0 +1,330 @@
+# services/lesson_schema.py
+
+import difflib
+import re
+
+"""
+LLM'in ürettiği ders JSON'u için şema katmanı.
+- normalize_lesson: alan adı varyasyonlarını (blanks, mc, correct...) kanonik isimlere çevirir
+- repair_lesson: lokal düzeltilebilenleri düzeltir, düzeltilemeyen parçaların adını döner
+LLM'e tekrar gitme kararı lesson_pipeline'dadır; bu modül API çağırmaz.
+"""
+
+# text_field: dersin ana metni, word_range: kabul edilen kelime aralığı (prompt'taki aralıktan biraz geniş)
+# parts: parça adı -> beklenen eleman sayısı
+LESSON_SCHEMAS = {
+    "reading": {
+        "text_field": "text",
+        "word_range": (80, 450),
+        "parts": {"questions": 5}
+    },
+    "listening": {
+        "text_field": "audio_text",
+        "word_range": (60, 160),
+        "parts": {"fill_in_the_blanks": 5, "multiple_choice": 5}
+    },
+    "speaking": {
+        "text_field": "task",
+        "word_range": (3, 120),
+        "parts": {}
+    }
+}
+
+FIELD_ALIASES = {
+    "reading": {
+        "text": ["passage", "reading_text"],
+        "questions": ["multiple_choice", "mc"]
+    },
+    "listening": {
+        "audio_text": ["listening_text", "text", "transcript"],
+        "fill_in_the_blanks": ["blanks", "fill_in_blanks"],
+        "multiple_choice": ["mc", "questions"]
+    },
+    "speaking": {
+        "task": ["prompt", "question"]
+    }
+}
+
+DEFAULT_TITLES = {
+    "reading": "Reading Practice",
+    "listening": "Listening Exercise",
+    "speaking": "Speaking Task"
+}
+
+OPTION_COUNT = 4
+BLANK = "___"
+
+
+class LessonSchemaError(ValueError):
+    """Ders lokal olarak veya parça yenilenerek düzeltilemedi."""
+
+    def __init__(self, skill, parts):
+        self.skill = skill
+        self.parts = list(parts)
+        super().__init__(f"Invalid {skill} lesson, broken parts: {', '.join(self.parts)}")
+
+
+# ==========================================
+# NORMALIZE
+# ==========================================
+
+def normalize_lesson(skill, lesson):
+    """
+    Alias alanları kanonik isimlere taşır ve soru / boşluk elemanlarını tek formata çevirir:
+        blank -> {"sentence": "... ___ ...", "answer": "..."}
+        soru  -> {"question": "...", "options": [...], "correct_index": int}
+    """
+    if skill not in LESSON_SCHEMAS or not isinstance(lesson, dict):
+        return lesson
+
+    lesson = dict(lesson)
+    for field, aliases in FIELD_ALIASES[skill].items():
+        if lesson.get(field) in (None, "", []):
+            for alias in aliases:
+                if lesson.get(alias) not in (None, "", []):
+                    lesson[field] = lesson.pop(alias)
+                    break
+
+    if skill == "listening":
+        lesson["fill_in_the_blanks"] = [_normalize_blank(b) for b in _as_list(lesson.get("fill_in_the_blanks"))]
+        lesson["multiple_choice"] = [_normalize_question(q) for q in _as_list(lesson.get("multiple_choice"))]
+    elif skill == "reading":
+        lesson["questions"] = [_normalize_question(q) for q in _as_list(lesson.get("questions"))]
+
+    return lesson
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else []
+
+
+def _normalize_blank(item):
+    if not isinstance(item, dict):
+        return {"sentence": "", "answer": ""}
+
+    if "sentence" in item:
+        sentence = str(item.get("sentence") or "")
+        answer = item.get("answer", item.get("correct", ""))
+    else:
+        # prefix / correct / suffix formatı
+        answer = item.get("correct", item.get("answer", ""))
+        sentence = f"{item.get('prefix', '')}{BLANK}{item.get('suffix', '')}"
+
+    # "_____" gibi farklı uzunluktaki boşlukları tek formata çek
+    sentence = re.sub(r"_{2,}", BLANK, sentence)
+    return {"sentence": sentence, "answer": str(answer or "").strip()}
+
+
+def _normalize_question(item):
+    if not isinstance(item, dict):
+        return {"question": "", "options": [], "correct_index": None}
+
+    options = [str(o).strip() for o in _as_list(item.get("options"))]
+    question = {
+        "question": str(item.get("question") or "").strip(),
+        "options": options,
+        "correct_index": _resolve_correct_index(item, options)
+    }
+    if "evidence" in item:
+        question["evidence"] = item["evidence"]
+    return question
+
+
+def _resolve_correct_index(item, options):
+    for key in ["correct_index", "answer_index", "correct", "answer"]:
+        if key not in item:
+            continue
+        value = item[key]
+
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str):
+            value = value.strip()
+            if value.isdigit():
+                return int(value)
+            # Şık metniyle birebir eşleşme harf yorumundan önce ("y" şıkkı Y harfi değil)
+            lowered = [o.lower() for o in options]
+            if value.lower() in lowered:
+                return lowered.index(value.lower())
+            # "B" veya "B)" gibi harf cevaplar
+            letter = value.rstrip(").").upper()
+            if len(letter) == 1 and "A" <= letter <= "Z":
+                return ord(letter) - ord("A")
+    return None
+
+
+# ==========================================
+# REPAIR
+# ==========================================
+
+def repair_lesson(skill, lesson, fill_locally=False):
+    """
+    Normalize edilmiş dersi kontrol eder ve lokal düzeltmeleri uygular.
+    Dönüş: (ders, düzeltme sayısı, düzeltilemeyen parça listesi)
+    Parça listesinde "text" varsa dersin tamamı yeniden üretilmelidir.
+    fill_locally=True ise eksik boşluklar metinden lokal olarak tamamlanır (son çare).
+    """
+    schema = LESSON_SCHEMAS.get(skill)
+    if schema is None:
+        return lesson, 0, []
+
+    repairs = 0
+    broken = []
+
+    if not str(lesson.get("title") or "").strip():
+        lesson["title"] = DEFAULT_TITLES[skill]
+        repairs += 1
+
+    text = str(lesson.get(schema["text_field"]) or "").strip()
+    low, high = schema["word_range"]
+    if not low <= len(text.split()) <= high:
+        return lesson, repairs, ["text"]
+
+    for part, expected in schema["parts"].items():
+        if part == "fill_in_the_blanks":
+            items, fixed = _repair_blanks(lesson[part], text, expected, fill_locally)
+        else:
+            items, fixed = _repair_questions(lesson[part], text, expected)
+        lesson[part] = items
+        repairs += fixed
+        if len(items) < expected:
+            broken.append(part)
+
+    return lesson, repairs, broken
+
+
+def _repair_blanks(items, text, expected, fill_locally):
+    repairs = 0
+    sentences = split_sentences(text)
+    norm_text = _norm(text)
+    result = []
+    used = set()
+
+    for item in items:
+        sentence, answer = item["sentence"], item["answer"]
+        if not answer or not _contains_word(text, answer):
+            repairs += 1
+            continue
+
+        # Boşluk işareti yoksa cevabı cümlede boşlukla değiştir
+        if BLANK not in sentence and _contains_word(sentence, answer):
+            sentence = _replace_word(sentence, answer, BLANK)
+            repairs += 1
+
+        # Cümle metinde birebir yoksa, cevabı içeren en yakın metin cümlesinden yeniden kur
+        if sentence.count(BLANK) != 1 or _norm(sentence.replace(BLANK, answer)) not in norm_text:
+            source = _closest_sentence(sentence.replace(BLANK, answer), [s for s in sentences if _contains_word(s, answer)])
+            if not source:
+                repairs += 1
+                continue
+            sentence = _replace_word(source, answer, BLANK)
+            repairs += 1
+
+        key = (_norm(sentence), answer.lower())
+        if key in used:
+            repairs += 1
+            continue
+        used.add(key)
+        result.append({"sentence": sentence, "answer": answer})
+
+    if len(result) > expected:
+        result = result[:expected]
+        repairs += 1
+
+    if fill_locally and len(result) < expected:
+        taken = {_norm(b["sentence"].replace(BLANK, b["answer"])) for b in result}
+        for sentence in sentences:
+            if len(result) >= expected:
+                break
+            if _norm(sentence) in taken:
+                continue
+            words = [w.strip(".,!?;:\"'") for w in sentence.split()]
+            words = [w for w in words if len(w) >= 4 and w.isalpha()]
+            if not words:
+                continue
+            answer = max(words, key=len)
+            result.append({"sentence": _replace_word(sentence, answer, BLANK), "answer": answer})
+            repairs += 1
+
+    return result, repairs
+
+
+def _repair_questions(items, text, expected):
+    repairs = 0
+    sentences = split_sentences(text)
+    result = []
+
+    for item in items:
+        options = []
+        for option in item["options"]:
+            if option and option.lower() not in [o.lower() for o in options]:
+                options.append(option)
+        idx = item["correct_index"]
+
+        if not item["question"] or not isinstance(idx, int) or not 0 <= idx < len(item["options"]):
+            repairs += 1
+            continue
+
+        correct = item["options"][idx]
+        if correct.lower() not in [o.lower() for o in options]:
+            repairs += 1
+            continue
+        idx = [o.lower() for o in options].index(correct.lower())
+
+        if len(options) < OPTION_COUNT:
+            repairs += 1
+            continue
+        if len(options) > OPTION_COUNT:
+            # Doğru şıkkı koruyarak fazlaları at
+            others = [o for i, o in enumerate(options) if i != idx][:OPTION_COUNT - 1]
+            options = [o for i, o in enumerate(options) if i == idx or o in others]
+            idx = [o.lower() for o in options].index(correct.lower())
+
+        if len(options) != len(item["options"]) or idx != item["correct_index"]:
+            repairs += 1
+
+        question = {"question": item["question"], "options": options, "correct_index": idx}
+
+        if "evidence" in item:
+            evidence = str(item.get("evidence") or "").strip()
+            if evidence and _norm(evidence) not in _norm(text):
+                # Frontend evidence'ı metinde birebir arıyor; en yakın cümleyle değiştir
+                evidence = _closest_sentence(evidence, sentences) or ""
+                repairs += 1
+            question["evidence"] = evidence
+
+        result.append(question)
+
+    if len(result) > expected:
+        result = result[:expected]
+        repairs += 1
+
+    return result, repairs
+
+
+# ==========================================
+# YARDIMCI FONKSİYONLAR
+# ==========================================
+
+def split_sentences(text):
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text or "") if s.strip()]
+
+
+def _norm(value):
+    return " ".join(str(value).lower().split())
+
+
+def _contains_word(text, word):
+    return re.search(rf"(?<!\w){re.escape(word)}(?!\w)", text, re.IGNORECASE) is not None
+
+
+def _replace_word(text, word, replacement):
+    return re.sub(rf"(?<!\w){re.escape(word)}(?!\w)", replacement, text, count=1, flags=re.IGNORECASE)
+
+
+def _closest_sentence(target, candidates):
+    if not candidates:
+        return None
+    return max(candidates, key=lambda s: difflib.SequenceMatcher(None, _norm(target), _norm(s)).ratio())
@@ -0,0 +1,345 @@
+# services/llm_client.py
+
+from dotenv import load_dotenv
+from openai import OpenAI, APIConnectionError, APITimeoutError, APIStatusError
+from services.llm_usage import usage_tracker
+from services.llm_routes import apply_route, resolve_route
+import httpx
+import json
+import os
+import random
+import time
+import logging
+import threading
+
+load_dotenv(override=True)
+
+logger = logging.getLogger(__name__)
+
+# --- AYARLAR ---
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 45))              # Çağrı başına toplam süre (retry'lar dahil)
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BASE = float(os.getenv("LLM_RETRY_BASE", 0.5))
+LLM_RETRY_CAP = float(os.getenv("LLM_RETRY_CAP", 8))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 20))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", 5))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", 30))
+
+
+class CircuitOpenError(Exception):
+    """Upstream sağlıksız olduğu için istek hiç gönderilmedi."""
+
+
+class LLMOutputError(ValueError):
+    """Model çıktısı max_tokens'ta kesildi veya geçerli bir JSON objesi değil."""
+
+
+class CircuitBreaker:
+    """
+    Art arda `threshold` geçici hatadan sonra devre açılır ve
+    `cooldown` saniye boyunca istekler hemen reddedilir.
+    Süre dolunca tek bir deneme isteğine izin verilir (half-open):
+    başarılıysa devre kapanır, değilse tekrar açılır.
+    """
+
+    def __init__(self, threshold=5, cooldown=30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self.rejected = 0
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.threshold:
+                if self._opened_at is None or self._trial_running:
+                    logger.warning(f"LLM circuit opened | failures={self._failures}")
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class LLMBackend:
+    """
+    Provider arayüzü. chat_completion'ın retry / breaker katmanı
+    bu arayüzün arkasındaki backend'i çağırır.
+    create() OpenAI SDK'sının chat.completions.create dönüşüyle aynı şekli döner
+    (choices[0].message.content, usage; stream=True ise delta chunk'ları).
+    """
+    name = "base"
+
+    def create(self, timeout=None, **kwargs):
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    Gerçek OpenAI API. Tek bir keep-alive bağlantı havuzu tüm modüller tarafından paylaşılır.
+    Retry'ları SDK değil chat_completion yönetir (max_retries=0).
+    """
+    name = "openai"
+
+    def __init__(self):
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=LLM_POOL_SIZE,
+                max_keepalive_connections=LLM_POOL_SIZE
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+        )
+        self.client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=self._http_client,
+            max_retries=0
+        )
+
+    def create(self, timeout=None, **kwargs):
+        return self.client.chat.completions.create(timeout=timeout, **kwargs)
+
+
+def _create_backend(name):
+    if name == "fake":
+        from services.llm_fake import FakeBackend
+        return FakeBackend.from_env()
+    return OpenAIBackend()
+
+
+# LLM_BACKEND=fake ile tüm uygulama API'ye gitmeden (load test / offline benchmark) çalışır
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+
+# İlk chat_completion'da kurulur: OPENAI_API_KEY yoksa modül importu (ve uygulama açılışı) bozulmaz,
+# hata sadece gerçek bir LLM çağrısında fırlar
+backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global backend
+    if backend is None:
+        with _backend_lock:
+            if backend is None:
+                backend = _create_backend(LLM_BACKEND)
+    return backend
+
+
+def set_backend(new_backend):
+    """Çalışma anında backend değiştirir (benchmark scriptleri için)."""
+    global backend
+    backend = new_backend
+
+
+breaker = CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN)
+
+_stats = {"calls": 0, "retries": 0, "failures": 0, "truncated": 0, "invalid_json": 0}
+_stats_lock = threading.Lock()
+
+
+def chat_completion(timeout=None, call_site=None, truncation_retry=False, **kwargs):
+    """
+    Tüm chat.completions çağrıları buradan geçer.
+    - timeout: çağrının toplam süresi (retry'lar dahil), verilmezse LLM_TIMEOUT
+    - call_site: route seçimi ve token / süre / maliyet raporunda çağrının görüneceği isim
+    - truncation_retry: kesik çıktının tekrarı, max_tokens route'un retry_max_tokens değeri olur
+    - 429 / 5xx / bağlantı hatalarında jitter'lı exponential backoff ile tekrar dener
+    - devre açıksa CircuitOpenError fırlatır
+    Model / max_tokens / temperature / timeout call_site'ın route'una göre belirlenir (config/llm_routes.json).
+    Diğer parametreler olduğu gibi aktif backend'e (OpenAI veya fake) gider.
+    """
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    route, kwargs = apply_route(call_site, kwargs, truncation_retry=truncation_retry)
+    timeout = kwargs.pop("timeout", None)
+
+    model = kwargs.get("model")
+    started = time.monotonic()
+    logger.info(
+        f"LLM route | call_site={call_site} | route={route} | model={model} | "
+        f"max_tokens={kwargs.get('max_tokens')} | temperature={kwargs.get('temperature')} | timeout={timeout}"
+    )
+    if kwargs.get("stream"):
+        # Stream'in son chunk'ında usage gelsin
+        kwargs.setdefault("stream_options", {"include_usage": True})
+
+    try:
+        response = _call_with_retries(timeout, **kwargs)
+    except Exception:
+        usage_tracker.record(call_site, model, 0, 0, time.monotonic() - started, ok=False)
+        raise
+
+    if kwargs.get("stream"):
+        return _track_stream(response, call_site, model, started)
+
+    usage = getattr(response, "usage", None)
+    usage_tracker.record(
+        call_site, model,
+        getattr(usage, "prompt_tokens", 0),
+        getattr(usage, "completion_tokens", 0),
+        time.monotonic() - started
+    )
+    return response
+
+
+def chat_completion_json(call_site=None, **kwargs):
+    """
+    response_format=json_object çağrıları için cevabı dict olarak döner.
+    Çıktı max_tokens'ta kesilirse (finish_reason == "length") route'ta retry_max_tokens varsa
+    o bütçeyle bir kez tekrar denenir. Yine kesik veya geçersiz JSON ise LLMOutputError fırlatır.
+    """
+    kwargs.setdefault("response_format", {"type": "json_object"})
+    response = chat_completion(call_site=call_site, **kwargs)
+    choice = response.choices[0]
+
+    if getattr(choice, "finish_reason", None) == "length":
+        _count("truncated")
+        _, route = resolve_route(call_site)
+        if "retry_max_tokens" not in route:
+            raise LLMOutputError(f"LLM output truncated at max_tokens | call_site={call_site}")
+        logger.warning(f"LLM output truncated, retrying with retry_max_tokens | call_site={call_site}")
+        response = chat_completion(call_site=call_site, truncation_retry=True, **kwargs)
+        choice = response.choices[0]
+        if getattr(choice, "finish_reason", None) == "length":
+            _count("truncated")
+            raise LLMOutputError(f"LLM output truncated at retry_max_tokens | call_site={call_site}")
+
+    try:
+        data = json.loads(choice.message.content or "")
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        _count("invalid_json")
+        raise LLMOutputError(f"LLM output is not a JSON object | call_site={call_site}")
+    return data
+
+
+def _track_stream(stream, call_site, model, started):
+    """
+    Stream tüketildikçe chunk'ları aynen iletir, bitince kullanımı kaydeder.
+    Backend usage göndermezse completion token'ları karakter sayısından tahmin edilir.
+    """
+    usage = None
+    chars = 0
+    ok = False
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                chars += len(chunk.choices[0].delta.content)
+            yield chunk
+        ok = True
+    finally:
+        usage_tracker.record(
+            call_site, model,
+            getattr(usage, "prompt_tokens", 0),
+            getattr(usage, "completion_tokens", 0) if usage else chars // 4,
+            time.monotonic() - started,
+            ok=ok
+        )
+
+
+def _call_with_retries(timeout=None, **kwargs):
+    # Backend kurulamazsa (ör. API key yok) upstream sağlığıyla ilgisi yok; devreye yazılmaz
+    active_backend = get_backend()
+    deadline = time.monotonic() + (timeout or LLM_TIMEOUT)
+    attempt = 0
+    _count("calls")
+
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError("LLM upstream is degraded, request rejected")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            breaker.record_failure()
+            _count("failures")
+            raise TimeoutError("LLM call deadline exceeded")
+
+        try:
+            response = active_backend.create(timeout=remaining, **kwargs)
+            breaker.record_success()
+            return response
+        except Exception as e:
+            if not _is_retryable(e):
+                # 4xx gibi hatalar upstream sağlığını göstermez; devreyi kapalı bırak
+                breaker.record_success()
+                _count("failures")
+                raise
+
+            breaker.record_failure()
+            delay = _backoff_delay(attempt, e)
+            if attempt >= LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                _count("failures")
+                raise
+
+            logger.warning(f"LLM call failed, retrying | attempt={attempt + 1} | delay={delay:.2f}s | error={e}")
+            _count("retries")
+            time.sleep(delay)
+            attempt += 1
+
+
+def _is_retryable(error):
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _backoff_delay(attempt, error):
+    # 429'da sunucu Retry-After verdiyse ona uy
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        try:
+            if retry_after:
+                return min(float(retry_after), LLM_RETRY_CAP)
+        except ValueError:
+            pass
+
+    # Full jitter
+    return random.uniform(0, min(LLM_RETRY_CAP, LLM_RETRY_BASE * (2 ** attempt)))
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_llm_client_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["backend"] = backend.name if backend is not None else LLM_BACKEND
+    stats["breaker_state"] = breaker.state
+    stats["breaker_rejected"] = breaker.rejected
+    stats["timeout"] = LLM_TIMEOUT
+    stats["max_retries"] = LLM_MAX_RETRIES
+    stats["pool_size"] = LLM_POOL_SIZE
+    return stats
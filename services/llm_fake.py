@@ -0,0 +1,392 @@
+# services/llm_fake.py
+
+from services.llm_client import LLMBackend
+from types import SimpleNamespace
+import httpx
+import openai
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+
+"""
+Load test / offline benchmark için deterministik sahte LLM backend'i.
+Aynı mesajlar her zaman aynı içeriği üretir; prompt ailesine göre
+(prompt_builder, exam, placement, grader'lar...) şemaya uygun JSON veya metin döner.
+
+Gecikme dağılımı LLM_FAKE_LATENCY ile ayarlanır:
+    "uniform:0.2,1.2"                       -> tüm aileler için
+    "default=fixed:0.3;lesson_reading=lognormal:1.8,0.4"  -> aile bazında
+Desteklenen dağılımlar: fixed:s | uniform:a,b | normal:mu,sigma | lognormal:mu,sigma (saniye)
+LLM_FAKE_ERROR_RATE (0-1) verilirse o oranda 503 fırlatır (retry / breaker testleri için).
+"""
+
+# (aile adı, prompt içinde aranan imza) - ilk eşleşen kazanır
+PROMPT_FAMILIES = [
+    ("lesson_reading", "creating structured reading lessons"),
+    ("lesson_listening", "creating a complete listening lesson"),
+    ("lesson_speaking", "creating a speaking task"),
+    ("lesson_writing", "English writing instructor"),
+    ("sentence_listening", "creating listening practice sentences"),
+    ("sentence_pronunciation", "English pronunciation coach"),
+    ("exam_reading_listening", "Level Up Exam for English"),
+    ("exam_writing", "WRITING EXAM for Level"),
+    ("exam_speaking", "SPEAKING EXAM for Level"),
+    ("grade_summary", "Grade this summary"),
+    ("grade_writing_exam", "grade this WRITING EXAM TASK"),
+    ("grade_speaking_exam", "Grade this Speaking Exam Answer"),
+    ("placement_writing", "Placement Test Evaluator"),
+    ("placement_speaking", "Evaluate this speaking response for proficiency"),
+    ("assess_reading", "assessing a student's reading comprehension"),
+    ("assess_listening", "assessing listening comprehension"),
+    ("assess_writing", "You are an English teacher grading a student"),
+    ("assess_speaking", "expert English Speaking Examiner"),
+    ("lesson_part", "fixing one part of a"),
+    ("check_grammar", "grammar correction assistant"),
+    ("conversation", "friendly English tutor"),
+]
+
+FILLER_WORDS = [
+    "morning", "friend", "market", "weekend", "family", "city", "project", "teacher",
+    "window", "garden", "coffee", "meeting", "journey", "music", "library", "kitchen"
+]
+
+
+class FakeBackend(LLMBackend):
+    name = "fake"
+
+    def __init__(self, latency=None, error_rate=0.0, chunk_size=24):
+        self.latency = latency or {"default": ("fixed", (0.0,))}
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self._latency_rng = random.Random()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency=parse_latency_spec(os.getenv("LLM_FAKE_LATENCY", "fixed:0")),
+            error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", 0))
+        )
+
+    def create(self, timeout=None, **kwargs):
+        messages = kwargs.get("messages", [])
+        model = kwargs.get("model", "fake")
+        family = detect_family(messages)
+        json_mode = (kwargs.get("response_format") or {}).get("type") == "json_object"
+
+        delay = self._sample_latency(family)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise openai.APITimeoutError(request=httpx.Request("POST", "https://fake.local/v1/chat/completions"))
+
+        if self.error_rate and self._latency_rng.random() < self.error_rate:
+            time.sleep(delay / 4)
+            request = httpx.Request("POST", "https://fake.local/v1/chat/completions")
+            raise openai.InternalServerError(
+                "fake upstream error",
+                response=httpx.Response(503, request=request),
+                body=None
+            )
+
+        rng = random.Random(_seed(messages))
+        content = render_family(family, _prompt_text(messages), rng, json_mode)
+
+        max_tokens = kwargs.get("max_tokens")
+        if max_tokens and not json_mode:
+            content = " ".join(content.split()[:max_tokens])
+
+        usage = SimpleNamespace(
+            prompt_tokens=_approx_tokens(_prompt_text(messages)),
+            completion_tokens=_approx_tokens(content),
+        )
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+
+        if kwargs.get("stream"):
+            return self._stream(content, model, delay)
+
+        time.sleep(delay)
+        return SimpleNamespace(
+            id=f"fake-{_seed(messages) % 10**8}",
+            model=model,
+            choices=[SimpleNamespace(
+                index=0,
+                finish_reason="stop",
+                message=SimpleNamespace(role="assistant", content=content)
+            )],
+            usage=usage
+        )
+
+    def _stream(self, content, model, delay):
+        pieces = [content[i:i + self.chunk_size] for i in range(0, len(content), self.chunk_size)] or [""]
+        per_chunk = delay / len(pieces)
+        for piece in pieces:
+            time.sleep(per_chunk)
+            yield SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=piece), finish_reason=None)]
+            )
+
+    def _sample_latency(self, family):
+        kind, params = self.latency.get(family, self.latency.get("default", ("fixed", (0.0,))))
+        rng = self._latency_rng
+        if kind == "uniform":
+            value = rng.uniform(params[0], params[1])
+        elif kind == "normal":
+            value = rng.gauss(params[0], params[1])
+        elif kind == "lognormal":
+            value = rng.lognormvariate(params[0], params[1])
+        else:
+            value = params[0]
+        return max(0.0, value)
+
+
+# ==========================================
+# YARDIMCI FONKSİYONLAR
+# ==========================================
+
+def parse_latency_spec(spec):
+    """
+    "uniform:0.2,1" veya "default=fixed:0.1;lesson_reading=lognormal:1.5,0.4"
+    -> {"default": ("uniform", (0.2, 1.0)), ...}
+    """
+    result = {}
+    for part in (spec or "").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        family, _, dist = part.rpartition("=")
+        kind, _, raw = dist.partition(":")
+        params = tuple(float(x) for x in raw.split(",") if x.strip()) or (0.0,)
+        result[family or "default"] = (kind.strip().lower(), params)
+    result.setdefault("default", ("fixed", (0.0,)))
+    return result
+
+
+def detect_family(messages):
+    text = _prompt_text(messages)
+    for family, signature in PROMPT_FAMILIES:
+        if signature.lower() in text.lower():
+            return family
+    return "generic"
+
+
+def _prompt_text(messages):
+    return "\n".join(str(m.get("content", "")) for m in messages)
+
+
+def _seed(messages):
+    digest = hashlib.sha256(_prompt_text(messages).encode("utf-8")).hexdigest()
+    return int(digest[:16], 16)
+
+
+def _approx_tokens(text):
+    return max(1, math.ceil(len(text or "") / 4))
+
+
+def _extract(pattern, text, default=""):
+    match = re.search(pattern, text, re.IGNORECASE)
+    return match.group(1).strip() if match else default
+
+
+def _target_words(text):
+    raw = _extract(r"Target words[^\n:]*:[ \t]*\n?([^\n]*)", text)
+    return [w.strip() for w in raw.split(",") if w.strip()]
+
+
+def _topic(text):
+    topic = _extract(r"PRIMARY TOPIC[^\n:]*:[ \t]*\n?([^\n]+)", text) or _extract(r"Primary topic:\s*([^\n]+)", text)
+    return (topic or "daily-life").replace("-", " ")
+
+
+def _level(text):
+    return _extract(r"Level:?\s*\(?(?:Level:\s*)?([ABC][12])", text, "B1")
+
+
+def _sentences(topic, words, rng, min_words, max_words):
+    """
+    Konu ve hedef kelimelerden min_words-max_words arası kelime sayısına sahip düzgün bir metin üretir.
+    """
+    pool = list(words) + [w for w in FILLER_WORDS if w not in words]
+    templates = [
+        "Every {a} people in the town talk about {topic} and the {b}.",
+        "Last week my {a} explained why {topic} matters for the {b}.",
+        "We often meet near the {a} to discuss {topic} in a calm way.",
+        "The {a} was important because it changed how we see the {b}.",
+        "Many visitors remember the {a} and the quiet {b} of this place.",
+        "She wrote a short note about the {a} and shared it with her {b}.",
+    ]
+    sentences = []
+    count = 0
+    i = 0
+    while count < min_words:
+        a = pool[i % len(pool)]
+        b = pool[(i + 3) % len(pool)]
+        sentence = rng.choice(templates).format(a=a, b=b, topic=topic)
+        n = len(sentence.split())
+        if count + n > max_words:
+            break
+        sentences.append(sentence)
+        count += n
+        i += 1
+    return sentences
+
+
+def _mc_question(rng, question, correct, distractors):
+    options = [correct] + distractors[:3]
+    rng.shuffle(options)
+    return {"question": question, "options": options, "correct_index": options.index(correct)}
+
+
+def _blank_items(sentences, rng, count=5, answer_key="answer"):
+    items = []
+    for sentence in sentences:
+        candidates = [w.strip(".,") for w in sentence.split() if len(w.strip(".,")) > 3]
+        if not candidates:
+            continue
+        answer = rng.choice(candidates)
+        items.append({"sentence": sentence.replace(answer, "___", 1), answer_key: answer})
+        if len(items) == count:
+            break
+    return items
+
+
+def render_family(family, text, rng, json_mode):
+    level = _level(text)
+    topic = _topic(text)
+    words = _target_words(text)
+
+    if family == "lesson_reading":
+        sentences = _sentences(topic, words, rng, 140, 180)
+        body = " ".join(sentences)
+        questions = []
+        for i in range(5):
+            evidence = sentences[i % len(sentences)]
+            q = _mc_question(
+                rng,
+                f"According to the text, what is true about sentence {i + 1}?",
+                evidence.split()[-1].strip("."),
+                ["nothing", "a holiday", "the weather", "a sport"]
+            )
+            q["evidence"] = evidence
+            questions.append(q)
+        payload = {
+            "title": f"A Day About {topic.title()}",
+            "text": body,
+            "challenge_words": [{"word": w, "meaning_tr": w} for w in words[:3]],
+            "questions": questions
+        }
+
+    elif family == "lesson_listening":
+        sentences = _sentences(topic, words, rng, 90, 120)
+        payload = {
+            "title": f"Listening: {topic.title()}",
+            "audio_text": " ".join(sentences),
+            "fill_in_the_blanks": _blank_items(sentences, rng),
+            "multiple_choice": [
+                _mc_question(rng, f"What does the speaker say in part {i + 1}?",
+                             sentences[i % len(sentences)].split()[1],
+                             ["a train", "a song", "a storm", "a game"])
+                for i in range(5)
+            ]
+        }
+
+    elif family == "lesson_speaking":
+        payload = {"title": "Speaking Task", "task": f"Talk about your experience with {topic}. Why is it important to you?"}
+
+    elif family == "lesson_writing":
+        return f"Write about {topic} in your daily life and explain your opinion with examples."
+
+    elif family == "sentence_listening":
+        return " ".join(_sentences(topic, words, rng, 10, 22)[:1])
+
+    elif family == "sentence_pronunciation":
+        return f"I like {topic} every {rng.choice(FILLER_WORDS)}."
+
+    elif family == "lesson_part":
+        part = _extract(r'"(fill_in_the_blanks|multiple_choice|questions)"', text, "multiple_choice")
+        sentences = [s for s in re.split(r"(?<=[.!?])\s+", _extract(r"Text \(DO NOT CHANGE\):\s*\n([^\n]+)", text)) if s]
+        if part == "fill_in_the_blanks":
+            payload = {part: _blank_items(sentences, rng)}
+        else:
+            payload = {part: [
+                _mc_question(rng, f"What is mentioned in part {i + 1}?", "the topic", ["a train", "a song", "a storm"])
+                for i in range(5)
+            ]}
+
+    elif family == "exam_reading_listening":
+        parts = []
+        for part_id in (1, 2):
+            sentences = _sentences(topic, words, rng, 140, 160 if level in ["A1", "A2"] else 300)
+            parts.append({
+                "id": part_id,
+                "text": " ".join(sentences),
+                "mc_questions": [
+                    _mc_question(rng, f"What is the main idea of paragraph {i + 1}?", "daily routines",
+                                 ["sports", "travel", "history", "cooking"])
+                    for i in range(5)
+                ],
+                "fib_questions": _blank_items(sentences, rng, answer_key="correct_word"),
+                "tf_questions": [
+                    {"statement": s, "answer": rng.choice(["True", "False", "Not Given"])}
+                    for s in sentences[:5]
+                ]
+            })
+        payload = {"parts": parts}
+
+    elif family == "exam_writing":
+        payload = {"tasks": [
+            {"id": 1, "topic": "Write an email to a friend", "instructions": "Invite your friend to an event.", "constraints": "Use 3 past tense verbs"},
+            {"id": 2, "topic": f"Essay about {topic}", "instructions": "Give your opinion with reasons.", "constraints": "Use 'However' and 'Therefore'"}
+        ]}
+
+    elif family == "exam_speaking":
+        payload = {"tasks": [
+            {"id": 1, "type": "interview", "prompt": "Answer these: 1. Where do you live? 2. What do you do? 3. What do you enjoy?"},
+            {"id": 2, "type": "long_turn", "prompt": f"Talk about {topic}. You should say: - What it is - Who is involved - Why it matters"}
+        ]}
+
+    elif family in ["grade_summary", "grade_writing_exam", "grade_speaking_exam", "placement_speaking"]:
+        payload = {"score": rng.randint(40, 95)}
+
+    elif family == "placement_writing":
+        payload = {"ai_score": rng.randint(20, 90)}
+
+    elif family in ["assess_reading", "assess_listening"]:
+        payload = {"score": rng.randint(40, 95), "feedback": "Ana fikri doğru yakalamışsın, bazı detaylar eksik."}
+
+    elif family == "assess_writing":
+        scores = [rng.randint(40, 95) for _ in range(3)]
+        payload = {
+            "status": "valid",
+            "score": int(scores[0] * 0.3 + scores[1] * 0.3 + scores[2] * 0.4),
+            "grammar_score": scores[0],
+            "vocab_score": scores[1],
+            "coherence_score": scores[2],
+            "corrected_text": "This is the corrected version of the text.",
+            "feedback_points": ["Gramer genel olarak iyi.", "Kelime çeşitliliğini artırabilirsin."],
+            "mistakes": [{"original": "is go", "correction": "goes", "type": "Grammar"}]
+        }
+
+    elif family == "assess_speaking":
+        payload = {
+            "scores": {k: rng.randint(40, 95) for k in ["grammar", "vocabulary", "coherence", "task_achievement"]},
+            "corrected_text": "This is how a native speaker would say it.",
+            "feedback_tr": "Akıcılığın iyi, bağlaçları daha çok kullanabilirsin."
+        }
+
+    elif family == "check_grammar":
+        user_text = text.split("\n")[-1]
+        payload = {"corrected": user_text, "mistakes": []}
+
+    elif family == "conversation":
+        return "That sounds great! Could you tell me a little more about it?"
+
+    else:
+        payload = {}
+
+    if json_mode or family not in ["conversation", "lesson_writing", "sentence_listening", "sentence_pronunciation"]:
+        return json.dumps(payload, ensure_ascii=False)
+    return str(payload)
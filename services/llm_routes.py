@@ -0,0 +1,106 @@
+# services/llm_routes.py
+
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+"""
+Call site bazında model / max_tokens / temperature / timeout politikası.
+Tablo config/llm_routes.json'dan (veya LLM_ROUTES_PATH) okunur.
+Eşleşme sırası: tam isim -> "prefix:*" -> "default".
+"""
+
+LLM_ROUTES_PATH = os.getenv(
+    "LLM_ROUTES_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "llm_routes.json")
+)
+ROUTE_FIELDS = ["model", "max_tokens", "retry_max_tokens", "temperature", "timeout"]
+
+_routes = {}
+_lock = threading.Lock()
+_logged_overrides = set()
+
+
+def load_routes(path=None):
+    global _routes
+    path = path or LLM_ROUTES_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        logger.exception(f"LLM routes could not be loaded | path={path}")
+        raw = {}
+
+    routes = {}
+    for name, route in raw.items():
+        unknown = set(route) - set(ROUTE_FIELDS)
+        if unknown:
+            logger.warning(f"LLM route '{name}' has unknown fields: {sorted(unknown)}")
+        routes[name] = {k: v for k, v in route.items() if k in ROUTE_FIELDS}
+
+    with _lock:
+        _routes = routes
+    return routes
+
+
+def resolve_route(call_site):
+    """(eşleşen route adı, ayarlar) döner."""
+    with _lock:
+        routes = _routes
+
+    if call_site:
+        if call_site in routes:
+            return call_site, routes[call_site]
+        prefix = call_site.split(":")[0]
+        if f"{prefix}:*" in routes:
+            return f"{prefix}:*", routes[f"{prefix}:*"]
+    return "default", routes.get("default", {})
+
+
+def apply_route(call_site, kwargs, truncation_retry=False):
+    """
+    Route ayarlarını çağrı parametrelerine uygular.
+    model / temperature / timeout route'tan gelir (politika tek yerde),
+    çağrının verdiği farklı bir değer ezilirse (call_site, alan) başına bir kez loglanır.
+    max_tokens için route bir üst sınırdır: çağrı daha küçük bir değer verdiyse o korunur.
+    truncation_retry: çıktı max_tokens'ta kesildiği için tekrar deneniyor, route'un retry_max_tokens bütçesi kullanılır.
+    """
+    name, route = resolve_route(call_site)
+    kwargs = dict(kwargs)
+
+    for field in ["model", "temperature", "timeout"]:
+        if field in route:
+            if field in kwargs and kwargs[field] != route[field]:
+                _log_override(call_site, name, field, kwargs[field], route[field])
+            kwargs[field] = route[field]
+
+    if truncation_retry and "retry_max_tokens" in route:
+        kwargs["max_tokens"] = route["retry_max_tokens"]
+    elif "max_tokens" in route:
+        requested = kwargs.get("max_tokens")
+        kwargs["max_tokens"] = min(requested, route["max_tokens"]) if requested else route["max_tokens"]
+
+    return name, kwargs
+
+
+def _log_override(call_site, name, field, requested, applied):
+    key = (call_site, field)
+    with _lock:
+        if key in _logged_overrides:
+            return
+        _logged_overrides.add(key)
+    logger.warning(
+        f"LLM route overrides caller value | call_site={call_site} | route={name} | "
+        f"field={field} | requested={requested} | applied={applied}"
+    )
+
+
+def get_routes():
+    with _lock:
+        return dict(_routes)
+
+
+load_routes()
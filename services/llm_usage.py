@@ -0,0 +1,195 @@
+# services/llm_usage.py
+
+from flask import has_request_context, session
+from sqlalchemy import text
+from database import db
+from datetime import datetime, timedelta
+import atexit
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 1M token başına USD (input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+LLM_USAGE_FLUSH_INTERVAL = int(os.getenv("LLM_USAGE_FLUSH_INTERVAL", 60))
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    price_in, price_out = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4o-mini"])
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+class UsageTracker:
+    """
+    Her LLM çağrısının token / süre bilgisini (saat, call_site, user, model) bazında
+    bellekte toplar ve periyodik olarak llm_usage tablosuna upsert eder.
+    İstek yolunda DB'ye yazılmaz; sadece sayaç artırılır.
+    """
+
+    def __init__(self, flush_interval=60):
+        self.flush_interval = flush_interval
+        self._app = None
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self._app = app
+        if self._thread is None and self.flush_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="llm-usage-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def record(self, call_site, model, prompt_tokens, completion_tokens, elapsed, ok=True, user_id=None):
+        if user_id is None:
+            user_id = _current_user_id()
+
+        bucket = datetime.now().replace(minute=0, second=0, microsecond=0)
+        key = (bucket, call_site or "unknown", user_id or 0, model or "unknown")
+
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_ms": 0}
+            row["calls"] += 1
+            row["errors"] += 0 if ok else 1
+            row["prompt_tokens"] += prompt_tokens or 0
+            row["completion_tokens"] += completion_tokens or 0
+            row["total_ms"] += int(elapsed * 1000)
+
+    # ------------------------------------------
+    # FLUSH
+    # ------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._rows = self._rows, {}
+        if not rows or self._app is None:
+            self._merge_back(rows)
+            return
+
+        sql = """
+            INSERT INTO llm_usage
+                (bucket_start, call_site, user_id, model, calls, errors, prompt_tokens, completion_tokens, total_ms)
+            VALUES
+                (:bucket_start, :call_site, :user_id, :model, :calls, :errors, :prompt_tokens, :completion_tokens, :total_ms)
+            ON DUPLICATE KEY UPDATE
+                calls = calls + VALUES(calls),
+                errors = errors + VALUES(errors),
+                prompt_tokens = prompt_tokens + VALUES(prompt_tokens),
+                completion_tokens = completion_tokens + VALUES(completion_tokens),
+                total_ms = total_ms + VALUES(total_ms)
+        """
+        params = [
+            {"bucket_start": b, "call_site": cs, "user_id": u, "model": m, **row}
+            for (b, cs, u, m), row in rows.items()
+        ]
+        try:
+            with self._app.app_context():
+                with db.engine.connect() as conn:
+                    with conn.begin():
+                        conn.execute(text(sql), params)
+        except Exception:
+            # Sayaçlar kaybolmasın, bir sonraki flush'ta tekrar denenir
+            logger.exception("LLM usage flush failed")
+            self._merge_back(rows)
+
+    def _merge_back(self, rows):
+        with self._lock:
+            for key, row in rows.items():
+                current = self._rows.setdefault(key, {k: 0 for k in row})
+                for k, v in row.items():
+                    current[k] += v
+
+    def pending_rows(self):
+        with self._lock:
+            return {key: dict(row) for key, row in self._rows.items()}
+
+    # ------------------------------------------
+    # RAPOR
+    # ------------------------------------------
+
+    def get_report(self, hours=24, top_users=10):
+        """
+        Son `hours` saat için call_site ve kullanıcı bazında token, süre ve tahmini maliyet.
+        Henüz flush edilmemiş sayaçlar da dahildir.
+        """
+        since = datetime.now() - timedelta(hours=hours)
+        rows = []
+        try:
+            with db.engine.connect() as conn:
+                result = conn.execute(text("""
+                    SELECT call_site, user_id, model,
+                           SUM(calls), SUM(errors), SUM(prompt_tokens), SUM(completion_tokens), SUM(total_ms)
+                    FROM llm_usage
+                    WHERE bucket_start >= :since
+                    GROUP BY call_site, user_id, model
+                """), {"since": since.replace(minute=0, second=0, microsecond=0)}).fetchall()
+            rows = [tuple(r) for r in result]
+        except Exception:
+            logger.exception("LLM usage report query failed")
+
+        for (bucket, call_site, user_id, model), row in self.pending_rows().items():
+            if bucket >= since.replace(minute=0, second=0, microsecond=0):
+                rows.append((call_site, user_id, model, row["calls"], row["errors"],
+                             row["prompt_tokens"], row["completion_tokens"], row["total_ms"]))
+
+        by_site = {}
+        by_user = {}
+        for call_site, user_id, model, calls, errors, p_tok, c_tok, total_ms in rows:
+            calls, errors, p_tok, c_tok, total_ms = int(calls), int(errors), int(p_tok), int(c_tok), int(total_ms)
+            cost = estimate_cost(model, p_tok, c_tok)
+
+            site = by_site.setdefault(call_site, {
+                "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "total_ms": 0, "cost_usd": 0.0, "models": set()
+            })
+            site["calls"] += calls
+            site["errors"] += errors
+            site["prompt_tokens"] += p_tok
+            site["completion_tokens"] += c_tok
+            site["total_ms"] += total_ms
+            site["cost_usd"] += cost
+            site["models"].add(model)
+
+            user = by_user.setdefault(user_id, {"calls": 0, "tokens": 0, "cost_usd": 0.0})
+            user["calls"] += calls
+            user["tokens"] += p_tok + c_tok
+            user["cost_usd"] += cost
+
+        for site in by_site.values():
+            site["avg_ms"] = int(site["total_ms"] / site["calls"]) if site["calls"] else 0
+            site["cost_usd"] = round(site["cost_usd"], 4)
+            site["models"] = sorted(site["models"])
+
+        users = sorted(by_user.items(), key=lambda kv: kv[1]["cost_usd"], reverse=True)[:top_users]
+        return {
+            "hours": hours,
+            "call_sites": dict(sorted(by_site.items(), key=lambda kv: kv[1]["cost_usd"], reverse=True)),
+            "top_users": [{"user_id": uid, **u, "cost_usd": round(u["cost_usd"], 4)} for uid, u in users],
+            "total_cost_usd": round(sum(s["cost_usd"] for s in by_site.values()), 4)
+        }
+
+
+def _current_user_id():
+    # Arka plan thread'lerinde (lesson pool refill vb.) request yoktur -> 0
+    if has_request_context():
+        return session.get("user_id") or 0
+    return 0
+
+
+usage_tracker = UsageTracker(flush_interval=LLM_USAGE_FLUSH_INTERVAL)
@@ -1,17 +1,13 @@
-import os
-from openai import OpenAI
+from services.llm_client import chat_completion
 import json
 
-# Eğer .env kullanıyorsanız oradan çeker, yoksa buraya string olarak yazabilirsiniz (güvenlik için env önerilir)
-# os.environ["OPENAI_API_KEY"] = "sk-..." 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
 def get_gpt_response(prompt):
     """
     Verilen prompt'u GPT'ye gönderir ve JSON formatında yanıt almaya zorlar.
     """
     try:
-        response = client.chat.completions.create(
+        response = chat_completion(
+            call_site="get_gpt_response",
             model="gpt-4o",  # veya gpt-3.5-turbo-1106 (json modu destekleyen bir model seçin)
             messages=[
                 {"role": "system", "content": "You are a helpful assistant designed to output JSON."},
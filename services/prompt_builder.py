@@ -1,43 +1,115 @@
+from services.tokens import count_message_tokens
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Skill bazında token bütçeleri: input = prompt üst sınırı, output = max_tokens
+# Output bütçeleri en uzun seviyenin (C1) çıktısına göre biraz pay bırakılarak seçildi
+# retry_output: çıktı max_tokens'a takılıp kesilirse (finish_reason == "length") yeniden üretimde kullanılan tam bütçe
+PROMPT_BUDGETS = {
+    "reading": {"input": 450, "output": 1400, "retry_output": 2500},
+    "listening": {"input": 500, "output": 1000, "retry_output": 2000},
+    "speaking": {"input": 260, "output": 150, "retry_output": 400},
+    "writing": {"input": 220, "output": 150},
+    "lesson_part": {"input": 500, "output": 600, "retry_output": 1200},
+    "exam_reading_listening": {"output": 3000},
+    "exam_writing": {"output": 500},
+    "exam_speaking": {"output": 400},
+}
+
+# full | compact
+PROMPT_VARIANT = os.getenv("PROMPT_VARIANT", "full")
+MIN_TARGET_WORDS = 3
+
+
 def build_prompt(
     skill,
     level,
     primary_topic,
     secondary_topic=None,
-    target_words=None
+    target_words=None,
+    compact=False
 ):   
     if skill == "speaking":
         print("speaking primary_topic:", primary_topic)
         print("speaking secondary_topic:", secondary_topic)
         print("speaking target_words:", target_words)
         print("level:", level)
-        return build_speaking_prompt(level, primary_topic, secondary_topic, target_words)
+        return build_speaking_prompt(level, primary_topic, secondary_topic, target_words, compact=compact)
     
     if skill == "listening":
         print("listening primary_topic:", primary_topic)
         print("listening secondary_topic:", secondary_topic)
         print("listening target_words:", target_words)
         print("level:", level)
-        return build_listening_prompt(level, primary_topic, secondary_topic, target_words)
+        return build_listening_prompt(level, primary_topic, secondary_topic, target_words, compact=compact)
 
     if skill == "reading":
         print("reading primary_topic:", primary_topic)
         print("reading secondary_topic:", secondary_topic)
         print("reading", "target_words:", target_words)
         print("level:", level)
-        return build_reading_prompt(level, primary_topic, secondary_topic, target_words)
+        return build_reading_prompt(level, primary_topic, secondary_topic, target_words, compact=compact)
 
     if skill == "writing":
         print("writing primary_topic:", primary_topic)
         print("writing secondary_topic:", secondary_topic)
         print("writing target_words:", target_words)
         print("level:", level)
-        return build_writing_prompt(level, primary_topic, secondary_topic, target_words)
+        return build_writing_prompt(level, primary_topic, secondary_topic, target_words, compact=compact)
 
     raise ValueError("Unknown skill")
 
 
+def build_budgeted_prompt(
+    skill,
+    level,
+    primary_topic,
+    secondary_topic=None,
+    target_words=None,
+    compact=None
+):
+    """
+    build_prompt + bütçe kontrolü. (messages, max_tokens) döner.
+    Prompt input bütçesini aşarsa önce compact varyanta geçilir,
+    hâlâ aşıyorsa target word listesi kısaltılır.
+    """
+    if compact is None:
+        compact = PROMPT_VARIANT == "compact"
+    budget = PROMPT_BUDGETS[skill]
+    target_words = list(target_words or [])
+
+    messages = build_prompt(skill, level, primary_topic, secondary_topic, target_words, compact=compact)
+    tokens = count_message_tokens(messages)
+
+    if tokens > budget["input"] and not compact:
+        compact = True
+        messages = build_prompt(skill, level, primary_topic, secondary_topic, target_words, compact=True)
+        tokens = count_message_tokens(messages)
+
+    while tokens > budget["input"] and len(target_words) > MIN_TARGET_WORDS:
+        target_words = target_words[:-1]
+        messages = build_prompt(skill, level, primary_topic, secondary_topic, target_words, compact=True)
+        tokens = count_message_tokens(messages)
+
+    if tokens > budget["input"]:
+        logger.warning(f"Prompt over input budget | skill={skill} | tokens={tokens} | budget={budget['input']}")
+
+    return messages, budget["output"]
+
+
+def output_budget(name):
+    return PROMPT_BUDGETS[name]["output"]
+
+
+def retry_output_budget(name):
+    budget = PROMPT_BUDGETS[name]
+    return budget.get("retry_output", budget["output"])
+
 
-def build_reading_prompt(level, primary_topic, secondary_topic, target_words):
+
+def build_reading_prompt(level, primary_topic, secondary_topic, target_words, compact=False):
     target_word_list = [w["word"] for w in target_words]
     vocab_str = ", ".join(target_word_list)
 
@@ -98,6 +170,18 @@ Output JSON format:
     }}
   ]
 }}
+"""
+
+    if compact:
+        user_message = f"""Reading lesson. Level: {level}
+Primary topic: {primary_topic}
+Secondary topic (light background only): {secondary_topic}
+Target words: {vocab_str}
+
+Title and first sentence reflect the primary topic. Use each target word naturally, {level} grammar and vocabulary, no definitions.
+Then 5 questions, 4 options each, one correct, evidence = exact sentence from the text.
+
+JSON: {{"title": "", "text": "", "challenge_words": [{{"word": "{example_word}", "meaning_tr": "{example_meaning}"}}], "questions": [{{"question": "", "options": ["", "", "", ""], "correct_index": 0, "evidence": ""}}]}}
 """
 
     return [ 
@@ -105,7 +189,7 @@ Output JSON format:
         {"role": "user", "content": user_message}
     ]
 
-def build_writing_prompt(level, primary_topic, secondary_topic, target_words):
+def build_writing_prompt(level, primary_topic, secondary_topic, target_words, compact=False):
     target_word_list = [w["word"] for w in target_words]
     vocab_str = ", ".join(target_word_list)
 
@@ -132,6 +216,15 @@ Instructions:
 - Do NOT explain the target words
 - Keep the task appropriate for {level} level
 - Output ONLY the writing task text
+"""
+
+    if compact:
+        user_message = f"""Writing task. Level: {level}
+Primary topic: {primary_topic}
+Secondary topic: {secondary_topic}
+Target words: {vocab_str}
+
+ONE task on the primary topic asking for opinion or experience. No sample answer, no word explanations. Output only the task text.
 """
 
     return [
@@ -213,7 +306,7 @@ Rules:
     ]
 
 
-def build_listening_prompt(level, primary_topic, secondary_topic, target_words):
+def build_listening_prompt(level, primary_topic, secondary_topic, target_words, compact=False):
     target_word_list = [w["word"] for w in target_words]
     vocab_str = ", ".join(target_word_list)
 
@@ -272,6 +365,18 @@ Output JSON format (STRICT):
     }}
   ]
 }}
+"""
+
+    if compact:
+        user_message = f"""Listening lesson. Level: {level}
+Primary topic: {primary_topic}
+Secondary topic (light background only): {secondary_topic}
+Target words: {vocab_str}
+
+Text: 80–120 words, natural spoken English, real-life situation, use some target words, no definitions, never mention "student", "exercise" or "listening task".
+Then EXACTLY 5 blanks (sentence copied from the text, one word or short phrase replaced by ___) and EXACTLY 5 questions (4 options, one correct).
+
+JSON: {{"title": "", "audio_text": "", "fill_in_the_blanks": [{{"sentence": "... ___ ...", "answer": ""}}], "multiple_choice": [{{"question": "", "options": ["", "", "", ""], "correct_index": 0}}]}}
 """
 
     return [
@@ -279,7 +384,7 @@ Output JSON format (STRICT):
         {"role": "user", "content": user_message}
     ]
 
-def build_speaking_prompt(level, primary_topic, secondary_topic, target_words):
+def build_speaking_prompt(level, primary_topic, secondary_topic, target_words, compact=False):
     target_word_list = [w["word"] for w in target_words]
     vocab_str = ", ".join(target_word_list)
 
@@ -309,6 +414,64 @@ Output JSON format:
   "title": "Speaking Task",
   "task": "The actual question or instruction for the student to speak about.",
 }}
+"""
+
+    if compact:
+        user_message = f"""Speaking task. Level: {level}
+PRIMARY TOPIC: {primary_topic}
+Secondary topic: {secondary_topic}
+Target words (never mention): {vocab_str}
+
+ONE prompt for 20–30 seconds of speaking (opinion, explanation or experience). No reading or repeating.
+
+JSON: {{"title": "Speaking Task", "task": ""}}
+"""
+
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def build_lesson_part_prompt(skill, level, lesson, part):
+    """
+    Dersin sadece bozuk bir parçasını (ör. multiple_choice) yeniden ürettirmek için.
+    Metin aynen korunur, model yalnızca istenen parçayı döner.
+    """
+    text = lesson.get("audio_text") if skill == "listening" else lesson.get("text")
+
+    if part == "fill_in_the_blanks":
+        rules = """- Create EXACTLY 5 fill-in-the-blank items
+- Each sentence MUST be copied exactly from the text
+- Each blank replaces ONE important word or short phrase that appears in that sentence"""
+        example = '[ { "sentence": "... ___ ...", "answer": "..." } ]'
+    else:
+        rules = """- Create EXACTLY 5 multiple-choice questions about the text
+- Each question has 4 different options
+- Only ONE correct answer, given as correct_index (0-3)"""
+        example = '[ { "question": "...", "options": ["A", "B", "C", "D"], "correct_index": 0 } ]'
+        if part == "questions":
+            rules += "\n- Provide the exact sentence from the text as evidence"
+            example = '[ { "question": "...", "options": ["A", "B", "C", "D"], "correct_index": 0, "evidence": "exact sentence" } ]'
+
+    system_message = (
+        f"You are an English teacher fixing one part of a {skill} lesson.\n"
+        "Return ONLY a valid JSON object. Do not add explanations."
+    )
+
+    user_message = f"""
+Level: {level}
+
+Text (DO NOT CHANGE):
+{text}
+
+Rules:
+{rules}
+
+Output JSON format (STRICT):
+{{
+  "{part}": {example}
+}}
 """
 
     return [
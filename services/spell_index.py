@@ -0,0 +1,291 @@
+# services/spell_index.py
+
+from collections import deque
+from sqlalchemy import text
+from database import db, register_vocab_listener, get_vocab_version
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+"""
+vocab.word üzerinde yazım hatasına toleranslı arama (SymSpell "symmetric delete").
+
+Build: her kelimenin ilk PREFIX_LENGTH harfinden harf silinmiş varyantları -> kelime index'i sözlüğüne yazılır.
+Silme derinliği kelimenin eşleşebileceği en büyük mesafe kadardır (_index_distance): mesafe-2 lookup'ı
+sadece 9+ harfli sorgularda yapıldığı için 7 harften kısa kelimelere sadece 1 harf silinmiş varyantlar yazılır.
+Build uygulama açılışını (ve flask CLI komutlarını) bekletmez, arka plan thread'inde yapılır;
+bitene kadar lookup'lar miss döner ve çeviri dış servise gider.
+Lookup: sorgunun silme varyantları aynı sözlükte aranır, adaylar gerçek mesafe
+(bitişik harf yer değiştirmeli Levenshtein) ile doğrulanır. Aday sayısı küçük kaldığı için lookup mikro saniyeler sürer.
+
+Yanlış eşleşmeyi azaltmak için:
+- kısa kelimelerde tolerans düşük (MIN_LENGTH_FOR_DISTANCE)
+- en iyi mesafede birden fazla farklı kelime varsa (ör. "sheap" -> sheep / cheap) eşleşme yok sayılır
+"""
+
+SPELL_MAX_DISTANCE = int(os.getenv("SPELL_MAX_DISTANCE", 2))
+SPELL_PREFIX_LENGTH = int(os.getenv("SPELL_PREFIX_LENGTH", 7))
+# mesafe -> bu mesafeye izin verilen minimum sorgu uzunluğu
+MIN_LENGTH_FOR_DISTANCE = {1: 5, 2: 9}
+LATENCY_SAMPLES = 1000
+
+_WORD_RE = re.compile(r"^[a-z][a-z'\- ]*$")
+
+
+def normalize_term(value):
+    return " ".join((value or "").strip().strip(".,!?;:\"()").lower().split())
+
+
+def osa_distance(a, b, max_distance):
+    """Optimal string alignment mesafesi; max_distance aşılınca max_distance + 1 döner."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _index_distance(length, max_distance):
+    """
+    length harfli bir kelime için index'e yazılacak silme derinliği.
+    Sorgu kelimeden en fazla d harf uzun olabilir; length + d, d için gereken sorgu uzunluğuna
+    ulaşmıyorsa o mesafede hiç lookup yapılmaz ve varyantlara gerek yoktur.
+    """
+    return max([d for d, min_len in MIN_LENGTH_FOR_DISTANCE.items()
+                if d <= max_distance and length + d >= min_len] or [0])
+
+
+def _deletes(term, distance):
+    """term'den en fazla `distance` harf silinerek elde edilen tüm varyantlar (term dahil)."""
+    result = {term}
+    frontier = {term}
+    for _ in range(distance):
+        next_frontier = set()
+        for item in frontier:
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        next_frontier -= result
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+class SpellIndex:
+    """SymSpell index'i. lookup(word) -> {"vocab_id", "word", "distance"} veya None."""
+
+    def __init__(self, max_distance=SPELL_MAX_DISTANCE, prefix_length=SPELL_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._app = None
+        self._lock = threading.Lock()
+        self._words = []
+        self._ids = []
+        self._exact = {}
+        self._deletes = {}
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._rebuild_pending = False
+        self._rebuild_running = False
+        self._stats = {
+            "loaded": False,
+            "build_ms": 0,
+            "words": 0,
+            "delete_keys": 0,
+            "memory_bytes": 0,
+            "lookups": 0,
+            "exact_hits": 0,
+            "typo_hits": 0,
+            "ambiguous": 0,
+            "misses": 0,
+            "refresh_count": 0,
+            "version": None
+        }
+
+    def init_app(self, app):
+        self._app = app
+        register_vocab_listener(self._on_vocab_change)
+        if os.getenv("SPELL_INDEX", "1") == "1":
+            # İlk build de rebuild döngüsünde yapılır; build sırasında gelen yazımlar bir sonraki tura kalır
+            with self._lock:
+                self._rebuild_pending = True
+                self._rebuild_running = True
+            threading.Thread(target=self._rebuild_loop, name="spell-index-build", daemon=True).start()
+
+    @property
+    def loaded(self):
+        return self._stats["loaded"]
+
+    # ------------------------------------------
+    # BUILD
+    # ------------------------------------------
+
+    def build(self):
+        version = get_vocab_version()
+        with db.engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, word FROM vocab")).fetchall()
+        self.build_from_rows(rows, version)
+
+    def build_from_rows(self, rows, version=None):
+        """rows: (vocab_id, word). Benchmark DB'siz kurulum için de kullanır."""
+        started = time.perf_counter()
+        words, ids, exact, deletes = [], [], {}, {}
+
+        for vid, word in rows:
+            term = normalize_term(word)
+            if not term or term in exact:
+                continue
+            index = len(words)
+            words.append(term)
+            ids.append(vid)
+            exact[term] = index
+            # Çok kelimeli ve toleransa girmeyecek kadar kısa kelimeler sadece birebir eşleşir
+            distance = _index_distance(len(term), self.max_distance)
+            if " " in term or distance == 0:
+                continue
+            for variant in _deletes(term[:self.prefix_length], distance):
+                # Çoğu varyant tek kelimeye ait; liste yerine int saklanır
+                current = deletes.get(variant)
+                if current is None:
+                    deletes[variant] = index
+                elif isinstance(current, int):
+                    deletes[variant] = [current, index]
+                else:
+                    current.append(index)
+
+        with self._lock:
+            self._words, self._ids, self._exact, self._deletes = words, ids, exact, deletes
+            self._stats.update({
+                "loaded": True,
+                "build_ms": round((time.perf_counter() - started) * 1000, 1),
+                "words": len(words),
+                "delete_keys": len(deletes),
+                "memory_bytes": _estimate_memory(words, exact, deletes),
+                "version": version
+            })
+        logger.info(f"Spell index built | words={len(words)} | keys={len(deletes)} | ms={self._stats['build_ms']}")
+
+    def _on_vocab_change(self, action, vocab_id):
+        # vocab_index ile aynı: art arda yazımlar tek rebuild'de birleşir
+        with self._lock:
+            if not self._stats["loaded"] and not self._rebuild_running:
+                return
+            self._rebuild_pending = True
+            if self._rebuild_running:
+                return
+            self._rebuild_running = True
+        threading.Thread(target=self._rebuild_loop, name="spell-index-refresh", daemon=True).start()
+
+    def _rebuild_loop(self):
+        while True:
+            with self._lock:
+                if not self._rebuild_pending:
+                    self._rebuild_running = False
+                    return
+                self._rebuild_pending = False
+            refresh = self.loaded
+            try:
+                with self._app.app_context():
+                    self.build()
+                if refresh:
+                    with self._lock:
+                        self._stats["refresh_count"] += 1
+            except Exception:
+                logger.exception("Spell index build failed, translation falls back to external service")
+
+    # ------------------------------------------
+    # LOOKUP
+    # ------------------------------------------
+
+    def lookup(self, query):
+        started = time.perf_counter()
+        result, outcome = self._lookup(normalize_term(query))
+        elapsed_us = (time.perf_counter() - started) * 1_000_000
+        with self._lock:
+            self._stats["lookups"] += 1
+            self._stats[outcome] += 1
+            self._latencies.append(elapsed_us)
+        return result
+
+    def _lookup(self, term):
+        with self._lock:
+            words, ids, exact, deletes = self._words, self._ids, self._exact, self._deletes
+
+        if not term:
+            return None, "misses"
+        index = exact.get(term)
+        if index is not None:
+            return {"vocab_id": ids[index], "word": words[index], "distance": 0}, "exact_hits"
+        if " " in term or not _WORD_RE.match(term):
+            return None, "misses"
+
+        allowed = max([d for d, min_len in MIN_LENGTH_FOR_DISTANCE.items()
+                       if len(term) >= min_len and d <= self.max_distance] or [0])
+        if allowed == 0:
+            return None, "misses"
+
+        candidates = set()
+        for variant in _deletes(term[:self.prefix_length], allowed):
+            found = deletes.get(variant)
+            if found is None:
+                continue
+            if isinstance(found, int):
+                candidates.add(found)
+            else:
+                candidates.update(found)
+
+        best, best_distance = [], allowed + 1
+        for index in candidates:
+            distance = osa_distance(term, words[index], allowed)
+            if distance < best_distance:
+                best, best_distance = [index], distance
+            elif distance == best_distance:
+                best.append(index)
+
+        if not best or best_distance > allowed:
+            return None, "misses"
+        if len(best) > 1:
+            # "sheap" -> sheep / cheap: hangisi olduğu bilinemez, dış servise bırak
+            return None, "ambiguous"
+        index = best[0]
+        return {"vocab_id": ids[index], "word": words[index], "distance": best_distance}, "typo_hits"
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+        if latencies:
+            stats["lookup_us_p50"] = round(latencies[len(latencies) // 2], 1)
+            stats["lookup_us_p99"] = round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 1)
+        stats["max_distance"] = self.max_distance
+        stats["prefix_length"] = self.prefix_length
+        stats["current_version"] = get_vocab_version()
+        stats["stale"] = stats["version"] != stats["current_version"]
+        return stats
+
+
+def _estimate_memory(words, exact, deletes):
+    size = sys.getsizeof(words) + sys.getsizeof(exact) + sys.getsizeof(deletes)
+    size += sum(sys.getsizeof(w) for w in words)
+    for key, value in deletes.items():
+        size += sys.getsizeof(key) + (sys.getsizeof(value) if isinstance(value, list) else 0)
+    return size
+
+
+spell_index = SpellIndex()
@@ -1,16 +1,22 @@
 from database import db
 from sqlalchemy import text
 import logging
+import os
+import random
+import threading
 from services.fallback_policy import FallbackPolicy
+from services.vocab_index import vocab_index
+from services.word_exposure import word_exposure
 
 logger = logging.getLogger(__name__)
 
+# vocab_pos.pos değerleri; "any" POS filtresi uygulanmaz
 POS_MAP = {
-    "noun": "%n.%",
-    "verb": "%v.%",
-    "adjective": "%adj%",
-    "adverb": "%adv%",
-    "any": "%"
+    "noun": "noun",
+    "verb": "verb",
+    "adjective": "adjective",
+    "adverb": "adverb",
+    "any": None
 }
 
 RELAX_MAP = {
@@ -27,54 +33,72 @@ pos_plan = [
     ("adverb", 2),
 ]
 
-def get_target_words(level, primary_topic, secondary_topic=None, limit=10):
-    policy = FallbackPolicy()
-    attempts = policy.get_attempts(primary_topic, secondary_topic)
+# windowed: her topic için tüm POS havuzları tek sorguda | per_pos: her POS / relax adımı ayrı sorgu
+TARGET_WORD_SQL_MODE = os.getenv("TARGET_WORD_SQL_MODE", "windowed")
 
-    try:
-        with db.engine.connect() as conn:
+# user_id verilince her POS için count x OVERSAMPLE aday alınır, görülmemiş olanlar öne çekilir
+TARGET_WORD_OVERSAMPLE = int(os.getenv("TARGET_WORD_OVERSAMPLE", 3))
+
+_query_stats = {}
+_query_stats_lock = threading.Lock()
+
+def get_target_words(level, primary_topic, secondary_topic=None, limit=10, user_id=None):
+    """
+    Vocab index yüklüyse seçim tamamen bellekte yapılır, değilse SQL ile.
+    Fallback / relax mantığı iki kaynak için de aynıdır.
+    user_id verilirse kullanıcının daha önce gördüğü kelimeler geri plana atılır (word_exposure).
+    """
+    is_seen = word_exposure.seen_checker(user_id)
 
-            for attempt in attempts:
-                results = []
-
-                for pos, count in pos_plan:
-                    pos_pattern = POS_MAP.get(pos, "%")
-
-                    words = _fetch_words(
-                        conn,
-                        level,
-                        attempt["topic"],
-                        pos_pattern,
-                        count
-                    )
-                    if len(words) < count:
-                        relaxed_chain = RELAX_MAP.get(pos, [])
-                        for relaxed_pos in relaxed_chain:
-                            missing = count - len(words)
-                            relaxed_pattern = POS_MAP.get(relaxed_pos, "%")
-
-                            relaxed_words = _fetch_words(
-                                conn,
-                                level,
-                                attempt["topic"],
-                                relaxed_pattern,
-                                missing
-                            )
-                            words.extend(relaxed_words)
-                            if len(words) >= count:
-                                break
-                            
-                    results.extend(words)
-
-                # yeterli kelime bulunduysa → DUR
-                if len(results) >= policy.min_words:
-                    logger.info(
-                        f"Target words selected | topic={attempt['topic']} | pos_strict={attempt['pos_strict']}"
-                    )
-                    return results
+    if vocab_index.loaded:
+        return select_target_words(level, primary_topic, secondary_topic, _prefer_unseen(vocab_index.fetch_words, is_seen))
 
+    mode = TARGET_WORD_SQL_MODE
+    try:
+        with db.engine.connect() as conn:
+            if mode == "windowed":
+                fetch = WindowedPoolFetcher(conn)
+            else:
+                fetch = _PerPosFetcher(conn)
+            words = select_target_words(level, primary_topic, secondary_topic, _prefer_unseen(fetch, is_seen))
+        _count_queries(mode, fetch.queries)
+        return words
     except Exception:
         logger.exception("Target word selector error")
+        return []
+
+
+def select_target_words(level, primary_topic, secondary_topic, fetch):
+    """
+    fetch(level, topic, pos, count, used) -> `used`'da olmayan kelimeler (seçilenler used'a eklenir)
+    FallbackPolicy denemeleri ve RELAX_MAP gevşetmeleri burada uygulanır.
+    """
+    policy = FallbackPolicy()
+    attempts = policy.get_attempts(primary_topic, secondary_topic)
+
+    for attempt in attempts:
+        results = []
+        # Aynı kelime hem strict hem relax adımında gelmesin
+        used = set()
+
+        for pos, count in pos_plan:
+            words = fetch(level, attempt["topic"], pos, count, used)
+            if len(words) < count:
+                relaxed_chain = RELAX_MAP.get(pos, [])
+                for relaxed_pos in relaxed_chain:
+                    missing = count - len(words)
+                    words.extend(fetch(level, attempt["topic"], relaxed_pos, missing, used))
+                    if len(words) >= count:
+                        break
+
+            results.extend(words)
+
+        # yeterli kelime bulunduysa → DUR
+        if len(results) >= policy.min_words:
+            logger.info(
+                f"Target words selected | topic={attempt['topic']} | pos_strict={attempt['pos_strict']}"
+            )
+            return results
 
     # hiçbir deneme başarılı değilse
     logger.warning(
@@ -83,30 +107,171 @@ def get_target_words(level, primary_topic, secondary_topic=None, limit=10):
     return []
 
 
-def _fetch_words(conn, level, topic, pos_pattern, limit):
-    sql = """
+def _prefer_unseen(fetch, is_seen):
+    """
+    fetch'i, istenenin OVERSAMPLE katı aday çekip görülmemişleri öne alacak şekilde sarar.
+    Adaylar aynı sorgu / havuzdan gelir, kelime başına ek SQL yoktur.
+    Sadece seçilen kelimeler used'a eklenir; elenen adaylar relax adımlarında tekrar kullanılabilir.
+    """
+    if is_seen is None:
+        return fetch
+
+    def wrapped(level, topic, pos, count, used):
+        candidates = fetch(level, topic, pos, count * TARGET_WORD_OVERSAMPLE, set(used))
+        # sorted stabil: görülmemişler önce, kendi içinde rastgele sıra korunur
+        picked = sorted(candidates, key=lambda w: is_seen(w["word"]))[:count]
+        used.update(w["word"] for w in picked)
+        return picked
+
+    return wrapped
+
+
+def _fetch_words(conn, level, topic, pos, limit):
+    """
+    ORDER BY RAND() yerine rand_key üzerinde range seek:
+    rastgele bir başlangıç noktası seçilir, (level, rand_key) index'i üzerinden
+    o noktadan sonraki ilk `limit` kelime alınır; yetmezse baştan devam edilir (wrap-around).
+    POS filtresi vocab_pos üzerinde eşitlikle yapılır ((level, pos) index'i).
+    """
+    pos_join = "JOIN vocab_pos vp ON vp.vocab_id = v.id AND vp.level = :level AND vp.pos = :pos" if pos else ""
+    sql = f"""
         SELECT v.word, v.word_type, v.meaning
         FROM vocab v
         JOIN vocab_topics vt ON v.id = vt.vocab_id
         JOIN topics t ON vt.topic_id = t.id
+        {pos_join}
         WHERE v.level = :level
           AND t.slug = :topic
-          AND v.word_type LIKE :pos
-        ORDER BY RAND()
+          AND v.rand_key {{op}} :start
+        ORDER BY v.rand_key
         LIMIT :limit
     """
+    params = {
+        "level": level,
+        "topic": topic,
+        "pos": pos,
+        "start": random.random(),
+        "limit": limit
+    }
 
-    rows = conn.execute(
-        text(sql),
-        {
-            "level": level,
-            "topic": topic,
-            "pos": pos_pattern,
-            "limit": limit
-        }
-    ).fetchall()
+    rows = conn.execute(text(sql.format(op=">=")), params).fetchall()
+    if len(rows) < limit:
+        params["limit"] = limit - len(rows)
+        rows += conn.execute(text(sql.format(op="<")), params).fetchall()
 
     return [
         {"word": r[0], "pos": r[1], "meaning": r[2]}
         for r in rows
     ]
+
+
+class _PerPosFetcher:
+    """Eski yol: her (topic, pos) isteği için ayrı sorgu."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.queries = 0
+
+    def __call__(self, level, topic, pos, count, used):
+        self.queries += 1
+        words = [w for w in _fetch_words(self.conn, level, topic, POS_MAP.get(pos), count) if w["word"] not in used]
+        used.update(w["word"] for w in words)
+        return words
+
+
+class WindowedPoolFetcher:
+    """
+    Bir topic'in tüm POS havuzlarını tek sorguda çeker (POS başına rand_key seek'leri UNION ALL ile),
+    sonraki POS / relax istekleri bu havuzlardan Python'da karşılanır.
+    Aynı topic'e dönen fallback denemeleri yeni sorgu atmaz.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.queries = 0
+        self._pools = {}
+
+    def __call__(self, level, topic, pos, count, used):
+        key = (level, topic)
+        if key not in self._pools:
+            self._pools[key] = _fetch_pos_pools(self.conn, level, topic, sum(c for _, c in pos_plan))
+            self.queries += 1
+
+        picked = []
+        for word in self._pools[key].get(pos, []):
+            if len(picked) >= count:
+                break
+            if word["word"] in used:
+                continue
+            used.add(word["word"])
+            picked.append(word)
+        return picked
+
+
+def _fetch_pos_pools(conn, level, topic, per_pos):
+    """
+    (level, topic) için her POS sınıfından en fazla per_pos kelime.
+    Her POS için _fetch_words'teki range seek'in iki yarısı (rand_key >= :start ve wrap-around için
+    rand_key < :start, ikisi de ORDER BY rand_key LIMIT) ayrı branch'tir; branch'ler UNION ALL ile
+    tek sorguda birleşir, her biri index üzerinde seek yapar.
+    Bir kelime birden fazla sınıfa (ör. noun ve any) düşebilir.
+    """
+    branch = """
+        (SELECT {label} AS pool, {seg} AS seg, v.rand_key, v.word, v.word_type, v.meaning
+         FROM vocab v
+         JOIN vocab_topics vt ON v.id = vt.vocab_id
+         JOIN topics t ON vt.topic_id = t.id
+         {pos_join}
+         WHERE v.level = :level
+           AND t.slug = :topic
+           AND v.rand_key {op} :start
+         ORDER BY v.rand_key
+         LIMIT :per_pos)
+    """
+    params = {"level": level, "topic": topic, "start": random.random(), "per_pos": per_pos}
+
+    branches = []
+    for i, (name, pos) in enumerate(POS_MAP.items()):
+        params[f"pool_{i}"] = name
+        pos_join = ""
+        if pos:
+            params[f"pos_{i}"] = pos
+            pos_join = f"JOIN vocab_pos vp ON vp.vocab_id = v.id AND vp.level = :level AND vp.pos = :pos_{i}"
+        for seg, op in enumerate([">=", "<"]):
+            branches.append(branch.format(label=f":pool_{i}", seg=seg, pos_join=pos_join, op=op))
+
+    sql = f"""
+        SELECT pool, word, word_type, meaning
+        FROM ({" UNION ALL ".join(branches)}) seeks
+        ORDER BY pool, seg, rand_key
+    """
+
+    pools = {}
+    for pos, word, word_type, meaning in conn.execute(text(sql), params).fetchall():
+        pool = pools.setdefault(pos, [])
+        # Wrap-around yarısı yalnızca ilk yarı yetmediğinde kullanılır
+        if len(pool) < per_pos:
+            pool.append({"word": word, "pos": word_type, "meaning": meaning})
+    return pools
+
+
+def _count_queries(mode, queries):
+    with _query_stats_lock:
+        stats = _query_stats.setdefault(mode, {"selections": 0, "queries": 0})
+        stats["selections"] += 1
+        stats["queries"] += queries
+
+
+def get_selector_stats():
+    """
+    SQL yolunda seçim başına ortalama sorgu sayısı (mode bazında) + vocab index durumu.
+    """
+    with _query_stats_lock:
+        modes = {mode: dict(s) for mode, s in _query_stats.items()}
+    for s in modes.values():
+        s["queries_per_selection"] = round(s["queries"] / s["selections"], 2) if s["selections"] else 0.0
+    return {
+        "source": "index" if vocab_index.loaded else "sql",
+        "sql_mode": TARGET_WORD_SQL_MODE,
+        "sql": modes
+    }
@@ -0,0 +1,57 @@
+# services/tokens.py
+
+import logging
+import math
+import re
+
+"""
+Lokal token sayımı. tiktoken kuruluysa modelin gerçek encoding'i kullanılır,
+değilse kelime / noktalama bazlı yaklaşık bir sayım yapılır (İngilizce metinde ~%10 sapma).
+"""
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+    # requirements.txt'te var; yoksa bütçe kontrolü yaklaşık sayımla çalışır
+    logging.getLogger(__name__).warning("tiktoken is not installed, token budgets use the heuristic counter")
+
+# Chat formatında her mesaj için eklenen sabit token'lar (role, ayırıcılar)
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+
+_encodings = {}
+
+
+def _get_encoding(model):
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encodings[model] = tiktoken.get_encoding("o200k_base")
+    return _encodings[model]
+
+
+def count_tokens(text, model="gpt-4o-mini"):
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+
+    # Yaklaşık: kelimeler + noktalama / JSON işaretleri, uzun kelimeler birden fazla token
+    pieces = re.findall(r"\w+|[^\w\s]", text)
+    return sum(max(1, math.ceil(len(p) / 6)) if p[0].isalnum() else 1 for p in pieces)
+
+
+def count_message_tokens(messages, model="gpt-4o-mini"):
+    total = REPLY_OVERHEAD
+    for message in messages:
+        total += MESSAGE_OVERHEAD + count_tokens(message.get("content", ""), model)
+    return total
+
+
+def tokenizer_name():
+    return "tiktoken" if tiktoken is not None else "heuristic"
@@ -0,0 +1,145 @@
+# services/translation.py
+
+from database import VOCAB_LEVEL_ORDER, VOCAB_NO_LEVEL_RANK
+from services.spell_index import spell_index, normalize_term
+from services.translation_cache import translation_cache
+from services.vocab_search import vocab_search_index
+from utils import fetch_google_translation
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+"""
+/translate_word çözüm zinciri:
+1️⃣ Yerel sözlük (birebir): kelime -> anlamlar / kelime türleri, vocab_search_index kayıtlarından
+2️⃣ Çeviri cache'i (bellek + translation_cache tablosu)
+3️⃣ Dış servis (Google Translate)
+4️⃣ Yazım hatası toleranslı eşleşme (spell_index) -> en yakın yerel kayıt, sadece dış servis hata verdiyse
+   veya kapalıysa (TRANSLATION_EXTERNAL=0). Sözlükte olmayan doğru yazılmış bir kelime ("house")
+   tek harf farklı bir vocab kelimesine ("horse") çevrilmesin diye dış servisin önüne konmaz.
+Yerel cevaplar dış servisle aynı şekildedir (translatedText, alternatives, pos, ok).
+Yerel sözlük sadece en -> tr için ve arama index'i bellekteyken geçerlidir (VOCAB_SEARCH_BACKEND=sql ise atlanır).
+"""
+
+TRANSLATION_EXTERNAL = os.getenv("TRANSLATION_EXTERNAL", "1") == "1"
+MAX_ALTERNATIVES = 4
+MAX_POS = 3
+
+
+# ==========================================
+# ÇÖZÜM ZİNCİRİ
+# ==========================================
+
+class TranslationStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "local_exact": 0, "local_typo": 0, "cached": 0, "external": 0, "external_errors": 0}
+        self._local_ms = 0.0
+        self._cached_ms = 0.0
+        self._external_ms = 0.0
+
+    def record(self, outcome, elapsed_ms, error=False):
+        with self._lock:
+            self._counts["requests"] += 1
+            self._counts[outcome] += 1
+            # Dış servis hatası sonrası yazım hatası eşleşmesine düşülürse hata yine sayılır
+            if error:
+                self._counts["external_errors"] += 1
+            if outcome == "external":
+                self._external_ms += elapsed_ms
+            elif outcome == "cached":
+                self._cached_ms += elapsed_ms
+            else:
+                self._local_ms += elapsed_ms
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            local_ms, cached_ms, external_ms = self._local_ms, self._cached_ms, self._external_ms
+        local = stats["local_exact"] + stats["local_typo"]
+        stats["local_hit_ratio"] = round(local / stats["requests"], 3) if stats["requests"] else 0
+        stats["network_avoided_ratio"] = round((local + stats["cached"]) / stats["requests"], 3) if stats["requests"] else 0
+        stats["avg_local_ms"] = round(local_ms / local, 3) if local else 0
+        stats["avg_cached_ms"] = round(cached_ms / stats["cached"], 3) if stats["cached"] else 0
+        stats["avg_external_ms"] = round(external_ms / stats["external"], 1) if stats["external"] else 0
+        return stats
+
+
+translation_stats = TranslationStats()
+
+
+def resolve_translation(word, source='en', target='tr'):
+    """
+    Yerel sözlük -> çeviri cache'i -> dış servis -> (dış servis yoksa) yazım hatası eşleşmesi.
+    Dönüş fetch_google_translation ile aynı şekilde.
+    """
+    started = time.perf_counter()
+    local = source == 'en' and target == 'tr' and vocab_search_index.loaded
+
+    if local:
+        entry = vocab_search_index.find_word(normalize_term(word))
+        if entry and entry["meanings"]:
+            translation_stats.record("local_exact", (time.perf_counter() - started) * 1000)
+            return _local_response(entry, distance=0)
+
+    result = translation_cache.get(word, source, target)
+    if result is not None:
+        translation_stats.record("cached", (time.perf_counter() - started) * 1000)
+        return result
+
+    if TRANSLATION_EXTERNAL:
+        result = fetch_google_translation(word, source, target)
+        if result.get("ok"):
+            translation_stats.record("external", (time.perf_counter() - started) * 1000)
+            translation_cache.set(word, source, target, result)
+            return result
+    else:
+        result = {'error': 'External translation disabled'}
+
+    typo = _typo_response(word) if local else None
+    if typo is not None:
+        translation_stats.record("local_typo", (time.perf_counter() - started) * 1000, error=TRANSLATION_EXTERNAL)
+        return typo
+
+    translation_stats.record("external", (time.perf_counter() - started) * 1000, error=True)
+    return result
+
+
+def _typo_response(word):
+    """spell_index'in tek anlamlı eşleşmesi; cevapta düzeltilen kelime (word) ve mesafe (distance) bulunur."""
+    match = spell_index.lookup(word) if spell_index.loaded else None
+    entry = vocab_search_index.get_entry(match["vocab_id"]) if match else None
+    if not entry or not entry["meanings"]:
+        return None
+    return _local_response(entry, distance=match["distance"])
+
+
+def _local_response(entry, distance):
+    meanings = entry["meanings"]
+    # En düşük seviye (A1 -> C2) gösterilir
+    levels = sorted(entry["levels"], key=_level_rank)
+    return {
+        'translatedText': meanings[0],
+        'alternatives': list(meanings[1:MAX_ALTERNATIVES + 1]),
+        'pos': list(entry["word_types"][:MAX_POS]),
+        'ok': True,
+        'source': 'local',
+        'vocab_id': entry["id"],
+        'word': entry["word"],
+        'distance': distance,
+        'level': levels[0] if levels else None
+    }
+
+
+def _level_rank(level):
+    return VOCAB_LEVEL_ORDER.index(level) if level in VOCAB_LEVEL_ORDER else VOCAB_NO_LEVEL_RANK
+
+
+def get_translation_stats():
+    stats = translation_stats.get_stats()
+    stats["local_dictionary"] = vocab_search_index.get_stats()
+    stats["cache"] = translation_cache.get_stats()
+    return stats
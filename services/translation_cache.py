@@ -0,0 +1,248 @@
+# services/translation_cache.py
+
+from sqlalchemy import text
+from database import db
+from services.cache import TTLCache
+from utils import fetch_google_translation
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+"""
+Dış servis çevirileri için iki katmanlı cache:
+1️⃣ process içi LRU + TTL (TTLCache)
+2️⃣ kalıcı translation_cache tablosu, (metin, kaynak dil, hedef dil) anahtarıyla
+Ayrıştırılmış sonuç dict'i saklanır; tekrar eden kelimelerde hem HTTP isteği hem ayrıştırma atlanır.
+Tablo TRANSLATION_CACHE_MAX_ROWS satırla sınırlıdır, en uzun süredir kullanılmayanlar silinir.
+last_used_at / hits her DB hit'inde değil, kayıt TRANSLATION_CACHE_TOUCH_INTERVAL'dan eskiyse güncellenir:
+LRU sırası için saat mertebesinde doğruluk yeterli, okuma yolu her seferinde yazım yapmaz (hits yaklaşık değerdir).
+"""
+
+TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", 30 * 24 * 3600))
+TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", "1") == "1"
+TRANSLATION_CACHE_MAX_ROWS = int(os.getenv("TRANSLATION_CACHE_MAX_ROWS", 100000))
+TRANSLATION_CACHE_PRELOAD = int(os.getenv("TRANSLATION_CACHE_PRELOAD", 1000))
+TRANSLATION_CACHE_TOUCH_INTERVAL = int(os.getenv("TRANSLATION_CACHE_TOUCH_INTERVAL", 3600))
+# Her N yazımda bir tablo boyutu kontrol edilir
+PRUNE_EVERY = 500
+MAX_TEXT_LENGTH = 500
+
+
+def normalize_text(value):
+    return " ".join((value or "").split()).lower()
+
+
+def make_translation_key(value, source, target):
+    canonical = json.dumps([normalize_text(value), source, target], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+
+    def __init__(self):
+        self.memory = TTLCache(
+            maxsize=int(os.getenv("TRANSLATION_CACHE_SIZE", 5000)),
+            ttl=TRANSLATION_CACHE_TTL
+        )
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0, "pruned": 0, "preloaded": 0, "touches": 0}
+
+    def init_app(self, app):
+        if not TRANSLATION_CACHE_DB or not TRANSLATION_CACHE_PRELOAD:
+            return
+        try:
+            with app.app_context():
+                self.warm_memory(TRANSLATION_CACHE_PRELOAD)
+        except Exception:
+            logger.exception("Translation cache preload failed")
+
+    # ------------------------------------------
+    # OKUMA / YAZMA
+    # ------------------------------------------
+
+    def get(self, value, source, target):
+        if not _cacheable(value):
+            return None
+        result, outcome = self._lookup(make_translation_key(value, source, target))
+        self._count(outcome)
+        # Route'lar dönen dict'i değiştirebildiği için kopya veriyoruz
+        return copy.deepcopy(result) if result is not None else None
+
+    def _lookup(self, key):
+        result = self.memory.get(key)
+        if result is not None:
+            return result, "memory_hits"
+        if TRANSLATION_CACHE_DB:
+            result = self._db_get(key)
+            if result is not None:
+                self.memory.set(key, result)
+                return result, "db_hits"
+        return None, "misses"
+
+    def set(self, value, source, target, result):
+        # Hatalı cevaplar (timeout, 429...) saklanmaz
+        if not _cacheable(value) or not result or not result.get("ok"):
+            return
+        key = make_translation_key(value, source, target)
+        self.memory.set(key, copy.deepcopy(result))
+        if TRANSLATION_CACHE_DB:
+            self._db_store(key, value, source, target, result)
+
+    def _db_get(self, key):
+        sql = """
+            SELECT payload, last_used_at < NOW() - INTERVAL :touch SECOND AS needs_touch
+            FROM translation_cache
+            WHERE cache_key = :key
+              AND created_at >= NOW() - INTERVAL :ttl SECOND
+        """
+        try:
+            with db.engine.connect() as conn:
+                row = conn.execute(text(sql), {
+                    "key": key,
+                    "ttl": TRANSLATION_CACHE_TTL,
+                    "touch": TRANSLATION_CACHE_TOUCH_INTERVAL
+                }).fetchone()
+            if row is None:
+                return None
+            if row[1]:
+                # Boyut sınırında en son kullanılanlar kalsın; son dokunuş yeterince yeniyse yazım yapılmaz
+                with db.engine.connect() as conn:
+                    with conn.begin():
+                        conn.execute(text("""
+                            UPDATE translation_cache SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                            WHERE cache_key = :key
+                        """), {"key": key})
+                self._count("touches")
+            return json.loads(row[0])
+        except Exception:
+            logger.exception("Translation cache DB read error")
+            return None
+
+    def _db_store(self, key, value, source, target, result):
+        sql = """
+            INSERT INTO translation_cache (cache_key, source_text, source_lang, target_lang, payload)
+            VALUES (:key, :text, :source, :target, :payload)
+            ON DUPLICATE KEY UPDATE payload = VALUES(payload), created_at = CURRENT_TIMESTAMP,
+                                    last_used_at = CURRENT_TIMESTAMP
+        """
+        try:
+            with db.engine.connect() as conn:
+                with conn.begin():
+                    conn.execute(text(sql), {
+                        "key": key,
+                        "text": normalize_text(value),
+                        "source": source,
+                        "target": target,
+                        "payload": json.dumps(result, ensure_ascii=False)
+                    })
+        except Exception:
+            logger.exception("Translation cache DB write error")
+            return
+
+        with self._lock:
+            self._stats["writes"] += 1
+            self._writes_since_prune += 1
+            if self._writes_since_prune < PRUNE_EVERY:
+                return
+            self._writes_since_prune = 0
+        self.prune()
+
+    # ------------------------------------------
+    # BOYUT SINIRI / ISITMA
+    # ------------------------------------------
+
+    def prune(self, max_rows=TRANSLATION_CACHE_MAX_ROWS):
+        """Süresi dolan ve en son kullanılan max_rows satırın dışında kalan kayıtları siler."""
+        expired_sql = "DELETE FROM translation_cache WHERE created_at < NOW() - INTERVAL :ttl SECOND"
+        # Satır sayısı max_rows'un altındaysa alt sorgu NULL döner ve hiçbir şey silinmez
+        overflow_sql = """
+            DELETE FROM translation_cache
+            WHERE last_used_at < (
+                SELECT cutoff FROM (
+                    SELECT last_used_at AS cutoff FROM translation_cache
+                    ORDER BY last_used_at DESC
+                    LIMIT 1 OFFSET :max_rows
+                ) t
+            )
+        """
+        try:
+            with db.engine.connect() as conn:
+                with conn.begin():
+                    deleted = conn.execute(text(expired_sql), {"ttl": TRANSLATION_CACHE_TTL}).rowcount
+                    deleted += conn.execute(text(overflow_sql), {"max_rows": max_rows}).rowcount
+        except Exception:
+            logger.exception("Translation cache prune error")
+            return 0
+        self._count("pruned", deleted)
+        return deleted
+
+    def warm_memory(self, limit=TRANSLATION_CACHE_PRELOAD):
+        """En son kullanılan kayıtları tablodan process içi cache'e yükler."""
+        sql = """
+            SELECT cache_key, payload FROM translation_cache
+            WHERE created_at >= NOW() - INTERVAL :ttl SECOND
+            ORDER BY last_used_at DESC
+            LIMIT :limit
+        """
+        with db.engine.connect() as conn:
+            rows = conn.execute(text(sql), {"ttl": TRANSLATION_CACHE_TTL, "limit": limit}).fetchall()
+        # En eski önce yazılır ki LRU sırası korunsun
+        for key, payload in reversed(rows):
+            self.memory.set(key, json.loads(payload))
+        self._count("preloaded", len(rows))
+        return len(rows)
+
+    def warm_from_vocab(self, source="en", target="tr", limit=None, delay=0.0):
+        """
+        vocab kelimelerinin dış servis çevirilerini önceden cache'e yazar
+        (yerel sözlük kapalıyken / yeniden kurulurken de kelime tıklamaları ağa çıkmaz).
+        Zaten cache'te olanlar atlanır. Dönüş: (yazılan, atlanan, hatalı)
+        """
+        sql = "SELECT word FROM vocab ORDER BY id" + (" LIMIT :limit" if limit else "")
+        with db.engine.connect() as conn:
+            words = [r[0] for r in conn.execute(text(sql), {"limit": limit}).fetchall()]
+
+        written = skipped = failed = 0
+        for word in words:
+            # Isıtma istekleri hit oranı istatistiğine katılmaz
+            if not _cacheable(word) or self._lookup(make_translation_key(word, source, target))[0] is not None:
+                skipped += 1
+                continue
+            result = fetch_google_translation(word, source, target)
+            if result.get("ok"):
+                self.set(word, source, target, result)
+                written += 1
+            else:
+                failed += 1
+            if delay:
+                time.sleep(delay)
+        return written, skipped, failed
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["db_hits"]) / lookups, 3) if lookups else 0
+        stats["memory"] = self.memory.stats()
+        stats["db_enabled"] = TRANSLATION_CACHE_DB
+        stats["max_rows"] = TRANSLATION_CACHE_MAX_ROWS
+        return stats
+
+
+def _cacheable(value):
+    normalized = normalize_text(value)
+    return bool(normalized) and len(normalized) <= MAX_TEXT_LENGTH
+
+
+translation_cache = TranslationCache()
@@ -0,0 +1,109 @@
+# services/vocab_export.py
+
+from sqlalchemy import text, bindparam
+from database import db
+import csv
+import io
+import json
+
+"""
+Sözlüğün tamamını NDJSON / CSV olarak akış halinde dışa aktarır.
+Ana vocab satırları server-side (unbuffered) cursor ile okunur, alt tablolar (anlam, örnek, seviye,
+tür, topic) BATCH_SIZE'lık id grupları için ikinci bir bağlantıdan IN sorgularıyla çekilir.
+Bellekte en fazla bir batch tutulur; sözlük boyutundan bağımsızdır.
+CSV formatı vocab_import ile aynıdır (çok değerli alanlar "|" ile), dışa aktarılan dosya geri yüklenebilir.
+"""
+
+BATCH_SIZE = 1000
+CSV_FIELDS = ["word", "meanings", "examples", "levels", "word_types", "topics"]
+
+CHILD_QUERIES = {
+    "meanings": "SELECT vocab_id, meaning FROM vocab_meanings WHERE vocab_id IN :ids ORDER BY id",
+    "examples": "SELECT vocab_id, example FROM vocab_examples WHERE vocab_id IN :ids ORDER BY id",
+    "levels": "SELECT vocab_id, level FROM vocab_levels WHERE vocab_id IN :ids ORDER BY id",
+    "word_types": "SELECT vocab_id, word_type FROM vocab_word_types WHERE vocab_id IN :ids ORDER BY id",
+    "topics": """
+        SELECT vt.vocab_id, t.slug FROM vocab_topics vt
+        JOIN topics t ON t.id = vt.topic_id
+        WHERE vt.vocab_id IN :ids AND t.slug IS NOT NULL
+        ORDER BY t.slug
+    """,
+}
+
+
+def iter_vocab_export(batch_size=BATCH_SIZE):
+    """Her kelime için dict (id, word, meanings, examples, levels, word_types, topics) üretir."""
+    with db.engine.connect() as stream_conn, db.engine.connect() as child_conn:
+        result = stream_conn.execution_options(stream_results=True).execute(
+            text("SELECT id, word, meaning, example FROM vocab ORDER BY id")
+        )
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from _build_batch(child_conn, rows)
+
+
+def _build_batch(conn, rows):
+    ids = [r[0] for r in rows]
+    children = {}
+    for name, sql in CHILD_QUERIES.items():
+        grouped = {}
+        query = text(sql).bindparams(bindparam("ids", expanding=True))
+        for vid, value in conn.execute(query, {"ids": ids}).fetchall():
+            grouped.setdefault(vid, []).append(value)
+        children[name] = grouped
+
+    for vid, word, single_meaning, single_example in rows:
+        meanings = children["meanings"].get(vid, [])
+        examples = children["examples"].get(vid, [])
+        # get_vocab_details ile aynı fallback: alt tablo boşsa ana tablodaki metin
+        if not meanings and single_meaning:
+            meanings = [m.strip() for m in single_meaning.split(';') if m.strip()]
+        if not examples and single_example:
+            examples = [e.strip() for e in single_example.split(';') if e.strip()]
+        yield {
+            "id": vid,
+            "word": word,
+            "meanings": meanings,
+            "examples": examples,
+            "levels": children["levels"].get(vid, []),
+            "word_types": children["word_types"].get(vid, []),
+            "topics": children["topics"].get(vid, [])
+        }
+
+
+def to_ndjson(vocabs):
+    for vocab in vocabs:
+        yield json.dumps(vocab, ensure_ascii=False) + "\n"
+
+
+def to_csv(vocabs):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+
+    writer.writerow(CSV_FIELDS)
+    yield flush()
+    for vocab in vocabs:
+        writer.writerow([vocab["word"]] + ["|".join(vocab[field]) for field in CSV_FIELDS[1:]])
+        yield flush()
+
+
+EXPORT_FORMATS = {
+    "ndjson": (to_ndjson, "application/x-ndjson", "jsonl"),
+    "csv": (to_csv, "text/csv", "csv"),
+}
+
+
+def export_vocab(fmt="ndjson", batch_size=BATCH_SIZE):
+    """Seçilen formatta satır satır metin üreten generator."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    serializer = EXPORT_FORMATS[fmt][0]
+    return serializer(iter_vocab_export(batch_size))
@@ -0,0 +1,242 @@
+# services/vocab_import.py
+
+from sqlalchemy import text, bindparam
+from database import db, parse_pos_tags, notify_vocab_change, vocab_level_rank, VOCAB_LEVEL_ORDER
+import csv
+import json
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+"""
+Toplu kelime içe aktarma (CSV / JSONL).
+
+Her satır: word, meanings, examples, levels, word_types, topics
+- CSV'de çok değerli alanlar "|" ile ayrılır:  apple,elma|elma ağacı,I ate an apple.,A1,noun,food
+- JSONL'de liste veya "|" ile ayrılmış metin olabilir
+Dosya satır satır okunur, mevcut kelimeler tek sorguyla çekilip bellekte elenir,
+yazım CHUNK_SIZE'lık parçalar halinde her parça tek transaction ve tablo başına tek executemany ile yapılır.
+"""
+
+CHUNK_SIZE = 2000
+MAX_WORD_LENGTH = 255
+MAX_WORD_TYPE_LENGTH = 50
+MAX_REPORTED_ERRORS = 50
+
+
+# ==========================================
+# OKUMA + DOĞRULAMA
+# ==========================================
+
+def iter_import_rows(stream, fmt):
+    """stream: text dosyası, fmt: "csv" | "jsonl". (satır no, ham dict) döner."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for line_no, raw in enumerate(reader, 2):
+            yield line_no, raw
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+            except ValueError:
+                yield line_no, None
+                continue
+            yield line_no, raw if isinstance(raw, dict) else None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def detect_format(filename):
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError("File must be .csv or .jsonl")
+
+
+def validate_row(raw):
+    """Dönüş: (normalize satır, None) veya (None, hata mesajı)"""
+    if not isinstance(raw, dict):
+        return None, "invalid row"
+
+    word = str(raw.get("word") or "").strip()
+    if not word:
+        return None, "word is empty"
+    if len(word) > MAX_WORD_LENGTH:
+        return None, "word is too long"
+
+    levels = [lvl.upper() for lvl in _split(raw.get("levels"))]
+    bad_levels = [lvl for lvl in levels if lvl not in VOCAB_LEVEL_ORDER]
+    if bad_levels:
+        return None, f"invalid level: {', '.join(bad_levels)}"
+
+    word_types = _split(raw.get("word_types"))
+    if any(len(wt) > MAX_WORD_TYPE_LENGTH for wt in word_types):
+        return None, "word type is too long"
+
+    meanings = _split(raw.get("meanings"))
+    if not meanings:
+        return None, "at least one meaning is required"
+
+    return {
+        "word": word,
+        "meanings": meanings,
+        "examples": _split(raw.get("examples")),
+        "levels": sorted(set(levels), key=VOCAB_LEVEL_ORDER.index),
+        "word_types": word_types,
+        "topics": [t.lower() for t in _split(raw.get("topics"))]
+    }, None
+
+
+def _split(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        items = value
+    else:
+        items = str(value).split("|")
+    return list(dict.fromkeys(str(i).strip() for i in items if str(i).strip()))
+
+
+# ==========================================
+# YAZMA
+# ==========================================
+
+def import_vocab(rows, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    rows: iter_import_rows çıktısı.
+    Mevcut kelimeler (ve dosya içi tekrarlar) atlanır; diğerleri chunk_size'lık transaction'larla yazılır.
+    Dönüş: rapor (okunan, eklenen, atlanan, hatalı, saniye başı satır...)
+    """
+    started = time.perf_counter()
+    report = {
+        "read": 0,
+        "imported": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "failed": 0,
+        "unknown_topics": 0,
+        "errors": []
+    }
+
+    with db.engine.connect() as conn:
+        # Dedupe ve topic eşlemesi için tek seferlik okumalar
+        existing = {r[0].lower() for r in conn.execute(text("SELECT word FROM vocab")).fetchall()}
+        topic_ids = {r[0]: r[1] for r in conn.execute(text("SELECT slug, id FROM topics WHERE slug IS NOT NULL")).fetchall()}
+
+    chunk = []
+    for line_no, raw in rows:
+        report["read"] += 1
+        row, error = validate_row(raw)
+        if error:
+            report["invalid"] += 1
+            _add_error(report, line_no, error)
+            continue
+
+        key = row["word"].lower()
+        if key in existing:
+            report["duplicates"] += 1
+            continue
+        existing.add(key)
+
+        unknown = [t for t in row["topics"] if t not in topic_ids]
+        if unknown:
+            report["unknown_topics"] += 1
+            _add_error(report, line_no, f"unknown topic: {', '.join(unknown)}")
+
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _flush_chunk(chunk, topic_ids, report, dry_run)
+            chunk = []
+
+    if chunk:
+        _flush_chunk(chunk, topic_ids, report, dry_run)
+
+    if report["imported"] and not dry_run:
+        # Index / cache'ler kelime bazında değil toptan yenilenir
+        notify_vocab_change("import", None)
+
+    elapsed = time.perf_counter() - started
+    report["seconds"] = round(elapsed, 2)
+    report["rows_per_sec"] = int(report["read"] / elapsed) if elapsed else report["read"]
+    report["dry_run"] = dry_run
+    return report
+
+
+def _flush_chunk(chunk, topic_ids, report, dry_run):
+    if dry_run:
+        report["imported"] += len(chunk)
+        return
+    try:
+        with db.engine.connect() as conn:
+            with conn.begin():
+                written = _write_chunk(conn, chunk, topic_ids)
+        report["imported"] += written
+        report["duplicates"] += len(chunk) - written
+    except Exception as e:
+        logger.exception("Vocab import chunk failed")
+        report["failed"] += len(chunk)
+        _add_error(report, None, f"chunk of {len(chunk)} rows failed: {e}")
+
+
+def _write_chunk(conn, chunk, topic_ids):
+    # VALUES'ta sadece parametre olmalı (RAND() yok), yoksa driver çok satırlı INSERT'e çeviremez
+    # IGNORE: collation'a göre aynı sayılan kelime (ör. aksan farkı) tüm chunk'ı düşürmesin
+    conn.execute(text("""
+        INSERT IGNORE INTO vocab (word, meaning, example, level, word_type, rand_key, level_rank)
+        VALUES (:word, :meaning, :example, :level, :word_type, :rand_key, :level_rank)
+    """), [
+        {
+            "word": row["word"],
+            "meaning": "; ".join(row["meanings"]),
+            "example": "; ".join(row["examples"]) or None,
+            "level": row["levels"][0] if row["levels"] else "A1",
+            "word_type": row["word_types"][0] if row["word_types"] else None,
+            "rand_key": random.random(),
+            "level_rank": vocab_level_rank(row["levels"])
+        }
+        for row in chunk
+    ])
+
+    # executemany lastrowid vermez; id'ler tek IN sorgusuyla geri okunur
+    id_sql = text("SELECT id, word FROM vocab WHERE word IN :words").bindparams(bindparam("words", expanding=True))
+    ids = {w.lower(): vid for vid, w in conn.execute(id_sql, {"words": [row["word"] for row in chunk]}).fetchall()}
+
+    written = 0
+    meanings, examples, levels, word_types, topics, pos = [], [], [], [], [], []
+    for row in chunk:
+        vid = ids.get(row["word"].lower())
+        if vid is None:
+            continue
+        written += 1
+        meanings += [{"vid": vid, "value": m} for m in row["meanings"]]
+        examples += [{"vid": vid, "value": e} for e in row["examples"]]
+        levels += [{"vid": vid, "value": lvl} for lvl in row["levels"]]
+        word_types += [{"vid": vid, "value": wt} for wt in row["word_types"]]
+        topics += [{"vid": vid, "tid": topic_ids[t]} for t in row["topics"] if t in topic_ids]
+        level = row["levels"][0] if row["levels"] else "A1"
+        pos += [{"vid": vid, "level": level, "pos": p} for p in sorted(parse_pos_tags(*row["word_types"]))]
+
+    for table, column, params in [
+        ("vocab_meanings", "meaning", meanings),
+        ("vocab_examples", "example", examples),
+        ("vocab_levels", "level", levels),
+        ("vocab_word_types", "word_type", word_types),
+    ]:
+        if params:
+            conn.execute(text(f"INSERT INTO {table} (vocab_id, {column}) VALUES (:vid, :value)"), params)
+    if topics:
+        conn.execute(text("INSERT IGNORE INTO vocab_topics (vocab_id, topic_id) VALUES (:vid, :tid)"), topics)
+    if pos:
+        conn.execute(text("INSERT IGNORE INTO vocab_pos (vocab_id, level, pos) VALUES (:vid, :level, :pos)"), pos)
+    return written
+
+
+def _add_error(report, line_no, message):
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line_no, "error": message})
@@ -0,0 +1,160 @@
+# services/vocab_index.py
+
+from sqlalchemy import text
+from database import db, register_vocab_listener, get_vocab_version
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class VocabIndex:
+    """
+    Vocab'ın (level, topic_slug, pos) bazında bucket'lanmış process içi kopyası.
+    Startup'ta tek sorguyla yüklenir, admin vocab yazınca arka planda yeniden kurulur.
+    Target word seçimi bu sayede DB'ye gitmeden yapılır.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._rebuild_pending = False
+        self._rebuild_running = False
+        self._stats = {
+            "loaded": False,
+            "build_ms": 0,
+            "rows": 0,
+            "words": 0,
+            "buckets": 0,
+            "memory_bytes": 0,
+            "refresh_count": 0,
+            "refresh_errors": 0,
+            "version": None,
+            "built_at": None
+        }
+
+    def init_app(self, app):
+        self._app = app
+        register_vocab_listener(self._on_vocab_change)
+        if os.getenv("VOCAB_INDEX", "1") == "1":
+            try:
+                with app.app_context():
+                    self.build()
+            except Exception:
+                # Index yoksa target word seçimi SQL ile devam eder
+                logger.exception("Vocab index build failed, falling back to SQL selection")
+
+    @property
+    def loaded(self):
+        return self._stats["loaded"]
+
+    # ------------------------------------------
+    # BUILD
+    # ------------------------------------------
+
+    def build(self):
+        started = time.perf_counter()
+        version = get_vocab_version()
+        sql = """
+            SELECT v.id, v.word, v.word_type, v.meaning, v.level, t.slug
+            FROM vocab v
+            JOIN vocab_topics vt ON v.id = vt.vocab_id
+            JOIN topics t ON vt.topic_id = t.id
+        """
+        with db.engine.connect() as conn:
+            rows = conn.execute(text(sql)).fetchall()
+            pos_rows = conn.execute(text("SELECT vocab_id, pos FROM vocab_pos")).fetchall()
+
+        # Normalize POS (vocab_pos) -> SQL yolundaki eşitlik filtresiyle aynı sınıflar
+        pos_by_vocab = {}
+        for vid, pos in pos_rows:
+            pos_by_vocab.setdefault(vid, []).append(pos)
+
+        buckets = {}
+        words = {}
+        for vid, word, word_type, meaning, level, slug in rows:
+            # Aynı kelime birden fazla topic'te olabilir, dict tek kopya tutulur
+            entry = words.get(vid)
+            if entry is None:
+                entry = words[vid] = {"word": word, "pos": word_type, "meaning": meaning}
+            for pos in pos_by_vocab.get(vid, []) + ["any"]:
+                buckets.setdefault((level, slug, pos), []).append(entry)
+
+        with self._lock:
+            self._buckets = buckets
+            self._stats.update({
+                "loaded": True,
+                "build_ms": round((time.perf_counter() - started) * 1000, 1),
+                "rows": len(rows),
+                "words": len(words),
+                "buckets": len(buckets),
+                "memory_bytes": _estimate_memory(buckets, words),
+                "version": version,
+                "built_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            })
+        logger.info(f"Vocab index built | words={len(words)} | buckets={len(buckets)} | ms={self._stats['build_ms']}")
+
+    def _on_vocab_change(self, action, vocab_id):
+        # Art arda gelen yazımlar tek rebuild'de birleşir
+        with self._lock:
+            if not self._stats["loaded"]:
+                return
+            self._rebuild_pending = True
+            if self._rebuild_running:
+                return
+            self._rebuild_running = True
+        threading.Thread(target=self._rebuild_loop, name="vocab-index-refresh", daemon=True).start()
+
+    def _rebuild_loop(self):
+        while True:
+            with self._lock:
+                if not self._rebuild_pending:
+                    self._rebuild_running = False
+                    return
+                self._rebuild_pending = False
+            try:
+                with self._app.app_context():
+                    self.build()
+                with self._lock:
+                    self._stats["refresh_count"] += 1
+            except Exception:
+                logger.exception("Vocab index refresh failed")
+                with self._lock:
+                    self._stats["refresh_errors"] += 1
+
+    # ------------------------------------------
+    # SEÇİM
+    # ------------------------------------------
+
+    def fetch_words(self, level, topic, pos, limit, used=None):
+        """_fetch_words'ün bellek içi karşılığı: bucket'tan `used`'da olmayan `limit` rastgele kelime."""
+        used = used if used is not None else set()
+        bucket = self._buckets.get((level, topic, pos), [])
+        candidates = random.sample(bucket, min(limit + len(used), len(bucket)))
+        picked = [dict(w) for w in candidates if w["word"] not in used][:limit]
+        used.update(w["word"] for w in picked)
+        return picked
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["current_version"] = get_vocab_version()
+        stats["stale"] = stats["version"] != stats["current_version"]
+        return stats
+
+
+def _estimate_memory(buckets, words):
+    size = sys.getsizeof(buckets)
+    for key, items in buckets.items():
+        size += sys.getsizeof(key) + sys.getsizeof(items)
+    for entry in words.values():
+        size += sys.getsizeof(entry) + sum(sys.getsizeof(v) for v in entry.values() if v is not None)
+    return size
+
+
+vocab_index = VocabIndex()
@@ -0,0 +1,108 @@
+# services/vocab_pages.py
+
+from flask import render_template
+from markupsafe import Markup
+from database import get_vocab_page, get_vocab_version, register_vocab_listener
+from services.cache import TTLCache
+import hashlib
+import os
+import threading
+import time
+
+# Sözlük sadece admin düzenleyince değişir; TTL sadece başka worker'daki yazımlar için emniyet
+VOCAB_PAGE_CACHE_TTL = int(os.getenv("VOCAB_PAGE_CACHE_TTL", 600))
+# ETag'e giren zaman dilimi: sayfadaki CSRF token'ı (varsayılan 1 saat geçerli) eskimeden yenilensin
+VOCAB_PAGE_ETAG_WINDOW = int(os.getenv("VOCAB_PAGE_ETAG_WINDOW", 1800))
+
+
+class VocabPageCache:
+    """
+    /all_vocabs?letter=X için harf başına kelime listesi + render edilmiş kelime ızgarası.
+    Kayıtlar vocab versiyonuyla anahtarlanır; vocab yazımında versiyon artar ve cache boşaltılır.
+    Layout (kullanıcı menüsü, CSRF token) her istekte render edilir, sadece ağır ızgara cache'lenir.
+    """
+
+    def __init__(self, maxsize=64, ttl=VOCAB_PAGE_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "not_modified": 0,
+            "build_ms": 0.0,
+            "hit_ms": 0.0
+        }
+        register_vocab_listener(self._on_vocab_change)
+
+    def _on_vocab_change(self, action, vocab_id):
+        self._cache.clear()
+
+    def get_page(self, letter):
+        """
+        Dönüş: {"version", "count", "html", "digest"}
+        digest render edilmiş ızgaranın hash'idir; aynı içerik her worker'da aynı ETag'i üretir.
+        DB hatası yukarı fırlatılır; boş sonuç cache'e yazılmasın.
+        """
+        started = time.perf_counter()
+        version = get_vocab_version()
+        key = (version, letter)
+
+        page = self._cache.get(key)
+        if page is not None:
+            self._add(hits=1, hit_ms=(time.perf_counter() - started) * 1000)
+            return page
+
+        vocabs, _ = get_vocab_page(letter=letter, limit=None)
+        html = render_template("all_vocabs_grid.html", vocabs=vocabs, selected_letter=letter)
+        page = {
+            "version": version,
+            "count": len(vocabs),
+            "html": Markup(html),
+            "digest": hashlib.sha1(html.encode("utf-8")).hexdigest()
+        }
+        # Render sırasında yazım olduysa eski versiyonla saklanır, bir sonraki istek yeni anahtarla kurar
+        self._cache.set(key, page)
+        self._add(misses=1, build_ms=(time.perf_counter() - started) * 1000)
+        return page
+
+    def etag(self, page, letter, user_id=None, role=None):
+        """
+        Sayfa içeriği ızgaranın hash'i + harf + kullanıcı menüsü ile belirlenir.
+        get_vocab_version() process'e özel bir sayaç olduğundan ETag'e girmez: worker'lar arasında
+        ve restart sonrası aynı içerik aynı ETag'i, farklı içerik farklı ETag'i verir (add_etag gibi).
+        Izgara cache'teyse 304 yanıtı sorgu ve render yapmaz.
+        """
+        window = int(time.time() // VOCAB_PAGE_ETAG_WINDOW)
+        raw = f"{page['digest']}:{letter}:{user_id}:{role}:{window}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+    def count_not_modified(self):
+        self._add(not_modified=1)
+
+    def _add(self, **values):
+        with self._lock:
+            for name, value in values.items():
+                self._stats[name] += value
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+        avg_build = stats["build_ms"] / stats["misses"] if stats["misses"] else 0.0
+        avg_hit = stats["hit_ms"] / stats["hits"] if stats["hits"] else 0.0
+        return {
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "not_modified": stats["not_modified"],
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+            "avg_build_ms": round(avg_build, 2),
+            "avg_hit_ms": round(avg_hit, 3),
+            # Hit'lerde sorgu + ızgara render'ı yapılmadığı için kazanılan tahmini süre
+            "saved_ms": round(stats["hits"] * max(avg_build - avg_hit, 0.0), 1),
+            "version": get_vocab_version(),
+            "cache": self._cache.stats()
+        }
+
+
+vocab_page_cache = VocabPageCache()
@@ -0,0 +1,373 @@
+# services/vocab_search.py
+
+from sqlalchemy import text, bindparam
+from database import db, register_vocab_listener, get_vocab_version, vocab_search_indexes_exist, ordered_json_list
+from array import array
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+"""
+Sözlük araması: kelimede prefix / substring, Türkçe anlamlarda substring.
+
+İki kaynak:
+- memory: kelimeler sıralı listede (prefix -> bisect), kelime ve anlamlar trigram ters index'inde (substring).
+  Startup'ta tek sorguyla kurulur, vocab yazımında arka planda yenilenir.
+  Aynı kayıtlar /translate_word'ün yerel sözlüğüdür (find_word / get_entry), ayrı bir kopya tutulmaz.
+- sql: prefix unique_word B-tree index'i ile (LIKE 'x%'), substring / anlam FULLTEXT ngram index'i ile
+  (flask vocab-search-index ile eklenir; yoksa LIKE '%x%' taraması).
+VOCAB_SEARCH_BACKEND=auto iken index yüklüyse memory, değilse sql kullanılır.
+"""
+
+VOCAB_SEARCH_BACKEND = os.getenv("VOCAB_SEARCH_BACKEND", "auto")
+SEARCH_MODES = ["prefix", "substring", "meaning"]
+# Arama sonucunda dönen alanlar (SQL yolu ile aynı); word_types sadece çeviri için tutulur
+PUBLIC_FIELDS = ["id", "word", "meanings", "levels"]
+MAX_LIMIT = 50
+NGRAM = 3
+
+# Türkçe karakterler ASCII'ye katlanır: "agac" araması "ağaç"ı bulur
+_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+
+
+def normalize(value):
+    value = (value or "").replace("İ", "i").replace("I", "ı")
+    return " ".join(value.lower().translate(_FOLD).split())
+
+
+def _trigrams(value):
+    return {value[i:i + NGRAM] for i in range(len(value) - NGRAM + 1)}
+
+
+class VocabSearchIndex:
+    """
+    Bellek içi arama index'i.
+    _words: (normalize kelime, id) sıralı liste -> prefix araması bisect ile O(log n + sonuç)
+    _word_grams / _meaning_grams: trigram -> id dizisi; en seyrek trigram'ın adayları substring ile doğrulanır.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._words = []
+        self._word_keys = []
+        self._word_grams = {}
+        self._meaning_grams = {}
+        self._rebuild_pending = False
+        self._rebuild_running = False
+        self._stats = {
+            "loaded": False,
+            "build_ms": 0,
+            "entries": 0,
+            "memory_bytes": 0,
+            "refresh_count": 0,
+            "version": None
+        }
+
+    def init_app(self, app):
+        self._app = app
+        register_vocab_listener(self._on_vocab_change)
+        if VOCAB_SEARCH_BACKEND in ("auto", "memory"):
+            try:
+                with app.app_context():
+                    self.build()
+            except Exception:
+                logger.exception("Vocab search index build failed, falling back to SQL search")
+
+    @property
+    def loaded(self):
+        return self._stats["loaded"]
+
+    # ------------------------------------------
+    # BUILD
+    # ------------------------------------------
+
+    def build(self):
+        version = get_vocab_version()
+        # Anlam / tür sırası çevirinin ana anlamını belirler: (id, değer) çiftleri id'ye göre sıralanır
+        sql = """
+            SELECT v.id, v.word,
+                   (SELECT JSON_ARRAYAGG(JSON_ARRAY(vm.id, vm.meaning)) FROM vocab_meanings vm WHERE vm.vocab_id = v.id),
+                   (SELECT JSON_ARRAYAGG(vl.level) FROM vocab_levels vl WHERE vl.vocab_id = v.id),
+                   (SELECT JSON_ARRAYAGG(JSON_ARRAY(vt.id, vt.word_type)) FROM vocab_word_types vt WHERE vt.vocab_id = v.id),
+                   v.meaning,
+                   v.word_type
+            FROM vocab v
+        """
+        with db.engine.connect() as conn:
+            rows = conn.execute(text(sql)).fetchall()
+
+        entries = []
+        for vid, word, meanings, levels, word_types, single_meaning, single_type in rows:
+            # get_vocab_details ile aynı fallback: alt tablo boşsa ana tablodaki metin
+            meanings = ordered_json_list(meanings)
+            if not meanings and single_meaning:
+                meanings = [m.strip() for m in single_meaning.split(';') if m.strip()]
+            word_types = ordered_json_list(word_types) or ([single_type] if single_type else [])
+            entries.append((vid, word, meanings, json.loads(levels) if levels else [], word_types))
+        self.build_from_rows(entries, version)
+
+    def build_from_rows(self, rows, version=None):
+        """rows: (id, word, meanings, levels, word_types). Benchmark DB'siz kurulum için de kullanır."""
+        started = time.perf_counter()
+        entries = {}
+        words = []
+        word_grams = {}
+        meaning_grams = {}
+
+        for vid, word, meanings, levels, word_types in rows:
+            key = normalize(word)
+            meaning_keys = [normalize(m) for m in meanings]
+            entries[vid] = {
+                "id": vid,
+                "word": word,
+                "meanings": meanings,
+                "levels": levels,
+                "word_types": word_types,
+                "_key": key,
+                "_meaning_keys": meaning_keys
+            }
+            words.append((key, vid))
+            for gram in _trigrams(key):
+                word_grams.setdefault(gram, set()).add(vid)
+            for meaning_key in meaning_keys:
+                for gram in _trigrams(meaning_key):
+                    meaning_grams.setdefault(gram, set()).add(vid)
+
+        words.sort()
+        # set yerine sıkı int dizisi: 100k kelimede bellek birkaç kat azalır
+        word_grams = {g: array("I", ids) for g, ids in word_grams.items()}
+        meaning_grams = {g: array("I", ids) for g, ids in meaning_grams.items()}
+        with self._lock:
+            self._entries = entries
+            self._words = words
+            self._word_keys = [w[0] for w in words]
+            self._word_grams = word_grams
+            self._meaning_grams = meaning_grams
+            self._stats.update({
+                "loaded": True,
+                "build_ms": round((time.perf_counter() - started) * 1000, 1),
+                "entries": len(entries),
+                "memory_bytes": _estimate_memory(entries, word_grams, meaning_grams),
+                "version": version
+            })
+
+    def _on_vocab_change(self, action, vocab_id):
+        # vocab_index ile aynı: art arda yazımlar tek rebuild'de birleşir
+        with self._lock:
+            if not self._stats["loaded"]:
+                return
+            self._rebuild_pending = True
+            if self._rebuild_running:
+                return
+            self._rebuild_running = True
+        threading.Thread(target=self._rebuild_loop, name="vocab-search-refresh", daemon=True).start()
+
+    def _rebuild_loop(self):
+        while True:
+            with self._lock:
+                if not self._rebuild_pending:
+                    self._rebuild_running = False
+                    return
+                self._rebuild_pending = False
+            try:
+                with self._app.app_context():
+                    self.build()
+                with self._lock:
+                    self._stats["refresh_count"] += 1
+            except Exception:
+                logger.exception("Vocab search index refresh failed")
+
+    # ------------------------------------------
+    # ARAMA
+    # ------------------------------------------
+
+    def search(self, query, mode, limit, offset):
+        """Dönüş: (sonuç listesi, devamı var mı)"""
+        key = normalize(query)
+        with self._lock:
+            entries, words, word_keys = self._entries, self._words, self._word_keys
+            word_grams, meaning_grams = self._word_grams, self._meaning_grams
+
+        if mode == "prefix":
+            # Prefix ile başlayan kelimeler sıralı listede bitişiktir: bisect ile başa atla, prefix bitince dur
+            start = bisect.bisect_left(word_keys, key) + offset
+            ids = []
+            for i in range(start, min(start + limit + 1, len(words))):
+                if not word_keys[i].startswith(key):
+                    break
+                ids.append(words[i][1])
+        else:
+            field = "_key" if mode == "substring" else "_meaning_keys"
+            grams = word_grams if mode == "substring" else meaning_grams
+            matched = []
+            for vid in _candidates(key, grams, entries):
+                haystacks = _haystacks(entries[vid], field)
+                if any(key in h for h in haystacks):
+                    # Tam eşleşme, sonra baştan eşleşme, sonra kısa kelime önce
+                    rank = 0 if key in haystacks else 1 if any(h.startswith(key) for h in haystacks) else 2
+                    matched.append((rank, len(entries[vid]["_key"]), entries[vid]["_key"], vid))
+            matched.sort()
+            ids = [m[3] for m in matched[offset:offset + limit + 1]]
+
+        results = [_public(entries[vid]) for vid in ids[:limit]]
+        return results, len(ids) > limit
+
+    def get_entry(self, vocab_id):
+        """id -> kayıt (id, word, meanings, levels, word_types) veya None."""
+        with self._lock:
+            entries = self._entries
+        entry = entries.get(vocab_id)
+        return _public(entry, PUBLIC_FIELDS + ["word_types"]) if entry else None
+
+    def find_word(self, word):
+        """
+        Kelimenin birebir kaydı (normalize edilmiş hali ile); aynı anahtarda birden fazla kayıt varsa
+        en küçük id'li olan. Sıralı listede bisect ile bulunur.
+        """
+        key = normalize(word)
+        with self._lock:
+            entries, words, word_keys = self._entries, self._words, self._word_keys
+        i = bisect.bisect_left(word_keys, key)
+        if not key or i >= len(word_keys) or word_keys[i] != key:
+            return None
+        return _public(entries[words[i][1]], PUBLIC_FIELDS + ["word_types"])
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["current_version"] = get_vocab_version()
+        stats["stale"] = stats["version"] != stats["current_version"]
+        return stats
+
+
+def _candidates(key, grams, entries):
+    """
+    Sorgunun en seyrek trigram'ının posting listesi; adaylar zaten substring ile doğrulandığı için
+    diğer listelerle kesişim gerekmez.
+    """
+    if len(key) < NGRAM:
+        # Trigram'dan kısa sorgu: tüm kayıtlar taranır (1-2 harf, nadiren kullanılır)
+        return entries.keys()
+    postings = [grams.get(g, ()) for g in _trigrams(key)]
+    return min(postings, key=len)
+
+
+def _haystacks(entry, field):
+    return [entry[field]] if field == "_key" else entry[field]
+
+
+def _public(entry, fields=PUBLIC_FIELDS):
+    return {k: entry[k] for k in fields}
+
+
+def _estimate_memory(entries, *gram_maps):
+    size = sys.getsizeof(entries)
+    for entry in entries.values():
+        size += sys.getsizeof(entry) + sys.getsizeof(entry["word"]) + sum(sys.getsizeof(m) for m in entry["meanings"])
+    for grams in gram_maps:
+        size += sys.getsizeof(grams) + sum(sys.getsizeof(g) + sys.getsizeof(ids) for g, ids in grams.items())
+    return size
+
+
+vocab_search_index = VocabSearchIndex()
+
+
+# ==========================================
+# SQL ARAMA
+# ==========================================
+
+def _like_escape(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _sql_search(query, mode, limit, offset):
+    query = query.strip()
+    fulltext = vocab_search_indexes_exist()
+    # ngram_token_size varsayılanı 2; daha kısa sorgularda FULLTEXT eşleşmez
+    use_fulltext = fulltext and len(query) >= 2
+    phrase = '"' + query.replace('"', " ") + '"'
+
+    if mode == "prefix":
+        where = "v.word LIKE :pattern"
+        params = {"pattern": _like_escape(query) + "%"}
+        source = "vocab v"
+    elif mode == "substring":
+        where = "MATCH(v.word) AGAINST (:phrase IN BOOLEAN MODE)" if use_fulltext else "v.word LIKE :pattern"
+        params = {"phrase": phrase, "pattern": "%" + _like_escape(query) + "%"}
+        source = "vocab v"
+    else:
+        where = "MATCH(vm.meaning) AGAINST (:phrase IN BOOLEAN MODE)" if use_fulltext else "vm.meaning LIKE :pattern"
+        params = {"phrase": phrase, "pattern": "%" + _like_escape(query) + "%"}
+        source = "vocab v JOIN vocab_meanings vm ON vm.vocab_id = v.id"
+
+    # Prefix'te sıralama index sırası (alfabetik), diğerlerinde tam eşleşme ve kısa kelime önce
+    order = "v.word" if mode == "prefix" else "v.word = :exact DESC, len, v.word"
+    sql = f"""
+        SELECT DISTINCT v.id, v.word, CHAR_LENGTH(v.word) AS len
+        FROM {source}
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT :limit OFFSET :offset
+    """
+    params.update(exact=query, limit=limit + 1, offset=offset)
+
+    with db.engine.connect() as conn:
+        rows = conn.execute(text(sql), params).fetchall()
+        ids = [r[0] for r in rows[:limit]]
+        details = {}
+        if ids:
+            detail_sql = text("""
+                SELECT v.id, v.word,
+                       (SELECT JSON_ARRAYAGG(vm.meaning) FROM vocab_meanings vm WHERE vm.vocab_id = v.id),
+                       (SELECT JSON_ARRAYAGG(vl.level) FROM vocab_levels vl WHERE vl.vocab_id = v.id)
+                FROM vocab v WHERE v.id IN :ids
+            """).bindparams(bindparam("ids", expanding=True))
+            for vid, word, meanings, levels in conn.execute(detail_sql, {"ids": ids}).fetchall():
+                details[vid] = {
+                    "id": vid,
+                    "word": word,
+                    "meanings": json.loads(meanings) if meanings else [],
+                    "levels": json.loads(levels) if levels else []
+                }
+
+    return [details[vid] for vid in ids if vid in details], len(rows) > limit
+
+
+# ==========================================
+# GİRİŞ NOKTASI
+# ==========================================
+
+def search_vocab(query, mode="prefix", page=1, limit=20):
+    """
+    Dönüş: {"results", "page", "limit", "has_more", "backend", "took_ms"}
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    page = max(1, int(page))
+    offset = (page - 1) * limit
+
+    started = time.perf_counter()
+    if VOCAB_SEARCH_BACKEND != "sql" and vocab_search_index.loaded:
+        backend = "memory"
+        results, has_more = vocab_search_index.search(query, mode, limit, offset)
+    else:
+        backend = "sql"
+        results, has_more = _sql_search(query, mode, limit, offset)
+
+    return {
+        "results": results,
+        "page": page,
+        "limit": limit,
+        "has_more": has_more,
+        "backend": backend,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
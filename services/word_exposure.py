@@ -0,0 +1,155 @@
+# services/word_exposure.py
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+import time
+
+"""
+Kullanıcının derslerde gördüğü target word'lerin kompakt takibi.
+Her kullanıcı için iki nesilli (rolling) Bloom filter tutulur:
+- yeni kelimeler "current" filtreye yazılır
+- current dolunca "previous" atılır, current previous olur (eski kelimeler zamanla unutulur)
+Kullanıcı başına bellek sabittir (2 x BITS / 8 byte), sorgu maliyeti HASHES kadar bit okumasıdır.
+Yanlış pozitif olabilir (görülmemiş kelime "görüldü" sayılır), yanlış negatif olmaz;
+target word seçiminde sadece sıralama tercihi için kullanıldığından bu kabul edilebilir.
+"""
+
+WORD_EXPOSURE_BITS = int(os.getenv("WORD_EXPOSURE_BITS", 8192))
+WORD_EXPOSURE_HASHES = int(os.getenv("WORD_EXPOSURE_HASHES", 4))
+# Bir nesle yazılan kelime sayısı; BITS=8192, HASHES=4 için ~%1 yanlış pozitif
+WORD_EXPOSURE_CAPACITY = int(os.getenv("WORD_EXPOSURE_CAPACITY", 800))
+WORD_EXPOSURE_MAX_USERS = int(os.getenv("WORD_EXPOSURE_MAX_USERS", 10000))
+
+
+class RollingBloomFilter:
+    """İki nesilli sabit boyutlu Bloom filter."""
+
+    __slots__ = ("bits", "hashes", "capacity", "current", "previous", "count", "rotations")
+
+    def __init__(self, bits=WORD_EXPOSURE_BITS, hashes=WORD_EXPOSURE_HASHES, capacity=WORD_EXPOSURE_CAPACITY):
+        self.bits = bits
+        self.hashes = hashes
+        self.capacity = capacity
+        self.current = bytearray(bits // 8)
+        self.previous = bytearray(bits // 8)
+        self.count = 0
+        self.rotations = 0
+
+    def _positions(self, word):
+        # Double hashing: tek blake2b özetinden k pozisyon
+        digest = hashlib.blake2b(word.lower().encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @staticmethod
+    def _has(array, positions):
+        return all(array[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def add(self, word):
+        positions = self._positions(word)
+        if self._has(self.current, positions):
+            return
+        if self.count >= self.capacity:
+            self.previous, self.current = self.current, bytearray(self.bits // 8)
+            self.count = 0
+            self.rotations += 1
+        for p in positions:
+            self.current[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, word):
+        positions = self._positions(word)
+        return self._has(self.current, positions) or self._has(self.previous, positions)
+
+    @property
+    def memory_bytes(self):
+        return len(self.current) + len(self.previous)
+
+
+class WordExposureTracker:
+    """
+    user_id -> RollingBloomFilter, LRU ile max_users kullanıcıyla sınırlı (process içi).
+    Restart'ta sıfırlanır; kaybı sadece bir süre daha az çeşitli kelime seçimidir.
+    """
+
+    def __init__(self, max_users=WORD_EXPOSURE_MAX_USERS):
+        self.max_users = max_users
+        self._filters = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "marked": 0,
+            "lookups": 0,
+            "lookup_hits": 0,
+            "lookup_ns": 0,
+            "evictions": 0
+        }
+
+    def mark_seen(self, user_id, words):
+        if not user_id or not words:
+            return
+        with self._lock:
+            bloom = self._filters.get(user_id)
+            if bloom is None:
+                bloom = self._filters[user_id] = RollingBloomFilter()
+                if len(self._filters) > self.max_users:
+                    self._filters.popitem(last=False)
+                    self._stats["evictions"] += 1
+            else:
+                self._filters.move_to_end(user_id)
+            for word in words:
+                if word:
+                    bloom.add(word)
+            self._stats["marked"] += len(words)
+
+    def seen_checker(self, user_id):
+        """
+        Kullanıcı için word -> bool fonksiyonu döner (kaydı yoksa None).
+        Seçim sırasında her aday için kilit almamak adına filtre bir kez alınır.
+        """
+        with self._lock:
+            bloom = self._filters.get(user_id) if user_id else None
+        if bloom is None:
+            return None
+
+        def is_seen(word):
+            started = time.perf_counter_ns()
+            seen = word in bloom
+            elapsed = time.perf_counter_ns() - started
+            with self._lock:
+                self._stats["lookups"] += 1
+                self._stats["lookup_hits"] += 1 if seen else 0
+                self._stats["lookup_ns"] += elapsed
+            return seen
+
+        return is_seen
+
+    def seen_count(self, user_id, words):
+        is_seen = self.seen_checker(user_id)
+        if is_seen is None:
+            return 0
+        return sum(1 for w in words if w and is_seen(w))
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            users = len(self._filters)
+            memory = sum(b.memory_bytes for b in self._filters.values())
+            rotations = sum(b.rotations for b in self._filters.values())
+
+        lookups = stats.pop("lookup_ns")
+        stats["avg_lookup_ns"] = int(lookups / stats["lookups"]) if stats["lookups"] else 0
+        stats["users"] = users
+        stats["max_users"] = self.max_users
+        stats["bytes_per_user"] = 2 * (WORD_EXPOSURE_BITS // 8)
+        stats["memory_bytes"] = memory
+        stats["rotations"] = rotations
+        stats["bits"] = WORD_EXPOSURE_BITS
+        stats["hashes"] = WORD_EXPOSURE_HASHES
+        stats["capacity_per_generation"] = WORD_EXPOSURE_CAPACITY
+        return stats
+
+
+word_exposure = WordExposureTracker()
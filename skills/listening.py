@@ -1,19 +1,13 @@
-from flask import Blueprint, render_template, request, jsonify
-import os, logging, json, difflib
-from openai import OpenAI
-from services.lesson_pipeline import generate_lesson
-from utils import current_user,placement_completed_required
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context
+import logging, difflib
+from services.llm_client import chat_completion_json, LLMOutputError
+from services.lesson_pool import lesson_pool
+from services.lesson_schema import normalize_lesson
+from utils import current_user,placement_completed_required, sse_event
 from database import get_user_levels
 listening_bp = Blueprint("listening", __name__)
 from skills.xp_manager import process_xp_gain,check_exam_eligibility
 
-# OpenAI Başlatma
-try:
-    api_key = os.getenv("OPENAI_API_KEY")
-    client = OpenAI(api_key=api_key)
-except Exception as e:
-    logging.warning(f"OpenAI Client yüklenirken hata: {e}")
-    client = None
 
 
 @listening_bp.route('/listening')
@@ -34,61 +28,9 @@ def generate_listening():
         level = data.get("level", "B1")
         print("Listening generate leveli:", level)
 
-        raw_lesson = generate_lesson(skill="listening",level=level)   
+        raw_lesson = lesson_pool.get_lesson(skill="listening", level=level, user_id=current_user())   
+        processed_lesson = process_listening_lesson(raw_lesson)
 
-        processed_lesson = {
-            "title": raw_lesson.get("title", "Listening Exercise"),
-            "listening_text": raw_lesson.get("audio_text", raw_lesson.get("listening_text", ""))
-        }
-
-        processed_blanks = []
-        raw_blanks = raw_lesson.get("fill_in_the_blanks", raw_lesson.get("blanks", []))
-        
-        for item in raw_blanks:
-            if "sentence" in item and "___" in item["sentence"]:
-                parts = item["sentence"].split("___")
-                prefix = parts[0] if len(parts) > 0 else ""
-                suffix = parts[1] if len(parts) > 1 else ""
-                correct = item.get("answer", "")
-            else:
-                prefix = item.get("prefix", "")
-                suffix = item.get("suffix", "")
-                correct = item.get("correct", item.get("answer", ""))
-            
-            processed_blanks.append({
-                "prefix": prefix,
-                "correct": correct,
-                "suffix": suffix
-            })
-        
-        processed_lesson["blanks"] = processed_blanks
-
-        processed_mc = []
-        raw_mc = raw_lesson.get("multiple_choice", raw_lesson.get("mc", []))
-
-        for item in raw_mc:
-
-            correct_val = ""
-            options = item.get("options", [])
-            
-           
-            if "correct_index" in item:
-                idx = item["correct_index"]
-                if isinstance(idx, int) and 0 <= idx < len(options):
-                    correct_val = options[idx]
-          
-            elif "correct" in item:
-                correct_val = item["correct"]
-            
-            processed_mc.append({
-                "question": item.get("question", ""),
-                "options": options,
-                "correct": correct_val
-            })
-
-        processed_lesson["mc"] = processed_mc
-
-       
         return jsonify({
             "status": "ok",
             "lesson": processed_lesson
@@ -103,17 +45,78 @@ def generate_listening():
             "message": "Ders oluşturulurken bir hata oluştu."
         }), 500
 
+@listening_bp.route("/api/generate_listening/stream", methods=["GET"])
+@placement_completed_required
+def generate_listening_stream():
+    # SSE: title ve audio_text hazır olunca gönderilir, işlenmiş ders en son "lesson" event'i ile gelir
+    level = request.args.get("level", "B1")
+
+    def events():
+        try:
+            for field, value in lesson_pool.stream_lesson(skill="listening", level=level, user_id=current_user()):
+                if field == "lesson":
+                    value = process_listening_lesson(value)
+                yield sse_event(field, value)
+        except Exception as e:
+            logging.error(f"Generate Listening Stream Error: {e}")
+            yield sse_event("lesson_error", "Ders oluşturulurken bir hata oluştu.")
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def process_listening_lesson(raw_lesson):
+    """
+    Şemadan geçmiş dersi frontend'in beklediği yapıya çevirir (blanks: prefix/correct/suffix, mc: correct metni).
+    Alias / eksik alan düzeltmeleri lesson_schema'da yapılır.
+    """
+    lesson = normalize_lesson("listening", raw_lesson)
+
+    processed_blanks = []
+    for item in lesson["fill_in_the_blanks"]:
+        prefix, _, suffix = item["sentence"].partition("___")
+        processed_blanks.append({
+            "prefix": prefix,
+            "correct": item["answer"],
+            "suffix": suffix
+        })
+
+    processed_mc = []
+    for item in lesson["multiple_choice"]:
+        options = item["options"]
+        idx = item["correct_index"]
+        processed_mc.append({
+            "question": item["question"],
+            "options": options,
+            "correct": options[idx] if isinstance(idx, int) and 0 <= idx < len(options) else ""
+        })
+
+    return {
+        "title": lesson.get("title") or "Listening Exercise",
+        "listening_text": lesson.get("audio_text", ""),
+        "blanks": processed_blanks,
+        "mc": processed_mc
+    }
+
+
 @listening_bp.route("/api/assess_listening", methods=["POST"])
 @placement_completed_required
 def assess_listening():
     data = request.json
 
-    gist = assess_listening_gist(
-        data["listening_text"],
-        data["gist_answer"],
-        data["level"],
-        data["title"]
-    )
+    try:
+        gist = assess_listening_gist(
+            data["listening_text"],
+            data["gist_answer"],
+            data["level"],
+            data["title"]
+        )
+    except LLMOutputError as e:
+        # Kesik / geçersiz JSON: 500 yerine tekrar denenebilir hata
+        logging.error("Listening gist output error", exc_info=e)
+        return jsonify({'error': 'Bir hata oluştu, lütfen tekrar dene.'}), 502
 
     blanks = assess_blanks(data["blanks"])
     mc = assess_mc(data["mc"])
@@ -160,9 +163,9 @@ def assess_listening_gist(text, summary, level, title):
     {summary}
     """
 
-    resp = client.chat.completions.create(
+    return chat_completion_json(
+        call_site="assess_listening_gist",
         model="gpt-4o-mini",
-        response_format={"type": "json_object"},
         messages=[
             {"role": "system", "content": system_message},
             {"role": "user", "content": user_message}
@@ -170,8 +173,6 @@ def assess_listening_gist(text, summary, level, title):
         temperature=0.2
     )
 
-    return json.loads(resp.choices[0].message.content)
-
 
 def assess_blanks(blanks):
     correct = 0
@@ -1,21 +1,14 @@
-from flask import Blueprint, render_template, request, jsonify
-import os, logging, json,difflib
-from openai import OpenAI
-from services.lesson_pipeline import generate_lesson
-from utils import current_user,placement_completed_required
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context
+import logging,difflib
+from services.llm_client import chat_completion_json, LLMOutputError
+from services.lesson_pool import lesson_pool
+from utils import current_user,placement_completed_required, sse_event
 from database import get_user_levels
 from skills.xp_manager import process_xp_gain, check_exam_eligibility
 
 
 reading_bp = Blueprint("reading", __name__)
 
-# OpenAI Başlatma
-try:
-    api_key = os.getenv("OPENAI_API_KEY")
-    client = OpenAI(api_key=api_key)
-except Exception as e:
-    logging.warning(f"OpenAI Client yüklenirken hata: {e}")
-    client = None
 
 
 
@@ -36,13 +29,33 @@ def generate_reading():
     try:
         level = request.args.get('level', 'B1')
         print("Generating reading passage for level:", level)
-        data = generate_lesson(skill="reading", level=level)
+        data = lesson_pool.get_lesson(skill="reading", level=level, user_id=current_user())
     except Exception as e:
         logging.error(f"Generate Reading Error: {e}")
         return jsonify({'error': 'Ders oluşturulurken hata oluştu.'}), 500
     print("Generated reading passage:", data)
     return jsonify(data)
 
+@reading_bp.route('/api/generate_reading/stream', methods=['GET'])
+@placement_completed_required
+def generate_reading_stream():
+    # SSE: title ve text tamamlanır tamamlanmaz gönderilir, sorular en son "lesson" event'i ile gelir
+    level = request.args.get('level', 'B1')
+
+    def events():
+        try:
+            for field, value in lesson_pool.stream_lesson(skill="reading", level=level, user_id=current_user()):
+                yield sse_event(field, value)
+        except Exception as e:
+            logging.error(f"Generate Reading Stream Error: {e}")
+            yield sse_event("lesson_error", 'Ders oluşturulurken hata oluştu.')
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @reading_bp.route('/api/assess_reading', methods=['POST'])
 @placement_completed_required
 def assess_reading():
@@ -101,18 +114,16 @@ def assess_reading():
        {summary}
        """
 
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.2
-        )
-        raw = resp.choices[0].message.content
         try:
-            parsed = json.loads(raw)
+            parsed = chat_completion_json(
+                call_site="assess_reading",
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": user_message}
+                ],
+                temperature=0.2
+            )
             ai_score = parsed.get('score', 0)
             feedback = parsed.get('feedback', 'Geri bildirim bulunamadı.')
             # Quiz ve AI skorlarını birleştir
@@ -131,13 +142,13 @@ def assess_reading():
             "xp_gain": xp_result  # Frontend'de göstereceğimiz değer
            }
             )
-        except json.JSONDecodeError as e:
-            logging.error("Reading JSON decode error", exc_info=e)
+        except LLMOutputError as e:
+            # Kesik / geçersiz JSON: 500 yerine tekrar denenebilir hata
+            logging.error("Reading assessment output error", exc_info=e)
             return jsonify({
                 "final_score": 0,
-                "feedback": {"Bir hata oluştu, lütfen tekrar dene."
-                }
-            }), 500
+                "feedback": "Bir hata oluştu, lütfen tekrar dene."
+            }), 502
         
        
 
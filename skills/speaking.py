@@ -1,8 +1,8 @@
 from flask import Blueprint, render_template, request, jsonify
-import os, logging, json, time, subprocess
+import os, logging, time, subprocess
 import azure.cognitiveservices.speech as speechsdk
-from openai import OpenAI
-from services.lesson_pipeline import generate_lesson
+from services.llm_client import chat_completion_json
+from services.lesson_pool import lesson_pool
 from utils import current_user,placement_completed_required
 from database import get_user_levels
 from skills.xp_manager import process_xp_gain, check_exam_eligibility
@@ -15,13 +15,6 @@ UPLOAD_FOLDER = "uploads"
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-# OpenAI Başlatma
-try:
-    api_key = os.getenv("OPENAI_API_KEY")
-    client = OpenAI(api_key=api_key)
-except Exception as e:
-    logging.warning(f"OpenAI Client yüklenirken hata: {e}")
-    client = None
 
 
 
@@ -42,7 +35,7 @@ def generate_speaking_task():
     print("Generating speaking task for level:", level)
 
     try:
-        task_data = generate_lesson(skill="speaking",level=level)
+        task_data = lesson_pool.get_lesson(skill="speaking", level=level, user_id=current_user())
         if "task" not in task_data:
             logging.warning("Generated speaking task missing 'task' field.")
             task_data["task"] = task_data.get("prompt", "Please describe your last holiday.")
@@ -338,19 +331,18 @@ def evaluate_speaking_with_gpt(transcript, task_prompt, level="B1"):
 
     try:
         # 4. GPT ÇAĞRISI (Direkt İşlem)
-        response = client.chat.completions.create(
+        # Kesik / geçersiz JSON'da LLMOutputError fırlatır, aşağıdaki hata dönüşüne düşer
+        data = chat_completion_json(
+            call_site="evaluate_speaking_with_gpt",
             model="gpt-4o-mini",  
             messages=[
                 {"role": "system", "content": system_msg},
                 {"role": "user", "content": user_msg}
             ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
+            temperature=0.7
         )
         
-        # 5. JSON PARSE VE DÜZENLEME
-        content = response.choices[0].message.content
-        data = json.loads(content)
+        # 5. JSON DÜZENLEME
         
         scores = data.get("scores", {})
         
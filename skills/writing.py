@@ -1,19 +1,13 @@
 from flask import Blueprint, render_template, request, jsonify
-import os, logging, json
-from openai import OpenAI
-from services.lesson_pipeline import generate_lesson
+import logging
+from services.llm_client import chat_completion_json, LLMOutputError
+from services.lesson_pool import lesson_pool
 from utils import current_user,placement_completed_required
 from database import get_user_levels
 from skills.xp_manager import process_xp_gain, check_exam_eligibility
 
 writing_bp = Blueprint("writing", __name__)
 
-try:
-    api_key = os.getenv("OPENAI_API_KEY")
-    client = OpenAI(api_key=api_key)
-except Exception as e:
-    logging.warning(f"OpenAI Client yüklenirken hata: {e}")
-    client = None
 
 
 @writing_bp.route('/writing')
@@ -32,7 +26,7 @@ def generate_writing_topic():
     try:
         level = request.args.get('level', 'B1')
         print("Generating writing topic for level:", level)
-        text= generate_lesson(skill="writing", level=level)
+        text= lesson_pool.get_lesson(skill="writing", level=level, user_id=current_user())
     except Exception as e:
         logging.error(f"Generate Writing Topic Error: {e}")
         return jsonify({'error': 'Konu oluşturulurken hata oluştu.'}), 500
@@ -96,16 +90,15 @@ def assess_writing():
         - Write feedback in clear Turkish, suitable for a student
         """
         
-        response = client.chat.completions.create(
+        result = chat_completion_json(
+            call_site="assess_writing",
             model="gpt-4o-mini",
-            response_format={"type": "json_object"},
             messages=[
                 {"role": "system", "content": system_instructions},
                 {"role": "user", "content": text}
             ],
             temperature=0.2
         )
-        result = json.loads(response.choices[0].message.content)
         
         xp_result = process_xp_gain(current_user(), 'writing', result.get('score', 0), level)
         
@@ -121,6 +114,9 @@ def assess_writing():
             "mistakes": result.get('mistakes', []),
             "xp_gain": xp_result
         })
+    except LLMOutputError as e:
+        logging.error(f"Writing Assessment Output Error: {e}")
+        return jsonify({'error': 'Analiz hatası, lütfen tekrar dene.'}), 502
     except Exception as e:
         logging.error(f"Writing Assessment Error: {e}")
         return jsonify({'error': 'Analiz hatası'}), 500
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Şema / pipeline testlerinde kullanılan örnek model çıktıları."""
+
+import copy
+
+READING_TEXT = " ".join([
+    "Maria lives in a small town near the sea.",
+    "Every morning she walks to the market with her grandmother.",
+    "They buy fresh bread, fish and vegetables for the day.",
+    "The market is busy and the sellers are friendly.",
+    "After shopping, Maria goes to school by bus.",
+    "Her favourite lesson is science because she likes experiments.",
+    "In the afternoon she plays football with her friends in the park.",
+    "On Sundays her family visits the old lighthouse on the hill.",
+    "From the top they can see boats, birds and the whole town.",
+    "Maria wants to become a marine biologist when she grows up.",
+    "She reads books about whales and dolphins every night before bed.",
+    "Her grandmother tells her stories about the sea and old sailors.",
+])
+
+
+def reading_question(index):
+    return {
+        "question": f"Question {index + 1} about Maria?",
+        "options": ["Apples", "Bread", "Cars", "Dogs"],
+        "correct_index": 1,
+        "evidence": "They buy fresh bread, fish and vegetables for the day."
+    }
+
+
+VALID_READING = {
+    "title": "A Day by the Sea",
+    "text": READING_TEXT,
+    "questions": [reading_question(i) for i in range(5)]
+}
+
+
+def valid_reading():
+    return copy.deepcopy(VALID_READING)
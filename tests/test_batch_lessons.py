@@ -0,0 +1,81 @@
+import json
+import os
+
+from services.batch_lessons import parse_plan, write_batch_file, ingest_batch_results
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fake_topic_selector(level, skill):
+    return "daily life", "travel"
+
+
+def fake_word_selector(level, primary_topic, secondary_topic):
+    if level == "C1":
+        # Kelime bulunamayan seviye -> istek atlanır
+        return []
+    return [{"word": "market", "meaning": "pazar"}, {"word": "bread", "meaning": "ekmek"}]
+
+
+def fake_prompt_builder(skill, level, primary_topic, secondary_topic, target_words):
+    words = ", ".join(w["word"] for w in target_words)
+    messages = [
+        {"role": "system", "content": f"You write {skill} lessons."},
+        {"role": "user", "content": f"Level {level}, topic {primary_topic} / {secondary_topic}, words: {words}"}
+    ]
+    return messages, 1400
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_parse_plan():
+    assert parse_plan("reading:b1:2, listening:all:1", levels=["A1", "A2"]) == [
+        ("reading", "B1", 2),
+        ("listening", "A1", 1),
+        ("listening", "A2", 1),
+    ]
+
+
+def test_write_batch_file_matches_fixture(tmp_path):
+    requests_path = tmp_path / "requests.jsonl"
+    manifest_path = tmp_path / "manifest.json"
+
+    result = write_batch_file(
+        [("reading", "A2", 2), ("writing", "B1", 1), ("reading", "C1", 1)],
+        str(requests_path),
+        str(manifest_path),
+        topic_selector=fake_topic_selector,
+        word_selector=fake_word_selector,
+        prompt_builder=fake_prompt_builder
+    )
+
+    assert result == {"written": 3, "skipped": 1}
+    assert read_jsonl(requests_path) == read_jsonl(os.path.join(FIXTURES, "batch_requests.jsonl"))
+    with open(manifest_path, encoding="utf-8") as f, open(os.path.join(FIXTURES, "batch_manifest.json"), encoding="utf-8") as g:
+        assert json.load(f) == json.load(g)
+
+    requests = read_jsonl(requests_path)
+    assert requests[0]["body"]["response_format"] == {"type": "json_object"}
+    assert "response_format" not in requests[2]["body"]
+
+
+def test_ingest_batch_results():
+    stored = []
+
+    report = ingest_batch_results(
+        os.path.join(FIXTURES, "batch_results.jsonl"),
+        os.path.join(FIXTURES, "batch_manifest.json"),
+        store=lambda skill, level, lesson, meta: stored.append((skill, level, lesson, meta))
+    )
+
+    # valid reading + title'ı eksik (onarılan) reading + writing
+    # finish_reason=length ve geçersiz JSON satırı -> failed, bilinmeyen custom_id -> unknown
+    # kısa metinli ders ve obje olmayan JSON -> invalid
+    assert report == {"stored": 3, "repaired": 1, "invalid": 2, "failed": 2, "unknown": 1}
+    assert [(s[0], s[1]) for s in stored] == [("reading", "A2"), ("reading", "A2"), ("writing", "B1")]
+    assert stored[1][2]["title"] == "Reading Practice"
+    assert stored[2][2] == "Describe your favourite market."
+    assert stored[0][3]["target_words"] == ["market", "bread"]
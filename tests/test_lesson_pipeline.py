@@ -0,0 +1,172 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+# lesson_pipeline DB / LLM client modüllerini import eder
+pytest.importorskip("flask_sqlalchemy")
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from services import lesson_pipeline  # noqa: E402
+from services.lesson_schema import LessonSchemaError  # noqa: E402
+from services.prompt_builder import retry_output_budget  # noqa: E402
+
+from lesson_fixtures import valid_reading  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "prompt"}]
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """_request_json yerine sırayla verilen cevapları döner, çağrıları kaydeder."""
+    calls = []
+    responses = []
+
+    def fake_request_json(messages, temperature, call_site, max_tokens=None, retry_max_tokens=None):
+        calls.append({"call_site": call_site, "max_tokens": max_tokens, "retry_max_tokens": retry_max_tokens})
+        return responses.pop(0)
+
+    monkeypatch.setattr(lesson_pipeline, "_request_json", fake_request_json)
+    return SimpleNamespace(calls=calls, responses=responses)
+
+
+def test_parse_lesson_json():
+    assert lesson_pipeline.parse_lesson_json('{"a": 1}') == {"a": 1}
+    assert lesson_pipeline.parse_lesson_json('{"a": 1}', "length") is None
+    assert lesson_pipeline.parse_lesson_json('{"title": "A Day', "stop") is None
+    assert lesson_pipeline.parse_lesson_json("[1, 2]") is None
+    assert lesson_pipeline.parse_lesson_json(None) is None
+
+
+def test_valid_lesson_makes_no_requests(llm):
+    lesson = lesson_pipeline.validate_lesson("reading", "A2", valid_reading(), MESSAGES, 1100)
+    assert lesson["questions"] == valid_reading()["questions"]
+    assert llm.calls == []
+
+
+def test_broken_part_is_regenerated(llm):
+    raw = valid_reading()
+    raw["questions"] = raw["questions"][:3]
+    llm.responses.append({"questions": valid_reading()["questions"]})
+
+    lesson = lesson_pipeline.validate_lesson("reading", "A2", raw, MESSAGES, 1100)
+
+    assert len(lesson["questions"]) == 5
+    assert [c["call_site"] for c in llm.calls] == ["regenerate_part:reading"]
+
+
+def test_invalid_part_response_keeps_partial_lesson(llm):
+    raw = valid_reading()
+    raw["questions"] = raw["questions"][:3]
+    llm.responses.append(None)
+
+    lesson = lesson_pipeline.validate_lesson("reading", "A2", raw, MESSAGES, 1100)
+
+    assert len(lesson["questions"]) == 3
+
+
+def test_truncated_output_regenerates_once(llm):
+    # generate_lesson: finish_reason == "length" -> parse_lesson_json None döner
+    llm.responses.append(valid_reading())
+
+    parsed = lesson_pipeline.parse_lesson_json(json.dumps(valid_reading())[:200], "length")
+    lesson = lesson_pipeline.validate_lesson("reading", "A2", parsed, MESSAGES, 1400, truncated=True)
+
+    assert lesson["title"] == "A Day by the Sea"
+    assert [c["call_site"] for c in llm.calls] == ["regenerate_lesson:reading"]
+    # Kesik çıktı aynı bütçeyle tekrar kesilir; yeniden üretim tam bütçeyle yapılır
+    assert llm.calls[0]["max_tokens"] == retry_output_budget("reading")
+
+
+def test_invalid_json_regenerates_with_same_budget(llm):
+    llm.responses.append(valid_reading())
+    lesson_pipeline.validate_lesson("reading", "A2", None, MESSAGES, 1400)
+    assert llm.calls[0]["max_tokens"] == 1400
+
+
+def test_invalid_json_twice_raises_schema_error(llm):
+    llm.responses.append(None)
+    before = lesson_pipeline.get_lesson_schema_stats().get("reading", {}).get("invalid_json", 0)
+
+    with pytest.raises(LessonSchemaError) as error:
+        lesson_pipeline.validate_lesson("reading", "A2", None, MESSAGES, 1100)
+
+    assert error.value.parts == ["text"]
+    assert len(llm.calls) == 1
+    assert lesson_pipeline.get_lesson_schema_stats()["reading"]["invalid_json"] == before + 2
+
+
+def test_broken_text_twice_raises_schema_error(llm):
+    short = valid_reading()
+    short["text"] = "Too short."
+    llm.responses.append(dict(short))
+
+    with pytest.raises(LessonSchemaError):
+        lesson_pipeline.validate_lesson("reading", "A2", short, MESSAGES, 1100)
+    assert len(llm.calls) == 1
+
+
+def test_request_json_handles_truncation(monkeypatch):
+    def fake_completion(**kwargs):
+        choice = SimpleNamespace(message=SimpleNamespace(content='{"title": "x"'), finish_reason="length")
+        return SimpleNamespace(choices=[choice])
+
+    monkeypatch.setattr(lesson_pipeline, "chat_completion", fake_completion)
+    assert lesson_pipeline._request_json(MESSAGES, 0.5, "test") is None
+
+
+def test_request_json_retries_truncation_with_full_budget(monkeypatch):
+    budgets = []
+
+    def fake_completion(**kwargs):
+        budgets.append(kwargs["max_tokens"])
+        if kwargs["max_tokens"] < 1200:
+            choice = SimpleNamespace(message=SimpleNamespace(content='{"questions": ['), finish_reason="length")
+        else:
+            choice = SimpleNamespace(message=SimpleNamespace(content='{"questions": []}'), finish_reason="stop")
+        return SimpleNamespace(choices=[choice])
+
+    monkeypatch.setattr(lesson_pipeline, "chat_completion", fake_completion)
+    result = lesson_pipeline._request_json(MESSAGES, 0.5, "test", 600, retry_max_tokens=1200)
+    assert result == {"questions": []}
+    assert budgets == [600, 1200]
+
+
+def completion_returning(*choices):
+    """chat_completion yerine sırayla (content, finish_reason) cevapları döner."""
+    calls = []
+    pending = list(choices)
+
+    def fake_completion(**kwargs):
+        calls.append(kwargs)
+        content, finish_reason = pending.pop(0)
+        choice = SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)
+        return SimpleNamespace(choices=[choice])
+
+    return fake_completion, calls
+
+
+def test_chat_completion_json_retries_truncation(monkeypatch):
+    from services import llm_client
+
+    fake, calls = completion_returning(('{"score": ', "length"), ('{"score": 80}', "stop"))
+    monkeypatch.setattr(llm_client, "chat_completion", fake)
+
+    assert llm_client.chat_completion_json(call_site="assess_reading", messages=MESSAGES) == {"score": 80}
+    assert [c.get("truncation_retry", False) for c in calls] == [False, True]
+    assert calls[0]["response_format"] == {"type": "json_object"}
+
+
+def test_chat_completion_json_raises_on_invalid_output(monkeypatch):
+    from services import llm_client
+
+    fake, _ = completion_returning(('{"score": ', "length"), ('{"score": ', "length"))
+    monkeypatch.setattr(llm_client, "chat_completion", fake)
+    with pytest.raises(llm_client.LLMOutputError):
+        llm_client.chat_completion_json(call_site="assess_reading", messages=MESSAGES)
+
+    fake, _ = completion_returning(("[1, 2]", "stop"))
+    monkeypatch.setattr(llm_client, "chat_completion", fake)
+    with pytest.raises(llm_client.LLMOutputError):
+        llm_client.chat_completion_json(call_site="check_grammar", messages=MESSAGES)
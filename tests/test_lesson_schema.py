@@ -0,0 +1,107 @@
+from services.lesson_schema import normalize_lesson, repair_lesson, BLANK
+
+from lesson_fixtures import READING_TEXT, valid_reading
+
+
+# ==========================================
+# normalize_lesson
+# ==========================================
+
+def test_normalize_moves_aliases_to_canonical_fields():
+    lesson = normalize_lesson("reading", {
+        "title": "T",
+        "passage": READING_TEXT,
+        "mc": [{"question": "Q?", "options": ["a", "b", "c", "d"], "answer": "B"}]
+    })
+    assert lesson["text"] == READING_TEXT
+    assert "passage" not in lesson
+    assert lesson["questions"] == [{"question": "Q?", "options": ["a", "b", "c", "d"], "correct_index": 1}]
+
+
+def test_normalize_resolves_correct_index_variants():
+    questions = normalize_lesson("reading", {"questions": [
+        {"question": "Q", "options": ["x", "y"], "correct": "1"},
+        {"question": "Q", "options": ["x", "y"], "answer": "y"},
+        {"question": "Q", "options": ["x", "y"], "answer_index": 0},
+        {"question": "Q", "options": ["x", "y"], "correct": True},
+    ]})["questions"]
+    assert [q["correct_index"] for q in questions] == [1, 1, 0, None]
+
+
+def test_normalize_listening_blank_formats():
+    lesson = normalize_lesson("listening", {
+        "transcript": "text",
+        "blanks": [
+            {"prefix": "I like ", "correct": "tea", "suffix": "."},
+            {"sentence": "She drinks _____ daily.", "answer": " milk "},
+            "garbage"
+        ]
+    })
+    assert lesson["audio_text"] == "text"
+    assert lesson["fill_in_the_blanks"] == [
+        {"sentence": f"I like {BLANK}.", "answer": "tea"},
+        {"sentence": f"She drinks {BLANK} daily.", "answer": "milk"},
+        {"sentence": "", "answer": ""}
+    ]
+    assert lesson["multiple_choice"] == []
+
+
+def test_normalize_ignores_unknown_skill_and_non_dict():
+    assert normalize_lesson("writing", "text") == "text"
+    assert normalize_lesson("reading", None) is None
+
+
+# ==========================================
+# repair_lesson
+# ==========================================
+
+def test_repair_valid_lesson_is_unchanged():
+    lesson, repairs, broken = repair_lesson("reading", normalize_lesson("reading", valid_reading()))
+    assert repairs == 0
+    assert broken == []
+    assert lesson["questions"] == valid_reading()["questions"]
+
+
+def test_repair_fills_missing_title():
+    raw = valid_reading()
+    raw["title"] = ""
+    lesson, repairs, broken = repair_lesson("reading", normalize_lesson("reading", raw))
+    assert lesson["title"] == "Reading Practice"
+    assert repairs == 1
+    assert broken == []
+
+
+def test_repair_short_text_is_broken():
+    raw = valid_reading()
+    raw["text"] = "Too short."
+    _, _, broken = repair_lesson("reading", normalize_lesson("reading", raw))
+    assert broken == ["text"]
+
+
+def test_repair_drops_invalid_questions_and_reports_part():
+    raw = valid_reading()
+    raw["questions"][0]["correct_index"] = 9
+    raw["questions"][1]["options"] = ["Bread", "Bread", "Cars"]
+    lesson, repairs, broken = repair_lesson("reading", normalize_lesson("reading", raw))
+    assert len(lesson["questions"]) == 3
+    assert repairs == 2
+    assert broken == ["questions"]
+
+
+def test_repair_trims_extra_options_keeping_correct_answer():
+    raw = valid_reading()
+    raw["questions"][0]["options"] = ["Apples", "Cars", "Dogs", "Eggs", "Bread"]
+    raw["questions"][0]["correct_index"] = 4
+    lesson, _, broken = repair_lesson("reading", normalize_lesson("reading", raw))
+    question = lesson["questions"][0]
+    assert len(question["options"]) == 4
+    assert question["options"][question["correct_index"]] == "Bread"
+    assert broken == []
+
+
+def test_repair_replaces_evidence_not_in_text():
+    raw = valid_reading()
+    raw["questions"][0]["evidence"] = "They buy fresh bread and fish."
+    lesson, repairs, _ = repair_lesson("reading", normalize_lesson("reading", raw))
+    assert lesson["questions"][0]["evidence"] == "They buy fresh bread, fish and vegetables for the day."
+    assert repairs == 1
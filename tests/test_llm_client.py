@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from services import llm_client  # noqa: E402
+
+
+def test_backend_is_created_lazily(monkeypatch):
+    # Modül importu backend kurmaz; API key olmadan da import edilebilir
+    monkeypatch.setattr(llm_client, "backend", None)
+    monkeypatch.setattr(llm_client, "LLM_BACKEND", "fake")
+    assert llm_client.get_llm_client_stats()["backend"] == "fake"
+
+    backend = llm_client.get_backend()
+    assert backend.name == "fake"
+    assert llm_client.get_backend() is backend
+
+
+def test_backend_error_surfaces_on_call(monkeypatch):
+    def broken(name):
+        raise RuntimeError("The api_key client option must be set")
+
+    monkeypatch.setattr(llm_client, "backend", None)
+    monkeypatch.setattr(llm_client, "_create_backend", broken)
+    before = llm_client.breaker.state
+
+    with pytest.raises(RuntimeError):
+        llm_client.chat_completion(call_site="conversation", messages=[{"role": "user", "content": "hi"}])
+    assert llm_client.breaker.state == before
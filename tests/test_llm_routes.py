@@ -0,0 +1,48 @@
+import json
+import logging
+
+from services import llm_routes
+
+
+ROUTES = {
+    "default": {"model": "gpt-4o-mini", "timeout": 45},
+    "assess_reading": {"model": "gpt-4o-mini", "temperature": 0.2, "max_tokens": 700, "retry_max_tokens": 1200, "timeout": 20},
+    "regenerate_part:*": {"model": "gpt-4o-mini", "temperature": 0.5, "max_tokens": 1200, "timeout": 30},
+}
+
+
+def use_routes(monkeypatch, tmp_path):
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps(ROUTES), encoding="utf-8")
+    monkeypatch.setattr(llm_routes, "_routes", {})
+    monkeypatch.setattr(llm_routes, "_logged_overrides", set())
+    llm_routes.load_routes(str(path))
+
+
+def test_max_tokens_is_capped_by_route(monkeypatch, tmp_path):
+    use_routes(monkeypatch, tmp_path)
+    assert llm_routes.apply_route("assess_reading", {"max_tokens": 300})[1]["max_tokens"] == 300
+    assert llm_routes.apply_route("assess_reading", {"max_tokens": 5000})[1]["max_tokens"] == 700
+    assert llm_routes.apply_route("regenerate_part:reading", {})[1]["max_tokens"] == 1200
+
+
+def test_truncation_retry_uses_retry_budget(monkeypatch, tmp_path):
+    use_routes(monkeypatch, tmp_path)
+    _, kwargs = llm_routes.apply_route("assess_reading", {"max_tokens": 300}, truncation_retry=True)
+    assert kwargs["max_tokens"] == 1200
+    # retry_max_tokens yoksa normal üst sınır geçerli
+    _, kwargs = llm_routes.apply_route("regenerate_part:reading", {"max_tokens": 2500}, truncation_retry=True)
+    assert kwargs["max_tokens"] == 1200
+
+
+def test_override_of_caller_value_is_logged_once(monkeypatch, tmp_path, caplog):
+    use_routes(monkeypatch, tmp_path)
+    with caplog.at_level(logging.WARNING, logger="services.llm_routes"):
+        for _ in range(3):
+            name, kwargs = llm_routes.apply_route("assess_reading", {"temperature": 0.9, "timeout": 20})
+    assert name == "assess_reading"
+    assert kwargs["temperature"] == 0.2
+    overrides = [r for r in caplog.records if "overrides caller value" in r.getMessage()]
+    # timeout aynı değer -> loglanmaz, temperature yalnızca bir kez
+    assert len(overrides) == 1
+    assert "field=temperature" in overrides[0].getMessage()
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+pytest.importorskip("dotenv")
+
+from services.spell_index import SpellIndex, _index_distance  # noqa: E402
+
+ROWS = [(1, "sheep"), (2, "cheap"), (3, "elephant"), (4, "accommodation"), (5, "cat"), (6, "ice cream")]
+
+
+@pytest.fixture
+def index():
+    spell = SpellIndex(max_distance=2, prefix_length=7)
+    spell.build_from_rows(ROWS)
+    return spell
+
+
+def test_index_distance_follows_lookup_thresholds():
+    assert _index_distance(3, 2) == 0
+    assert _index_distance(4, 2) == 1
+    assert _index_distance(6, 2) == 1
+    assert _index_distance(7, 2) == 2
+    assert _index_distance(12, 1) == 1
+
+
+def test_lookup_exact_and_typos(index):
+    assert index.lookup("Cat")["distance"] == 0
+    assert index.lookup("Ice Cream")["vocab_id"] == 6
+    assert index.lookup("elephnat") == {"vocab_id": 3, "word": "elephant", "distance": 1}
+    assert index.lookup("accomodatoin") == {"vocab_id": 4, "word": "accommodation", "distance": 2}
+
+
+def test_ambiguous_and_short_queries_miss(index):
+    assert index.lookup("sheap") is None
+    assert index.lookup("cta") is None
+    stats = index.get_stats()
+    assert stats["ambiguous"] == 1
+    assert stats["misses"] == 1
+
+
+def test_short_words_only_get_single_deletes():
+    spell = SpellIndex(max_distance=2, prefix_length=7)
+    # sheep: kendisi + 4 tek silme, cheap: kendisi + 5 tek silme; 2 silmeli varyant yazılmaz
+    spell.build_from_rows([(1, "sheep"), (2, "cheap")])
+    assert spell.get_stats()["delete_keys"] == 11
+    # 3 harfli kelimeye hiç tolerans uygulanmadığı için varyant da yok
+    spell.build_from_rows([(5, "cat")])
+    assert spell.get_stats()["delete_keys"] == 0
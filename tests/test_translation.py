@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+from services import translation  # noqa: E402
+from services.spell_index import SpellIndex  # noqa: E402
+from services.vocab_search import VocabSearchIndex  # noqa: E402
+
+ROWS = [
+    (1, "market", ["pazar", "çarşı"], ["B1", "A2"], ["noun"]),
+    (2, "elephant", ["fil"], ["A1"], ["noun"]),
+    (3, "empty", [], ["A1"], []),
+]
+
+
+EXTERNAL_OK = {"translatedText": "dış", "ok": True}
+
+
+@pytest.fixture
+def indexes(monkeypatch):
+    search = VocabSearchIndex()
+    search.build_from_rows(ROWS)
+    spell = SpellIndex()
+    spell.build_from_rows([(vid, word) for vid, word, *_ in ROWS])
+    external = {"result": EXTERNAL_OK, "calls": []}
+
+    def fake_fetch(word, source, target):
+        external["calls"].append(word)
+        return dict(external["result"])
+
+    monkeypatch.setattr(translation, "vocab_search_index", search)
+    monkeypatch.setattr(translation, "spell_index", spell)
+    monkeypatch.setattr(translation.translation_cache, "get", lambda word, source, target: None)
+    monkeypatch.setattr(translation.translation_cache, "set", lambda word, source, target, result: None)
+    monkeypatch.setattr(translation, "fetch_google_translation", fake_fetch)
+    return SimpleNamespace(search=search, external=external)
+
+
+def test_search_index_lookups(indexes):
+    search = indexes.search
+    assert search.find_word("Market")["meanings"] == ["pazar", "çarşı"]
+    assert search.find_word("mark") is None
+    assert search.get_entry(2)["word_types"] == ["noun"]
+    # Arama sonuçları SQL yolu ile aynı alanları döner
+    assert "word_types" not in search.search("mar", "prefix", 10, 0)[0][0]
+
+
+def test_exact_local_hit_skips_external(indexes):
+    exact = translation.resolve_translation("market!")
+    assert (exact["translatedText"], exact["alternatives"], exact["level"], exact["distance"]) == ("pazar", ["çarşı"], "A2", 0)
+    assert indexes.external["calls"] == []
+
+
+def test_out_of_vocab_word_is_not_remapped(indexes):
+    # "marked" doğru yazılmış ama sözlükte yok; "market"e (1 harf) çevrilmemeli
+    result = translation.resolve_translation("marked")
+    assert result == EXTERNAL_OK
+    assert indexes.external["calls"] == ["marked"]
+
+
+def test_typo_match_is_used_when_external_fails(indexes):
+    indexes.external["result"] = {"error": "Service status 503"}
+    typo = translation.resolve_translation("elephnat")
+    assert (typo["vocab_id"], typo["word"], typo["distance"], typo["source"]) == (2, "elephant", 1, "local")
+
+    # Anlamı olmayan kayıt ve yerel sözlük dışı yön dış servisin hatasını döner
+    assert "error" in translation.resolve_translation("empty")
+    assert "error" in translation.resolve_translation("market", source="tr", target="en")
+
+
+def test_typo_match_without_external_service(indexes, monkeypatch):
+    monkeypatch.setattr(translation, "TRANSLATION_EXTERNAL", False)
+    assert translation.resolve_translation("elephnat")["word"] == "elephant"
+    assert indexes.external["calls"] == []
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+pytest.importorskip("dotenv")
+
+from database import vocab_listing_row, vocab_level_rank, vocab_level_rank_sql, VOCAB_NO_LEVEL_RANK  # noqa: E402
+
+
+def test_vocab_level_rank():
+    assert vocab_level_rank(["B2", "A2"]) == 1
+    assert vocab_level_rank(["X1"]) == VOCAB_NO_LEVEL_RANK
+    assert vocab_level_rank([]) == VOCAB_NO_LEVEL_RANK
+
+
+def test_listing_row_orders_aggregates_by_id():
+    row = (
+        7, "market", 1,
+        json.dumps([[12, "pazar"], [3, "çarşı"], [12, "pazar"]]),
+        None,
+        json.dumps(["B1", "A2"]),
+        json.dumps([[9, "verb"], [4, "noun"]]),
+    )
+    vocab = vocab_listing_row(row)
+    assert vocab["meanings"] == ["çarşı", "pazar"]
+    assert vocab["examples"] == []
+    assert vocab["levels"] == ["A2", "B1"]
+    assert vocab["word_types"] == ["noun", "verb"]
+
+
+@pytest.mark.parametrize("levels", [
+    ["A1"], ["C2"], ["B2", "A2"], ["B1", "B1"], ["X1", "B1"], ["X1"], [],
+])
+def test_level_rank_sql_matches_python(levels):
+    # MySQL FIELD() sqlite'ta aynı anlamla tanımlanır: 1 tabanlı sıra, listede yoksa 0
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("FIELD", -1, lambda value, *items: items.index(value) + 1 if value in items else 0)
+    conn.execute("CREATE TABLE vocab_levels (vocab_id INT, level TEXT)")
+    conn.executemany("INSERT INTO vocab_levels VALUES (1, ?)", [(lvl,) for lvl in levels])
+    rank = conn.execute(
+        f"SELECT COALESCE(({vocab_level_rank_sql('level')}), {VOCAB_NO_LEVEL_RANK}) FROM vocab_levels"
+    ).fetchone()[0]
+    assert rank == vocab_level_rank(levels)
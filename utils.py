@@ -1,7 +1,8 @@
 from functools import wraps
 from flask import session, flash, redirect, url_for
-import requests, urllib.parse, re
+import urllib.parse, re, json
 from database import has_user_completed_placement
+from services.http_client import http_client
 
 # --- Login Kontrolü ---
 def is_user_logged_in():
@@ -80,6 +81,11 @@ def placement_not_completed_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# --- Server-Sent Events ---
+def sse_event(event, data):
+    """Tek bir SSE mesajı üretir (data JSON olarak gönderilir)."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 # --- Google Translate Fonksiyonu ---
 def fetch_google_translation(word, source='en', target='tr'):
     try:
@@ -89,7 +95,8 @@ def fetch_google_translation(word, source='en', target='tr'):
         q = urllib.parse.quote_plus(word)
         g_url = f"https://translate.googleapis.com/translate_a/single?client=gtx&sl={source}&tl={target}&dt=t&dt=bd&q={q}"
         
-        gresp = requests.get(g_url, headers=headers, timeout=5)
+        # Ortak keep-alive havuzu: tıklama başına yeni TCP + TLS bağlantısı açılmaz
+        gresp = http_client.get(g_url, headers=headers, timeout=5)
         if gresp.status_code != 200:
             return {'error': f'Service status {gresp.status_code}'}
 